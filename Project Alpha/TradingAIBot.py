@@ -3,19 +3,38 @@ import pandas as pd
 import talib
 from deriv_api import DerivAPI, DerivAPILoggedOutError, DerivAPIError
 import time
-import requests
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, List, Tuple
 from dataclasses import dataclass, field
-import json
 from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from account import AccountState, size_stakes
+from candle_cache import CandleCache
+from indicators import IndicatorPanel, StreamingIndicators
+from instrumentation import REGISTRY, serve_metrics
+from market_stream import Bar, MarketStream
+from patterns import PatternEvaluator
+from performance import PerformanceTracker
+from proposal_stream import ProposalStreams
+from rate_limit import TokenBucket
+from request_scheduler import PRIORITY_ACCOUNT, PRIORITY_DATA, PRIORITY_ORDER, RequestScheduler
+from state_store import StateStore, next_month_start
+from sentiment import NewsClient, SentimentScorer, SentimentService
+from trade_journal import TradeJournal, create_backend
+
 # Load environment variables
 load_dotenv()
 
+# --- METRICS ---
+STAGE_SECONDS = REGISTRY.histogram(
+    'bot_stage_seconds', 'Time spent in each stage of process_symbol and execute_trade', ('stage',))
+SYMBOL_SECONDS = REGISTRY.histogram('bot_symbol_seconds', 'Time to evaluate one symbol', ('symbol',))
+LOOP_SECONDS = REGISTRY.histogram('bot_loop_seconds', 'Duration of one strategy loop pass (excluding sleep)')
+ORDER_ERRORS = REGISTRY.counter('bot_order_errors_total', 'Failed trade executions by error kind', ('kind',))
+
 # --- LOGGING CONFIGURATION ---
 logging.basicConfig(
     level=logging.INFO,
@@ -39,11 +58,50 @@ class BotConfig:
     bb_period: int = 20
     rr_ratio: float = 3.0
     risk_percent: float = 0.01
+    balance_ttl: float = 30.0  # Seconds a polled balance is reused
+    balance_subscription: bool = True  # Track balance from a push subscription
     news_api_key: str = os.getenv('NEWS_API_KEY', '')
     sentiment_threshold: float = 0.5
     news_cache_minutes: int = 60
+    news_timeout: float = 10.0  # Seconds before a sentiment request is abandoned
+    news_api_stub: str = os.getenv('NEWS_API_STUB', '')  # Local NewsAPI response for offline runs
+    news_page_size: int = 10  # Articles per refresh (NewsAPI allows up to 100)
+    per_symbol_sentiment: bool = True  # Score each pair from the articles that mention it
     min_candles: int = 60
     check_interval: int = 60
+    api_rate_limit: float = 4.0  # Sustained data requests per second (Deriv allows ~300/min)
+    api_burst: int = 20  # Requests allowed at once before pacing starts
+    api_account_rate: float = 1.0  # Sustained balance/account requests per second
+    api_max_inflight: int = 8  # Requests outstanding on the connection; orders jump the queue
+    
+    # Trade journal
+    journal_backend: str = "jsonl"  # "jsonl" or "sqlite" (WAL mode)
+    journal_path: str = "trade_history.json"
+    journal_fsync: str = "interval"  # "batch", "interval" or "never"
+    journal_rotate_mb: float = 0  # Rotate the JSONL file at this size (0 disables)
+    journal_rotate_daily: bool = False
+    metrics_window: int = 50  # Closed trades in each rolling metrics window
+    history_trades: int = 1000  # Most recent trades kept in memory (the journal keeps all)
+    metrics_port: int = int(os.getenv('METRICS_PORT', '0'))  # Serve Prometheus /metrics here (0 disables)
+    
+    # State snapshot
+    state_snapshot: bool = True  # Restore bias, stakes, candles and trades on restart
+    state_path: str = "bot_state.json.gz"
+    state_interval: int = 300  # Seconds between snapshots
+    state_trades: int = 500  # Most recent trades kept in the snapshot
+    
+    # Scan configuration
+    concurrent_scan: bool = True  # Evaluate symbols in parallel
+    max_concurrent_symbols: int = 8  # Upper bound on in-flight symbol evaluations
+    trade_cooldown: int = 900  # Seconds before a symbol may trade again
+    candle_cache: bool = True  # Fetch only new bars after the first backfill
+    streaming_indicators: bool = True  # Update indicators incrementally per closed bar
+    batch_indicators: bool = False  # Compute indicators for all pairs as one NumPy panel
+    lazy_patterns: bool = True  # Evaluate only the last bar's patterns for the current bias
+    tick_streaming: bool = True  # Build bars from tick subscriptions instead of polling
+    proposal_streams: bool = True  # Keep proposals warm for pairs close to a signal
+    max_proposal_streams: int = 5  # Open proposal subscriptions at once
+    proposal_arm_adx: float = 20.0  # ADX at which a trending pair's proposal is pre-warmed
     
     # Multi-pair configuration
     trading_pairs: List[str] = field(default_factory=lambda: [
@@ -60,10 +118,10 @@ class BotConfig:
     ])
 
 # --- TRADE HISTORY & PERFORMANCE TRACKING ---
-@dataclass
+@dataclass(slots=True)
 class TradeRecord:
-    """Record of a single trade"""
-    timestamp: datetime
+    """Record of a single trade (timestamps in epoch seconds)"""
+    timestamp: float
     symbol: str
     direction: str  # "BULLISH" or "BEARISH"
     entry_price: float
@@ -72,13 +130,14 @@ class TradeRecord:
     take_profit: float
     status: str = "OPEN"  # "OPEN", "WON", "LOST", "CANCELLED"
     exit_price: Optional[float] = None
-    exit_timestamp: Optional[datetime] = None
+    exit_timestamp: Optional[float] = None
     profit_loss: Optional[float] = None
+    contract_id: Optional[int] = None  # Deriv contract bought for this trade
     
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
         return {
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
             'symbol': self.symbol,
             'direction': self.direction,
             'entry_price': self.entry_price,
@@ -87,10 +146,20 @@ class TradeRecord:
             'take_profit': self.take_profit,
             'status': self.status,
             'exit_price': self.exit_price,
-            'exit_timestamp': self.exit_timestamp.isoformat() if self.exit_timestamp else None,
-            'profit_loss': self.profit_loss
+            'exit_timestamp': datetime.fromtimestamp(self.exit_timestamp).isoformat() if self.exit_timestamp else None,
+            'profit_loss': self.profit_loss,
+            'contract_id': self.contract_id
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TradeRecord':
+        """Rebuild a record produced by ``to_dict``"""
+        data = dict(data)
+        data['timestamp'] = datetime.fromisoformat(data['timestamp']).timestamp()
+        if data.get('exit_timestamp'):
+            data['exit_timestamp'] = datetime.fromisoformat(data['exit_timestamp']).timestamp()
+        return cls(**data)
+
 
 class DerivTradingBot:
     """Multi-pair trading bot with sentiment analysis and advanced pattern detection"""
@@ -105,74 +174,97 @@ class DerivTradingBot:
         self.api: Optional[DerivAPI] = None
         self.bias: Dict[str, str] = {}  # Bias per symbol
         self.stakes: Dict[str, float] = {}  # Dynamic stake per symbol
+        self.account = AccountState(self._fetch_balance, ttl=config.balance_ttl)
+        self.account.on_update(self._resize_stakes)
         self.trade_history: List[TradeRecord] = []
-        self.last_sentiment_check: Optional[datetime] = None
-        self.cached_sentiment: float = 0.0
+        self.open_contracts: Dict[int, TradeRecord] = {}  # Bought contracts awaiting settlement
+        self._contract_streams: Dict[int, Callable[[], None]] = {}
+        self.performance = PerformanceTracker(window=config.metrics_window)
+        self.journal = TradeJournal(
+            create_backend(config.journal_backend, config.journal_path,
+                           max_bytes=int(config.journal_rotate_mb * 1024 * 1024),
+                           daily=config.journal_rotate_daily),
+            fsync=config.journal_fsync
+        )
+        self.sentiment = SentimentService(
+            NewsClient(config.news_api_key, timeout=config.news_timeout,
+                       page_size=config.news_page_size, stub_path=config.news_api_stub or None),
+            refresh_interval=config.news_cache_minutes * 60,
+            scorer=SentimentScorer(config.trading_pairs)
+        )
+        self.rate_limiter = TokenBucket(config.api_rate_limit, config.api_burst)
+        self.scheduler = RequestScheduler(config.api_max_inflight, limits={
+            PRIORITY_ACCOUNT: TokenBucket(config.api_account_rate, 5),
+            PRIORITY_DATA: self.rate_limiter,
+        })
+        self.cooldown_until: Dict[str, float] = {}  # Monotonic deadline per symbol
+        self._scan_semaphore = asyncio.Semaphore(max(1, config.max_concurrent_symbols))
+        self.candle_cache = CandleCache(self._ticks_history)
+        self.indicators = StreamingIndicators(config)
+        self.market_stream = MarketStream(self._subscribe_ticks, granularities=(60, 900))
+        self.market_stream.on_bar_close(self.on_bar_closed, 900)
+        self.market_stream.on_bar_close(self._on_minute_bar, 60)
+        self._bias_month: Dict[str, str] = {}
+        self.state = StateStore(config.state_path, interval=config.state_interval)
+        self.proposals = ProposalStreams(self._subscribe_proposal, max_streams=config.max_proposal_streams)
         logger.info(f"Trading Bot initialized with {len(config.trading_pairs)} pairs")
 
     async def get_market_sentiment(self) -> float:
-        """Fetch and analyze market sentiment with caching
+        """Return the cached market sentiment without waiting on the network
+        
+        The score is refreshed by a background task; when it is stale the
+        previous value is served while a refresh runs.
         
         Returns:
             float: Sentiment score from -1.0 to +1.0
         """
-        # Return cached sentiment if fresh
-        if self.last_sentiment_check:
-            time_diff = datetime.now() - self.last_sentiment_check
-            if time_diff.total_seconds() < self.config.news_cache_minutes * 60:
-                logger.debug(f"Using cached sentiment: {self.cached_sentiment:.2f}")
-                return self.cached_sentiment
-        
-        try:
-            if not self.config.news_api_key:
-                logger.warning("News API key not configured, using neutral sentiment")
-                return 0.0
-            
-            url = "https://newsapi.org/v2/everything"
-            params = {
-                "q": "stock market forex",
-                "language": "en",
-                "sortBy": "publishedAt",
-                "apiKey": self.config.news_api_key,
-                "pageSize": 10,
-            }
-            response = requests.get(url, params, timeout=10)
-            articles = response.json().get("articles", [])
+        reading = self.sentiment.read()
+        if reading.stale and reading.age is not None:
+            logger.debug(f"Serving stale sentiment {reading.score:.2f} ({reading.age:.0f}s old)")
+        return reading.score
 
-            if not articles:
-                logger.warning("No articles found for sentiment analysis")
-                return 0.0
-            
-            # Simple sentiment analysis based on keywords
-            positive_keywords = ['bullish', 'surge', 'gain', 'rally', 'growth', 'up']
-            negative_keywords = ['bearish', 'decline', 'loss', 'fall', 'crash', 'down']
-            
-            compound_score = 0
-            for article in articles:
-                title = article['title'].lower()
-                for keyword in positive_keywords:
-                    if keyword in title:
-                        compound_score += 0.5
-                for keyword in negative_keywords:
-                    if keyword in title:
-                        compound_score -= 0.5
-            
-            avg_sentiment = compound_score / len(articles)
-            avg_sentiment = max(-1.0, min(1.0, avg_sentiment))  # Clamp to [-1, 1]
-            
-            self.cached_sentiment = avg_sentiment
-            self.last_sentiment_check = datetime.now()
-            
-            logger.info(f"Market Sentiment Updated: {avg_sentiment:.2f}")
-            return avg_sentiment
+    async def _fetch_balance(self) -> float:
+        """Request the account balance once"""
+        account_status = await self.scheduler.submit(PRIORITY_ACCOUNT, self.api.balance)
+        return account_status['balance']['balance']
+
+    async def _subscribe_balance(self, on_balance: Callable[[float], None],
+                                 on_error: Callable[[Exception], None]) -> Callable[[], None]:
+        """Subscribe to balance updates, returning the cancel callable"""
+        source = await self.scheduler.submit(PRIORITY_ACCOUNT, self.api.subscribe, {"balance": 1})
+        subscription = source.subscribe(lambda msg: on_balance(msg['balance']['balance']), on_error)
+        return subscription.dispose
+
+    def _resize_stakes(self, balance: float) -> None:
+        """Size every pair's stake from a new balance snapshot"""
+        self.stakes.update(size_stakes(balance, self.config.trading_pairs, self.config.risk_percent))
+        stake = self.stakes[self.config.trading_pairs[0]] if self.config.trading_pairs else 0.0
+        logger.info(f"Balance: ${balance:.2f}, Stake: ${stake:.2f} for {len(self.config.trading_pairs)} pairs")
+
+    async def start_account_tracking(self) -> None:
+        """Subscribe to balance updates (TTL polling if unavailable) and size all stakes"""
+        if self.config.balance_subscription:
+            await self.account.subscribe(self._subscribe_balance)
+        await self.update_all_stakes()
+
+    async def update_all_stakes(self) -> Dict[str, float]:
+        """Size stakes for every pair from one balance snapshot
         
-        except Exception as e:
-            logger.error(f"Error fetching sentiment: {e}")
-            return 0.0
+        Returns:
+            Dict[str, float]: Stake per symbol
+        """
+        if await self.account.get_balance() is None:
+            logger.error("Error calculating stakes: balance unavailable")
+            for symbol in self.config.trading_pairs:
+                self.stakes.setdefault(symbol, 1.0)
+        return self.stakes
 
     async def calculate_dynamic_stake(self, symbol: str, risk_percent: Optional[float] = None) -> float:
         """Calculate position size based on account balance and risk percentage
         
+        Uses the shared account balance, so repeated calls within the TTL
+        (or while subscribed) cost no API request.
+        
         Args:
             symbol: Trading symbol
             risk_percent: Risk percentage (uses config default if None)
@@ -184,14 +276,11 @@ class DerivTradingBot:
             if risk_percent is None:
                 risk_percent = self.config.risk_percent
             
-            account_status = await self.api.balance()
-            balance = account_status['balance']['balance']
-
-            stake = round(balance * risk_percent, 2)
-            
-            if stake < 1.0:
-                stake = 1.0
+            balance = await self.account.get_balance()
+            if balance is None:
+                raise ValueError("balance unavailable")
 
+            stake = size_stakes(balance, [symbol], risk_percent)[symbol]
             self.stakes[symbol] = stake
             logger.info(f"[{symbol}] Balance: ${balance:.2f}, Stake: ${stake:.2f}")
             return stake
@@ -211,10 +300,183 @@ class DerivTradingBot:
         except Exception as e:
             logger.error(f"Connection error: {e}")
             raise
+        # Streams of the previous connection are gone; proposals re-arm on the next evaluation
+        await self.proposals.close()
+        await self.market_stream.resubscribe()
+        await self.account.resubscribe()
+        await self.track_open_contracts()
+
+    async def track_contract(self, trade: TradeRecord) -> None:
+        """Follow a bought contract and settle its trade once it is sold"""
+        contract_id = trade.contract_id
+        source = await self.scheduler.submit(PRIORITY_ACCOUNT, self.api.subscribe, {
+            "proposal_open_contract": 1,
+            "contract_id": contract_id
+        })
+        subscription = source.subscribe(
+            lambda msg: self._on_contract_update(trade, msg['proposal_open_contract'])
+        )
+        self._contract_streams[contract_id] = subscription.dispose
+        if contract_id not in self.open_contracts:
+            # Settled by the first update
+            self._contract_streams.pop(contract_id)()
+
+    async def track_open_contracts(self) -> int:
+        """(Re)subscribe to every contract still awaiting settlement
+        
+        Returns:
+            int: Number of contracts tracked
+        """
+        self.stop_contract_tracking()
+        tracked = 0
+        for trade in list(self.open_contracts.values()):
+            try:
+                await self.track_contract(trade)
+                tracked += 1
+            except Exception as e:
+                logger.error(f"[{trade.symbol}] Could not track contract {trade.contract_id}: {e}")
+        return tracked
+
+    def stop_contract_tracking(self) -> None:
+        """Cancel all contract subscriptions"""
+        for dispose in self._contract_streams.values():
+            try:
+                dispose()
+            except Exception as e:
+                logger.debug(f"Error cancelling contract stream: {e}")
+        self._contract_streams.clear()
+
+    def _on_contract_update(self, trade: TradeRecord, contract: Dict) -> None:
+        """Settle the trade when Deriv reports its contract as sold"""
+        if not contract.get('is_sold') or trade.contract_id not in self.open_contracts:
+            return
+        del self.open_contracts[trade.contract_id]
+        dispose = self._contract_streams.pop(trade.contract_id, None)
+        if dispose:
+            dispose()
+        profit = float(contract.get('profit') or 0.0)
+        if contract.get('status') == 'cancelled':
+            status = "CANCELLED"
+        else:
+            status = "WON" if profit > 0 else "LOST"
+        exit_price = contract.get('exit_tick', contract.get('sell_spot'))
+        self.close_trade(trade, status, float(exit_price) if exit_price is not None else None, profit)
+        logger.info(f"[{trade.symbol}] Contract {trade.contract_id} {status}: {profit:+.2f}")
+
+    async def _ticks_history(self, payload: Dict) -> Dict:
+        """Issue a ticks_history request on the current API connection"""
+        return await self.scheduler.submit(PRIORITY_DATA, self.api.ticks_history, payload)
+
+    async def _subscribe_ticks(self, symbol: str, on_tick: Callable[[float, float], None],
+                               on_error: Callable[[Exception], None]) -> Callable[[], None]:
+        """Subscribe to a Deriv tick stream, returning its cancel callable"""
+        source = await self.scheduler.submit(PRIORITY_DATA, self.api.subscribe, {"ticks": symbol})
+        subscription = source.subscribe(
+            lambda msg: on_tick(msg['tick']['epoch'], float(msg['tick']['quote'])), on_error
+        )
+        return subscription.dispose
+
+    async def _subscribe_proposal(self, payload: Dict, on_proposal: Callable[[Dict], None]) -> Callable[[], None]:
+        """Subscribe to proposal updates, returning the cancel callable"""
+        source = await self.scheduler.submit(PRIORITY_ACCOUNT, self.api.subscribe, {**payload, "subscribe": 1})
+        subscription = source.subscribe(lambda msg: on_proposal(msg['proposal']))
+        return subscription.dispose
+
+    def _proposal_payload(self, symbol: str, direction: str, stake: float) -> Dict:
+        """Proposal request for a trade"""
+        return {
+            "proposal": 1,
+            "amount": stake,
+            "symbol": symbol,
+            "contract_type": "CALL" if direction == "BULLISH" else "PUT",
+            "currency": "USD",
+            "multiplier": 1
+        }
+
+    def near_signal(self, bias: str, sentiment: float, last_row: pd.Series) -> bool:
+        """Check whether every condition but the pattern is (almost) met
+        
+        Args:
+            bias: Symbol bias
+            sentiment: Sentiment score used for the symbol
+            last_row: Last bar with indicator values
+            
+        Returns:
+            bool: True if a pattern on a coming bar would likely trigger a trade
+        """
+        if last_row.get('ADX', 0) <= self.config.proposal_arm_adx:
+            return False
+        if bias == "BULLISH":
+            return sentiment > -self.config.sentiment_threshold and last_row.get('RSI', 50) < 70
+        if bias == "BEARISH":
+            return sentiment < self.config.sentiment_threshold and last_row.get('RSI', 50) > 30
+        return False
+
+    async def update_proposal_stream(self, symbol: str, bias: str, sentiment: float,
+                                     last_row: pd.Series) -> None:
+        """Arm or disarm a symbol's pre-warmed proposal after evaluation"""
+        try:
+            if self.near_signal(bias, sentiment, last_row):
+                stake = self.stakes.get(symbol, 1.0)
+                payload = self._proposal_payload(symbol, bias, stake)
+                await self.proposals.arm(symbol, payload['contract_type'], stake, payload)
+            elif symbol in self.proposals.streams:
+                await self.proposals.disarm(symbol)
+        except Exception as e:
+            logger.error(f"[{symbol}] Error updating proposal stream: {e}")
+
+    async def start_market_stream(self) -> int:
+        """Subscribe to the tick stream of every configured pair
+        
+        Returns:
+            int: Number of pairs streaming
+        """
+        results = await asyncio.gather(*(
+            self.market_stream.subscribe(symbol) for symbol in self.config.trading_pairs
+        ))
+        streaming = sum(1 for ok in results if ok)
+        logger.info(f"Streaming {streaming}/{len(results)} pairs, polling the rest")
+        return streaming
+
+    async def on_bar_closed(self, bar: Bar) -> None:
+        """Evaluate a pair when its 15-minute bar closes on the tick stream
+        
+        Args:
+            bar: Closed 15-minute bar
+        """
+        symbol = bar.symbol
+        
+        # Monthly bias only changes when a bar opens a new month
+        month = time.strftime('%Y-%m', time.gmtime(bar.epoch))
+        if self._bias_month.get(symbol) != month:
+            if symbol in self._bias_month:
+                await self.update_symbol_bias(symbol)
+            self._bias_month[symbol] = month
+        
+        # The first streamed bar missed earlier ticks, so reconcile it with the API
+        if bar.partial or not self.candle_cache.push(symbol, 900, [bar.to_candle()]):
+            df = await self.get_candles(symbol, 900, self.config.min_candles)
+        else:
+            df = self.candle_cache.peek(symbol, 900, self.config.min_candles)
+            if df is not None and len(df) < self.config.min_candles:
+                df = None
+        if df is None:
+            return
+        
+        sentiment = await self.get_market_sentiment()
+        await self._process_symbol_bounded(symbol, sentiment, df)
+
+    async def _on_minute_bar(self, bar: Bar) -> None:
+        """Keep any cached 1-minute candles current from the tick stream"""
+        if not bar.partial:
+            self.candle_cache.push(bar.symbol, 60, [bar.to_candle()])
 
     async def get_candles(self, symbol: str, granularity: int, count: int) -> Optional[pd.DataFrame]:
         """Fetch historical candle data
         
+        Served from the per-symbol candle cache when enabled, so only bars
+        newer than the last cached epoch are requested after the first call.
+        
         Args:
             symbol: Trading symbol
             granularity: Time period in seconds
@@ -224,26 +486,33 @@ class DerivTradingBot:
             Optional[pd.DataFrame]: Candle data or None on error
         """
         try:
-            payload = {
-                "ticks_history": symbol,
-                "count": count,
-                "end": "latest",
-                "granularity": granularity,
-                "style": "candles"
-            }
-            res = await self.api.ticks_history(payload)
-            
-            if 'candles' not in res or not res['candles']:
-                logger.warning(f"[{symbol}] No candle data received")
-                return None
-            
-            df = pd.DataFrame(res['candles'])
-            for col in ['open', 'high', 'low', 'close']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            df = df.dropna()
+            if self.config.candle_cache:
+                df = await self.candle_cache.get(symbol, granularity, count)
+                if df is None:
+                    logger.warning(f"[{symbol}] No candle data received")
+                    return None
+            else:
+                payload = {
+                    "ticks_history": symbol,
+                    "count": count,
+                    "end": "latest",
+                    "granularity": granularity,
+                    "style": "candles"
+                }
+                res = await self._ticks_history(payload)
+                
+                if 'candles' not in res or not res['candles']:
+                    logger.warning(f"[{symbol}] No candle data received")
+                    return None
+                
+                df = pd.DataFrame(res['candles'])
+                for col in ['open', 'high', 'low', 'close']:
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                
+                df = df.dropna()
             
-            if len(df) < self.config.min_candles:
+            # Short requests (entry price, monthly bias) need only what they asked for
+            if len(df) < min(count, self.config.min_candles):
                 logger.warning(f"[{symbol}] Insufficient candles: {len(df)}")
                 return None
                 
@@ -252,6 +521,86 @@ class DerivTradingBot:
             logger.error(f"[{symbol}] Error fetching candles: {e}")
             return None
     
+    def snapshot_state(self) -> None:
+        """Copy the warm state into the snapshot store with validity windows"""
+        now = time.time()
+        month_end = next_month_start(now)
+        for symbol, bias in self.bias.items():
+            # NEUTRAL only means the fetch failed, so it is never persisted
+            if bias in ("BULLISH", "BEARISH"):
+                self.state.put(f"bias:{symbol}", bias, valid_until=month_end)
+        self.state.put("stakes", dict(self.stakes), valid_until=now + 3600)
+        self.state.put("candles", self.candle_cache.export(), valid_until=now + 86400)
+        recent = self.trade_history[-self.config.state_trades:]
+        self.state.put("trades", [t.to_dict() for t in recent])
+        self.state.put("performance", self.performance.to_state())
+
+    def restore_state(self) -> int:
+        """Restore warm state from the last snapshot
+        
+        Returns:
+            int: Number of pairs whose bias was restored
+        """
+        if not self.state.load():
+            return 0
+        month = time.strftime('%Y-%m', time.gmtime())
+        restored = 0
+        for symbol in self.config.trading_pairs:
+            bias = self.state.get(f"bias:{symbol}")
+            if bias:
+                self.bias[symbol] = bias
+                self._bias_month[symbol] = month
+                restored += 1
+        self.stakes.update(self.state.get("stakes", {}))
+        try:
+            self.candle_cache.restore(self.state.get("candles", {}))
+            self.trade_history = [TradeRecord.from_dict(t) for t in self.state.get("trades", [])]
+            self.open_contracts = {
+                t.contract_id: t for t in self.trade_history if t.status == "OPEN" and t.contract_id
+            }
+            performance = self.state.get("performance")
+            if performance:
+                self.performance = PerformanceTracker.from_state(performance)
+        except Exception as e:
+            logger.warning(f"Could not restore trade state: {e}")
+        logger.info(f"Restored bias for {restored}/{len(self.config.trading_pairs)} pairs, "
+                    f"{len(self.candle_cache.buffers)} candle buffers, {len(self.trade_history)} trades")
+        return restored
+
+    async def warm_up(self) -> float:
+        """Initialize account tracking and every pair's bias concurrently
+        
+        Requests are paced by the shared rate limiter, so the whole
+        symbol list warms up in roughly one rate-limit window. Pairs whose
+        bias was restored from the state snapshot are not fetched again.
+        
+        Returns:
+            float: Warm-up time in seconds
+        """
+        started = time.monotonic()
+        pending = [s for s in self.config.trading_pairs if s not in self.bias]
+        total = len(pending)
+        step = max(1, total // 4)
+        done = 0
+        
+        async def init_symbol(symbol: str) -> None:
+            try:
+                await self.update_symbol_bias(symbol)
+            except Exception as e:
+                logger.error(f"[{symbol}] Failed to initialize: {e}")
+        
+        account = asyncio.ensure_future(self.start_account_tracking())
+        for task in asyncio.as_completed([init_symbol(s) for s in pending]):
+            await task
+            done += 1
+            if done % step == 0 or done == total:
+                logger.info(f"Warm-up: {done}/{total} pairs initialized")
+        await account
+        
+        elapsed = time.monotonic() - started
+        logger.info(f"Warm-up complete in {elapsed:.2f}s")
+        return elapsed
+
     async def update_symbol_bias(self, symbol: str) -> None:
         """Update trend bias for a symbol using monthly candles
         
@@ -324,8 +673,9 @@ class DerivTradingBot:
         """
         try:
             # Reversal Patterns
-            df['Bullish_Engulfing'] = talib.CDLENGULFING(df['open'], df['high'], df['low'], df['close'])
-            df['Bearish_Engulfing'] = talib.CDLENGULFING(df['open'], df['high'], df['low'], df['close']) * -1
+            engulfing = talib.CDLENGULFING(df['open'], df['high'], df['low'], df['close'])
+            df['Bullish_Engulfing'] = engulfing
+            df['Bearish_Engulfing'] = engulfing * -1
             df['Hammer'] = talib.CDLHAMMER(df['open'], df['high'], df['low'], df['close'])
             df['Shooting_Star'] = talib.CDLSHOOTINGSTAR(df['open'], df['high'], df['low'], df['close']) * -1
             df['Piercing_Line'] = talib.CDLPIERCING(df['open'], df['high'], df['low'], df['close'])
@@ -342,40 +692,66 @@ class DerivTradingBot:
             logger.error(f"Error detecting patterns: {e}")
             return df
     def save_trade(self, trade: TradeRecord) -> None:
-        """Save trade to history and file
+        """Save trade to history and queue it for the journal
+        
+        The journal writes in batches on a background task, so this does
+        no disk I/O on the execution path.
         
         Args:
             trade: TradeRecord to save
         """
         self.trade_history.append(trade)
+        excess = len(self.trade_history) - self.config.history_trades
+        if excess > 0:
+            del self.trade_history[:excess]
+        if trade.status == "OPEN":
+            self.performance.record_open(trade.symbol)
         try:
-            with open('trade_history.json', 'a') as f:
-                f.write(json.dumps(trade.to_dict()) + '\n')
+            self.journal.append(trade.to_dict())
             logger.info(f"Trade saved: {trade.symbol} - {trade.direction}")
         except Exception as e:
             logger.error(f"Error saving trade: {e}")
 
+    def close_trade(self, trade: TradeRecord, status: str, exit_price: Optional[float] = None,
+                    profit_loss: Optional[float] = None) -> None:
+        """Mark a trade as settled and update the performance metrics
+        
+        Args:
+            trade: Open TradeRecord
+            status: "WON", "LOST" or "CANCELLED"
+            exit_price: Settlement price
+            profit_loss: Realised profit or loss
+        """
+        if trade.status != "OPEN":
+            return
+        trade.status = status
+        trade.exit_price = exit_price
+        trade.exit_timestamp = time.time()
+        trade.profit_loss = profit_loss
+        self.performance.record_close(trade.symbol, status, profit_loss)
+        try:
+            self.journal.append(trade.to_dict())
+        except Exception as e:
+            logger.error(f"Error saving trade: {e}")
+
     def get_performance_metrics(self) -> Dict:
-        """Calculate performance metrics from trade history
+        """Performance metrics from the running totals
         
         Returns:
             Dict: Performance metrics
         """
-        if not self.trade_history:
-            return {"total_trades": 0, "win_rate": 0, "total_profit": 0}
-        
-        closed_trades = [t for t in self.trade_history if t.status in ['WON', 'LOST']]
-        won_trades = [t for t in closed_trades if t.status == 'WON']
-        
-        total_profit = sum(t.profit_loss for t in closed_trades if t.profit_loss)
-        win_rate = len(won_trades) / len(closed_trades) if closed_trades else 0
+        return self.performance.summary()
+
+    def get_symbol_metrics(self, symbol: str) -> Dict:
+        """Rolling-window performance metrics for one symbol
         
-        return {
-            "total_trades": len(closed_trades),
-            "win_rate": f"{win_rate * 100:.2f}%",
-            "total_profit": f"${total_profit:.2f}",
-            "open_trades": len(self.trade_history) - len(closed_trades)
-        }
+        Args:
+            symbol: Trading symbol
+            
+        Returns:
+            Dict: Trades, win rate, profit and Sharpe over the window
+        """
+        return self.performance.symbol_metrics(symbol)
 
     async def run_multi_pair_strategy(self) -> None:
         """Main strategy loop for scanning multiple pairs
@@ -384,51 +760,186 @@ class DerivTradingBot:
         """
         logger.info(f"Starting multi-pair strategy for {len(self.config.trading_pairs)} pairs")
         
+        self.sentiment.start()
+        if self.config.tick_streaming:
+            await self.start_market_stream()
+        
         while True:
             try:
+                loop_started = time.perf_counter()
+                
                 # Get sentiment once per loop (cached for efficiency)
                 current_sentiment = await self.get_market_sentiment()
                 
-                # Scan all pairs
-                for symbol in self.config.trading_pairs:
-                    try:
-                        await self.process_symbol(symbol, current_sentiment)
-                    except Exception as e:
-                        logger.error(f"[{symbol}] Error processing: {e}")
-                        continue
+                # Streamed pairs are evaluated on bar close; poll the rest
+                streaming = set(self.market_stream.live_symbols)
+                polled = [s for s in self.config.trading_pairs if s not in streaming]
+                if polled:
+                    await self.scan_symbols(current_sentiment, polled)
                 
                 # Log performance every hour
-                if len(self.trade_history) % 10 == 0 and self.trade_history:
+                if self.performance.opened % 10 == 0 and self.performance.opened:
                     metrics = self.get_performance_metrics()
                     logger.info(f"Performance Metrics: {metrics}")
                 
+                LOOP_SECONDS.observe(time.perf_counter() - loop_started)
                 await asyncio.sleep(self.config.check_interval)
                 
             except Exception as e:
                 logger.error(f"Error in strategy loop: {e}")
                 await asyncio.sleep(10)
 
-    async def process_symbol(self, symbol: str, sentiment: float) -> None:
+    async def scan_symbols(self, sentiment: float, symbols: Optional[List[str]] = None) -> None:
+        """Evaluate every configured pair once
+        
+        In concurrent mode the pairs are processed in parallel, bounded by
+        ``max_concurrent_symbols``; otherwise they are processed in order.
+        
+        Args:
+            sentiment: Current market sentiment score
+            symbols: Pairs to scan (all configured pairs if None)
+        """
+        if symbols is None:
+            symbols = self.config.trading_pairs
+        
+        if self.config.batch_indicators:
+            await self.scan_symbols_batch(sentiment, symbols)
+            return
+        
+        if not self.config.concurrent_scan:
+            for symbol in symbols:
+                await self._process_symbol_safe(symbol, sentiment)
+            return
+        
+        await asyncio.gather(*(
+            self._process_symbol_bounded(symbol, sentiment)
+            for symbol in symbols
+        ))
+
+    async def scan_symbols_batch(self, sentiment: float, symbols: Optional[List[str]] = None) -> None:
+        """Evaluate every configured pair with one vectorized indicator pass
+        
+        Candles for all pairs are fetched first, stacked into an
+        IndicatorPanel and computed together; each pair is then evaluated
+        against its row of the panel.
+        
+        Args:
+            sentiment: Current market sentiment score
+            symbols: Pairs to scan (all configured pairs if None)
+        """
+        if symbols is None:
+            symbols = self.config.trading_pairs
+        symbols = [s for s in symbols if not self.in_cooldown(s)]
+        results = await asyncio.gather(*(self._get_candles_bounded(s) for s in symbols))
+        frames = {s: df for s, df in zip(symbols, results) if df is not None and len(df) >= 2}
+        if not frames:
+            return
+        
+        try:
+            panel = IndicatorPanel.from_frames(frames).compute_from_config(self.config)
+        except Exception as e:
+            logger.error(f"Error calculating indicator panel: {e}")
+            return
+        
+        await asyncio.gather(*(
+            self._process_symbol_bounded(symbol, sentiment, df, panel.row(symbol))
+            for symbol, df in frames.items()
+        ))
+
+    async def _get_candles_bounded(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Fetch 15-minute candles while holding a slot of the scan semaphore"""
+        async with self._scan_semaphore:
+            return await self.get_candles(symbol, 900, self.config.min_candles)
+
+    async def _process_symbol_bounded(self, symbol: str, sentiment: float, *args) -> None:
+        """Process a symbol while holding a slot of the scan semaphore"""
+        async with self._scan_semaphore:
+            await self._process_symbol_safe(symbol, sentiment, *args)
+
+    async def _process_symbol_safe(self, symbol: str, sentiment: float, *args) -> None:
+        """Process a symbol, logging instead of raising on failure"""
+        try:
+            with SYMBOL_SECONDS.time(symbol=symbol):
+                await self.process_symbol(symbol, sentiment, *args)
+        except Exception as e:
+            logger.error(f"[{symbol}] Error processing: {e}")
+
+    def in_cooldown(self, symbol: str) -> bool:
+        """Check whether a symbol is still cooling down after a trade
+        
+        Args:
+            symbol: Trading symbol
+            
+        Returns:
+            bool: True if the symbol must not trade yet
+        """
+        deadline = self.cooldown_until.get(symbol)
+        if deadline is None:
+            return False
+        if time.monotonic() >= deadline:
+            del self.cooldown_until[symbol]
+            return False
+        return True
+
+    async def process_symbol(self, symbol: str, sentiment: float,
+                             df_15min: Optional[pd.DataFrame] = None,
+                             indicator_row: Optional[Dict[str, float]] = None) -> None:
         """Process a single symbol for trading signals
         
         Args:
             symbol: Trading symbol to analyze
             sentiment: Current market sentiment score
+            df_15min: Pre-fetched 15-minute candles (fetched if None)
+            indicator_row: Pre-computed indicators for the last bar (computed if None)
         """
+        # Skip symbols that traded recently to avoid double entries
+        if self.in_cooldown(symbol):
+            logger.debug(f"[{symbol}] In cooldown, skipping")
+            return
+        
+        stages = STAGE_SECONDS.stages()
+        
         # Fetch and analyze data
-        df_15min = await self.get_candles(symbol, 900, self.config.min_candles)
+        if df_15min is None:
+            df_15min = await self.get_candles(symbol, 900, self.config.min_candles)
+        stages.mark('candles')
         if df_15min is None or len(df_15min) < 2:
             return
         
-        df_15min = self.detect_patterns(df_15min)
-        df_15min = self.calculate_indicators(df_15min)
-        last_row = df_15min.iloc[-1]
-        
         # Get symbol bias
         if symbol not in self.bias:
             await self.update_symbol_bias(symbol)
         
         current_bias = self.bias.get(symbol, "NEUTRAL")
+        stages.mark('bias')
+        
+        # Prefer the score of articles mentioning this pair over the market-wide one
+        if self.config.per_symbol_sentiment:
+            sentiment = self.sentiment.read(symbol).score
+        stages.mark('sentiment')
+        
+        # Only the patterns for the current bias are needed on the last bar
+        if self.config.lazy_patterns:
+            pattern_row = PatternEvaluator.evaluate(df_15min, current_bias)
+        else:
+            df_15min = self.detect_patterns(df_15min)
+            pattern_row = {}
+        stages.mark('patterns')
+        
+        if indicator_row is None and self.config.streaming_indicators:
+            indicator_row = self.indicators.sync(symbol, df_15min)
+        
+        if indicator_row is not None:
+            last_row = df_15min.iloc[-1].copy()
+            for name, value in indicator_row.items():
+                last_row[name] = value
+        else:
+            df_15min = self.calculate_indicators(df_15min)
+            last_row = df_15min.iloc[-1].copy()
+        
+        for name, value in pattern_row.items():
+            last_row[name] = value
+        stages.mark('indicators')
         
         # Signal detection with confluence
         signal_found = False
@@ -466,6 +977,7 @@ class DerivTradingBot:
                         if last_row.get('ADX', 0) > 25:  # Strong trend
                             signal_found = True
                             signal_type = "BEARISH"
+        stages.mark('signal')
         
         # Execute trade if signal found
         if signal_found and signal_type:
@@ -474,7 +986,14 @@ class DerivTradingBot:
             
             sl, tp = self.calculate_atr_limits(df_15min, symbol)
             await self.execute_trade(symbol, signal_type, sl, tp)
-            await asyncio.sleep(900)  # Avoid double entries
+            # Avoid double entries without blocking the other pairs
+            self.cooldown_until[symbol] = time.monotonic() + self.config.trade_cooldown
+            if symbol in self.proposals.streams:
+                await self.proposals.disarm(symbol)
+            stages.mark('execute')
+        elif self.config.proposal_streams:
+            await self.update_proposal_stream(symbol, current_bias, sentiment, last_row)
+            stages.mark('proposal_stream')
 
     async def execute_trade(self, symbol: str, direction: str, sl: float, tp: float) -> None:
         """Execute a trade with proper error handling and retry logic
@@ -486,19 +1005,22 @@ class DerivTradingBot:
             tp: Take profit amount
         """
         try:
+            stages = STAGE_SECONDS.stages()
             stake = self.stakes.get(symbol, 1.0)
             
-            # Get current price for entry
-            df = await self.get_candles(symbol, 60, 1)
-            if df is None or len(df) < 1:
-                logger.warning(f"[{symbol}] Could not get entry price")
-                return
-            
-            entry_price = df.iloc[-1]['close']
+            # Latest streamed tick, falling back to the last 1-minute candle
+            entry_price = self.market_stream.last_price(symbol)
+            if entry_price is None:
+                df = await self.get_candles(symbol, 60, 1)
+                if df is None or len(df) < 1:
+                    logger.warning(f"[{symbol}] Could not get entry price")
+                    return
+                entry_price = df.iloc[-1]['close']
+            stages.mark('order_entry_price')
             
             # Create trade record
             trade = TradeRecord(
-                timestamp=datetime.now(),
+                timestamp=time.time(),
                 symbol=symbol,
                 direction=direction,
                 entry_price=entry_price,
@@ -507,22 +1029,20 @@ class DerivTradingBot:
                 take_profit=tp
             )
             
-            # Attempt to get proposal
+            # Use the pre-warmed proposal if one matches, else request it
             try:
-                proposal = await self.api.proposal({
-                    "proposal": 1,
-                    "amount": stake,
-                    "symbol": symbol,
-                    "contract_type": "CALL" if direction == "BULLISH" else "PUT",
-                    "currency": "USD",
-                    "multiplier": 1
-                })
-                
-                proposal_id = proposal['proposal']['id']
-                ask_price = proposal['proposal']['ask_price']
+                payload = self._proposal_payload(symbol, direction, stake)
+                warm = self.proposals.take(symbol, payload['contract_type'], stake)
+                if warm:
+                    proposal_id, ask_price = warm
+                else:
+                    proposal = await self.scheduler.submit(PRIORITY_ORDER, self.api.proposal, payload)
+                    proposal_id = proposal['proposal']['id']
+                    ask_price = proposal['proposal']['ask_price']
+                stages.mark('order_proposal_warm' if warm else 'order_proposal')
                 
                 # Execute trade
-                buy_res = await self.api.buy({
+                buy_res = await self.scheduler.submit(PRIORITY_ORDER, self.api.buy, {
                     "buy": proposal_id,
                     "price": ask_price,
                     "limit_order": {
@@ -530,20 +1050,33 @@ class DerivTradingBot:
                         "take_profit": tp
                     }
                 })
+                stages.mark('order_buy')
                 
                 trade.status = "OPEN"
+                trade.contract_id = buy_res['buy']['contract_id']
                 self.save_trade(trade)
                 logger.info(f"[{symbol}] Trade Executed - {direction} at {entry_price:.4f}")
                 
+                self.open_contracts[trade.contract_id] = trade
+                try:
+                    await self.track_contract(trade)
+                except Exception as e:
+                    # Tracking is retried on the next reconnect
+                    logger.error(f"[{symbol}] Could not track contract {trade.contract_id}: {e}")
+                
             except DerivAPILoggedOutError:
+                ORDER_ERRORS.inc(kind='logged_out')
                 logger.warning("API session expired, reconnecting...")
                 await self.connect()
             except DerivAPIError as e:
+                ORDER_ERRORS.inc(kind='api')
                 logger.error(f"[{symbol}] Deriv API Error: {e}")
             except Exception as e:
+                ORDER_ERRORS.inc(kind='execution')
                 logger.error(f"[{symbol}] Trade execution error: {e}")
                 
         except Exception as e:
+            ORDER_ERRORS.inc(kind='unexpected')
             logger.error(f"[{symbol}] Unexpected error during trade: {e}")
 
 
@@ -560,19 +1093,19 @@ async def main() -> None:
     logger.info("=" * 60)
     
     bot = DerivTradingBot(config)
+    metrics_server = await serve_metrics(config.metrics_port) if config.metrics_port else None
     
     try:
         await bot.connect()
         
         # Initialize all symbols
         logger.info("Initializing symbols...")
-        for symbol in config.trading_pairs:
-            try:
-                await bot.calculate_dynamic_stake(symbol)
-                await bot.update_symbol_bias(symbol)
-                await asyncio.sleep(0.1)  # Rate limiting
-            except Exception as e:
-                logger.error(f"[{symbol}] Failed to initialize: {e}")
+        if config.state_snapshot:
+            bot.restore_state()
+            await bot.track_open_contracts()
+        await bot.warm_up()
+        if config.state_snapshot:
+            bot.state.start(bot.snapshot_state)
         
         logger.info("Bot ready. Starting strategy...")
         await bot.run_multi_pair_strategy()
@@ -582,6 +1115,18 @@ async def main() -> None:
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
     finally:
+        if metrics_server:
+            metrics_server.close()
+        await bot.proposals.close()
+        bot.stop_contract_tracking()
+        await bot.market_stream.close()
+        await bot.sentiment.stop()
+        bot.account.close()
+        await bot.journal.close()
+        logger.info(f"Request scheduler: {bot.scheduler.metrics()}")
+        await bot.scheduler.close()
+        if config.state_snapshot:
+            await bot.state.stop(bot.snapshot_state)
         if bot.api:
             try:
                 await bot.api.close()
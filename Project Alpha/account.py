@@ -0,0 +1,175 @@
+"""
+Account State - Shared balance snapshot and stake sizing
+One balance source for every symbol: pushed by a subscription when the
+broker supports it, otherwise fetched on a TTL with a single request in flight
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BalanceListener = Callable[[float], None]
+ErrorListener = Callable[[Exception], None]
+BalanceSubscriber = Callable[[BalanceListener, ErrorListener], Awaitable[Optional[Callable[[], Any]]]]
+
+
+def size_stakes(balance: float, symbols: Iterable[str], risk_percent: float,
+                min_stake: float = 1.0) -> Dict[str, float]:
+    """Stake for each symbol from one balance snapshot
+
+    Args:
+        balance: Account balance
+        symbols: Symbols to size
+        risk_percent: Fraction of the balance risked per trade
+        min_stake: Lowest stake the broker accepts
+
+    Returns:
+        Dict[str, float]: Stake per symbol
+    """
+    stake = max(round(balance * risk_percent, 2), min_stake)
+    return {symbol: stake for symbol in symbols}
+
+
+class AccountState:
+    """Cached account balance shared by every symbol"""
+
+    def __init__(self, fetch_balance: Callable[[], Awaitable[float]], ttl: float = 30.0):
+        """Create the account state
+
+        Args:
+            fetch_balance: Coroutine returning the current balance
+            ttl: Seconds a fetched balance is reused
+        """
+        self.fetch_balance = fetch_balance
+        self.ttl = ttl
+        self.balance: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        self.subscribed = False
+        self._inflight: Optional[asyncio.Task] = None
+        self._listeners: List[BalanceListener] = []
+        self._cancel: Optional[Callable[[], Any]] = None
+        self._start: Optional[BalanceSubscriber] = None
+        self._resubscribing: Optional[asyncio.Task] = None
+        self._generation = 0  # Errors of replaced subscriptions are ignored
+
+    @property
+    def age(self) -> Optional[float]:
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def on_update(self, listener: BalanceListener) -> None:
+        """Call ``listener(balance)`` whenever the balance changes"""
+        self._listeners.append(listener)
+
+    def update(self, balance: float) -> None:
+        """Record a balance pushed by the broker or fetched on demand"""
+        changed = balance != self.balance
+        self.balance = balance
+        self.updated_at = time.monotonic()
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(balance)
+                except Exception as e:
+                    logger.error(f"Balance listener error: {e}")
+
+    async def get_balance(self, max_age: Optional[float] = None) -> Optional[float]:
+        """Return the balance, fetching only if the snapshot is too old
+
+        Concurrent callers share one request. While subscribed the pushed
+        balance is used regardless of the TTL, unless ``max_age`` is given.
+
+        Args:
+            max_age: Override of the TTL in seconds (applied even when subscribed)
+
+        Returns:
+            Optional[float]: Balance, or the last known one if the fetch fails
+        """
+        trust_push = self.subscribed and max_age is None
+        max_age = self.ttl if max_age is None else max_age
+        age = self.age
+        if age is not None and (trust_push or age < max_age):
+            return self.balance
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._inflight)
+        return self.balance
+
+    async def _fetch(self) -> None:
+        try:
+            self.update(float(await self.fetch_balance()))
+        except Exception as e:
+            logger.error(f"Error fetching balance: {e}")
+
+    async def subscribe(self, start: BalanceSubscriber) -> bool:
+        """Keep the balance current from a push subscription
+
+        If the stream errors, the TTL applies again and the subscription is
+        restarted after ``ttl`` seconds.
+
+        Args:
+            start: Coroutine taking a balance callback and an error callback,
+                returning a cancel callable
+
+        Returns:
+            bool: True if the subscription is active
+        """
+        self._start = start
+        self._generation += 1
+        generation = self._generation
+        try:
+            cancel = await start(lambda balance: self.update(float(balance)),
+                                 lambda error: self._on_error(error, generation))
+        except Exception as e:
+            logger.warning(f"Balance subscription unavailable, polling every {self.ttl:.0f}s: {e}")
+            return False
+        if cancel is None:
+            return False
+        self._cancel = cancel
+        self.subscribed = True
+        return True
+
+    async def resubscribe(self) -> bool:
+        """Restart the subscription, e.g. after the connection was replaced
+
+        Returns:
+            bool: True if the subscription is active (False if never subscribed)
+        """
+        if self._start is None:
+            return False
+        self._stop()
+        return await self.subscribe(self._start)
+
+    def _on_error(self, error: Exception, generation: int) -> None:
+        if generation != self._generation:
+            return
+        logger.warning(f"Balance subscription failed, polling every {self.ttl:.0f}s: {error}")
+        self._cancel = None
+        self.subscribed = False
+        if self._resubscribing is None or self._resubscribing.done():
+            self._resubscribing = asyncio.ensure_future(self._resubscribe_later())
+
+    async def _resubscribe_later(self) -> None:
+        await asyncio.sleep(self.ttl)
+        await self.resubscribe()
+
+    def close(self) -> None:
+        """Stop the balance subscription"""
+        self._start = None
+        if self._resubscribing:
+            self._resubscribing.cancel()
+            self._resubscribing = None
+        self._stop()
+
+    def _stop(self) -> None:
+        if self._cancel:
+            try:
+                self._cancel()
+            except Exception as e:
+                logger.error(f"Error cancelling balance subscription: {e}")
+        self._cancel = None
+        self.subscribed = False
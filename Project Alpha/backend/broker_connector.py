@@ -3,13 +3,26 @@ Hybrid Broker Connector - Supports Deriv, MT5, Exness, and XM
 Includes market scanning capabilities
 """
 import asyncio
+import bisect
+import functools
+import hashlib
+import itertools
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
+import numpy as np
+
+from instrumentation import REGISTRY
+from ring_store import OrderStore, TickStore
+
 try:
     from deriv_api import DerivAPI, DerivAPIError, DerivAPILoggedOutError
 except ImportError:
@@ -22,12 +35,35 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+BROKER_SECONDS = REGISTRY.histogram('broker_request_seconds', 'Broker call latency', ('broker', 'method'))
+BROKER_ERRORS = REGISTRY.counter(
+    'broker_errors_total', 'Broker calls that raised or reported failure', ('broker', 'method'))
+EXECUTOR_QUEUE_DEPTH = REGISTRY.gauge(
+    'executor_queue_depth', 'Blocking calls queued or running on a worker thread', ('executor',))
+EXECUTOR_WAIT_SECONDS = REGISTRY.histogram(
+    'executor_wait_seconds', 'Time a blocking call waited for its worker thread', ('executor',))
+EXECUTOR_CALL_SECONDS = REGISTRY.histogram(
+    'executor_call_seconds', 'Run time of a blocking call on its worker thread', ('executor', 'call'))
+EXECUTOR_TIMEOUTS = REGISTRY.counter(
+    'executor_timeouts_total', 'Blocking calls that exceeded their timeout', ('executor', 'call'))
+DERIV_POOL_INFLIGHT = REGISTRY.gauge(
+    'deriv_pool_inflight', 'Requests outstanding per Deriv pool connection', ('shard',))
+DERIV_POOL_SUBSCRIPTIONS = REGISTRY.gauge(
+    'deriv_pool_subscriptions', 'Tick streams per Deriv pool connection', ('shard',))
+DERIV_POOL_RECONNECTS = REGISTRY.counter(
+    'deriv_pool_reconnects_total', 'Reconnects per Deriv pool connection', ('shard',))
+BROKER_HEALTHY = REGISTRY.gauge('broker_healthy', 'Health verdict per broker role (1 = healthy)', ('role',))
+BROKER_FAILOVERS = REGISTRY.counter('broker_failovers_total', 'Active broker switches', ('to',))
+HEDGED_READS = REGISTRY.counter(
+    'broker_hedged_reads_total', 'Reads also sent to the backup broker, by winning role', ('method', 'winner'))
+
 
 class BrokerType(Enum):
     DERIV = "deriv"
     MT5 = "mt5"
     EXNESS = "exness"
     XM = "xm"
+    SIM = "sim"
 
 
 @dataclass
@@ -40,9 +76,9 @@ class BrokerConfig:
     mt5_server: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
-    """Unified order structure across brokers"""
+    """Unified order structure across brokers (timestamp in epoch seconds)"""
     symbol: str
     direction: str  # "BUY" or "SELL"
     entry_price: float
@@ -52,16 +88,48 @@ class Order:
     broker_type: BrokerType
     order_id: Optional[str] = None
     status: str = "PENDING"
-    timestamp: datetime = None
+    timestamp: Optional[float] = None
     
     def __post_init__(self):
         if self.timestamp is None:
-            self.timestamp = datetime.now()
+            self.timestamp = time.time()
 
 
-@dataclass
+# Columnar history: one NumPy array per column, oldest bar first
+# Contiguous 1-D arrays: time as int64 epoch seconds, the rest float64
+HISTORY_COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+HistoryArrays = Dict[str, np.ndarray]
+
+
+def empty_history() -> HistoryArrays:
+    """Zero-length history columns"""
+    return {'time': np.empty(0, dtype=np.int64), **{c: np.empty(0) for c in HISTORY_COLUMNS[1:]}}
+
+
+def history_from_rows(rows: Sequence[Dict], time_key: str = 'time') -> HistoryArrays:
+    """History columns from per-bar dicts (time as datetime or epoch seconds)"""
+    n = len(rows)
+    if not n:
+        return empty_history()
+    columns = {'time': np.fromiter(
+        (t.timestamp() if isinstance(t, datetime) else t for t in (row[time_key] for row in rows)),
+        dtype=np.int64, count=n)}
+    for column in HISTORY_COLUMNS[1:]:
+        columns[column] = np.fromiter((row.get(column) or 0.0 for row in rows), dtype=np.float64, count=n)
+    return columns
+
+
+def history_to_rows(columns: HistoryArrays) -> List[Dict]:
+    """Per-bar dicts (the ``get_history`` format) from history columns"""
+    return [
+        {'open': o, 'high': h, 'low': l, 'close': c, 'volume': v, 'time': datetime.fromtimestamp(t)}
+        for t, o, h, l, c, v in zip(*(columns[name].tolist() for name in HISTORY_COLUMNS))
+    ]
+
+
+@dataclass(slots=True)
 class MarketData:
-    """Unified market data structure"""
+    """Unified market data structure (timestamp in epoch seconds)"""
     symbol: str
     bid: float
     ask: float
@@ -69,7 +137,7 @@ class MarketData:
     low: float
     close: float
     volume: int
-    timestamp: datetime
+    timestamp: float
     broker_type: BrokerType
 
 
@@ -101,6 +169,14 @@ class BrokerInterface(ABC):
         """Get historical OHLC data"""
         pass
     
+    async def get_history_arrays(self, symbol: str, timeframe: int = 60, count: int = 100) -> HistoryArrays:
+        """Get historical OHLC data as columns (see HISTORY_COLUMNS)
+        
+        Brokers with a native columnar source override this; the default
+        converts ``get_history`` rows.
+        """
+        return history_from_rows(await self.get_history(symbol, timeframe, count))
+    
     @abstractmethod
     async def place_order(self, order: Order) -> Tuple[bool, str]:
         """Place trading order"""
@@ -121,15 +197,280 @@ class BrokerInterface(ABC):
         """Get list of open orders"""
         pass
 
+    async def subscribe_ticks(self, symbol: str, on_tick: Callable[[float, float], None],
+                              on_error: Optional[Callable[[Exception], None]] = None) -> Optional[Callable[[], Any]]:
+        """Stream ticks for a symbol as on_tick(epoch, price)
+        
+        ``on_error(exception)`` is called if the stream dies; brokers that
+        restore their streams themselves may never call it.
+        
+        Returns a cancel callable, or None if the broker has no push feed
+        (callers then fall back to polling).
+        """
+        return None
+
+    async def ping(self) -> bool:
+        """Cheap liveness check used by health probes"""
+        return bool(getattr(self, 'is_connected', False))
+
+
+class ConsistentHashRing:
+    """Maps keys to nodes so that resizing moves only about 1/N of the keys"""
+    
+    def __init__(self, nodes: int, replicas: int = 64):
+        points = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in range(nodes) for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+    
+    def node(self, key: str) -> int:
+        """Node index owning ``key``"""
+        i = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._nodes[i]
+
+
+_DERIV_API_ERRORS = (DerivAPIError,) if DerivAPI else ()
+
+
+class _DerivShard:
+    """One websocket connection of a DerivConnectionPool and its load"""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.api = None
+        self.connected = False
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # Consecutive connection-level failures
+        self.reconnects = 0
+        self.latency = 0.0  # Moving average of request seconds
+        self.symbols: set = set()
+        self.subscriptions: Dict[int, Tuple[str, Callable[[float, float], None], Optional[Callable[[], Any]]]] = {}
+        self.reconnect_task: Optional[asyncio.Task] = None
+    
+    def load(self) -> Dict[str, Any]:
+        return {
+            'shard': self.index,
+            'connected': self.connected,
+            'symbols': len(self.symbols),
+            'subscriptions': len(self.subscriptions),
+            'inflight': self.inflight,
+            'requests': self.requests,
+            'errors': self.errors,
+            'reconnects': self.reconnects,
+            'latency_ms': round(self.latency * 1000, 2),
+        }
+
+
+class DerivConnectionPool:
+    """Market-data requests and tick streams spread over N Deriv websockets
+    
+    Symbols are assigned to connections by consistent hashing, so a symbol
+    always uses the same socket. Each connection reconnects on its own; while
+    it is down only the symbols of its shard fail (fast), the rest keep going.
+    The connections are unauthorized: they carry public market data only.
+    """
+    
+    def __init__(self, app_id: int, size: int = 4, request_timeout: float = 10.0,
+                 max_failures: int = 3, api_factory: Optional[Callable[[], Any]] = None):
+        """Create the pool
+        
+        Args:
+            app_id: Deriv application id
+            size: Number of websocket connections
+            request_timeout: Seconds before a request counts as a stalled socket
+            max_failures: Consecutive failures after which a connection is replaced
+            api_factory: Creates one connection (DerivAPI by default)
+        """
+        self.app_id = app_id
+        self.request_timeout = request_timeout
+        self.max_failures = max_failures
+        self.api_factory = api_factory or (lambda: DerivAPI(app_id=self.app_id))
+        self.shards = [_DerivShard(i) for i in range(max(1, size))]
+        self.ring = ConsistentHashRing(len(self.shards))
+        self._sub_ids = itertools.count()
+        self._closed = False
+    
+    def shard_for(self, symbol: str) -> _DerivShard:
+        shard = self.shards[self.ring.node(symbol)]
+        shard.symbols.add(symbol)
+        return shard
+    
+    async def _open(self, shard: _DerivShard) -> bool:
+        try:
+            shard.api = self.api_factory()
+            await asyncio.wait_for(shard.api.ping(), self.request_timeout)
+        except Exception as e:
+            logger.error(f"Deriv pool connection {shard.index} failed: {e}")
+            await self._close_api(shard)
+            return False
+        shard.connected = True
+        shard.failures = 0
+        for sub_id, (symbol, on_tick, _) in list(shard.subscriptions.items()):
+            await self._stream(shard, sub_id, symbol, on_tick)
+        return True
+    
+    async def _close_api(self, shard: _DerivShard) -> None:
+        shard.connected = False
+        api, shard.api = shard.api, None
+        if api is not None:
+            try:
+                await api.disconnect()
+            except Exception as e:
+                logger.debug(f"Deriv pool connection {shard.index} close error: {e}")
+    
+    async def connect(self) -> bool:
+        """Open every connection; failed ones keep retrying in the background
+        
+        Returns:
+            bool: True if at least one connection is up
+        """
+        self._closed = False
+        results = await asyncio.gather(*(self._open(shard) for shard in self.shards))
+        for shard, ok in zip(self.shards, results):
+            if not ok:
+                self._schedule_reconnect(shard)
+        logger.info(f"Deriv pool: {sum(results)}/{len(self.shards)} connections up")
+        return any(results)
+    
+    def _schedule_reconnect(self, shard: _DerivShard) -> None:
+        if self._closed or (shard.reconnect_task and not shard.reconnect_task.done()):
+            return
+        shard.connected = False
+        shard.reconnect_task = asyncio.ensure_future(self._reconnect(shard))
+    
+    async def _reconnect(self, shard: _DerivShard) -> None:
+        delay = 1.0
+        while not self._closed:
+            await self._close_api(shard)
+            shard.reconnects += 1
+            DERIV_POOL_RECONNECTS.inc(shard=str(shard.index))
+            if await self._open(shard):
+                logger.info(f"Deriv pool connection {shard.index} reconnected")
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+    
+    def _failed(self, shard: _DerivShard) -> None:
+        shard.failures += 1
+        if shard.failures >= self.max_failures:
+            logger.warning(f"Deriv pool connection {shard.index} stalled, reconnecting")
+            self._schedule_reconnect(shard)
+    
+    async def request(self, symbol: str, method: str, /, *args, **kwargs) -> Any:
+        """Call a DerivAPI method on the connection owning ``symbol``
+        
+        Raises:
+            ConnectionError: If that connection is down or reconnecting
+            TimeoutError: If the request stalls past ``request_timeout``
+        """
+        shard = self.shard_for(symbol)
+        if not shard.connected:
+            raise ConnectionError(f"Deriv pool connection {shard.index} is reconnecting")
+        labels = {'shard': str(shard.index)}
+        shard.inflight += 1
+        shard.requests += 1
+        DERIV_POOL_INFLIGHT.set(shard.inflight, **labels)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(getattr(shard.api, method)(*args, **kwargs), self.request_timeout)
+        except _DERIV_API_ERRORS:
+            shard.errors += 1  # The socket answered; the request itself was rejected
+            raise
+        except Exception:
+            shard.errors += 1
+            self._failed(shard)
+            raise
+        finally:
+            shard.inflight -= 1
+            DERIV_POOL_INFLIGHT.set(shard.inflight, **labels)
+        shard.failures = 0
+        shard.latency += (time.perf_counter() - started - shard.latency) * 0.1
+        return result
+    
+    async def _stream(self, shard: _DerivShard, sub_id: int, symbol: str,
+                      on_tick: Callable[[float, float], None]) -> bool:
+        def on_error(error: Exception) -> None:
+            logger.warning(f"Deriv pool tick stream {symbol} on connection {shard.index} failed: {error}")
+            self._schedule_reconnect(shard)
+        
+        try:
+            source = await asyncio.wait_for(shard.api.subscribe({"ticks": symbol}), self.request_timeout)
+            subscription = source.subscribe(
+                lambda msg: on_tick(msg['tick']['epoch'], float(msg['tick']['quote'])), on_error
+            )
+        except Exception as e:
+            logger.error(f"Error subscribing to Deriv ticks for {symbol} on connection {shard.index}: {e}")
+            self._failed(shard)
+            shard.subscriptions[sub_id] = (symbol, on_tick, None)
+            return False
+        shard.subscriptions[sub_id] = (symbol, on_tick, subscription.dispose)
+        return True
+    
+    async def subscribe_ticks(self, symbol: str, on_tick: Callable[[float, float], None]) -> Optional[Callable[[], Any]]:
+        """Stream ticks of ``symbol`` on its connection, resubscribing after reconnects"""
+        shard = self.shard_for(symbol)
+        if not shard.connected:
+            return None
+        sub_id = next(self._sub_ids)
+        if not await self._stream(shard, sub_id, symbol, on_tick):
+            shard.subscriptions.pop(sub_id, None)
+            return None
+        DERIV_POOL_SUBSCRIPTIONS.set(len(shard.subscriptions), shard=str(shard.index))
+        
+        def cancel() -> None:
+            _, _, dispose = shard.subscriptions.pop(sub_id, (None, None, None))
+            DERIV_POOL_SUBSCRIPTIONS.set(len(shard.subscriptions), shard=str(shard.index))
+            if dispose:
+                dispose()
+        return cancel
+    
+    def load(self) -> List[Dict[str, Any]]:
+        """Per-connection state and load"""
+        return [shard.load() for shard in self.shards]
+    
+    async def close(self) -> None:
+        """Stop reconnecting and close every connection"""
+        self._closed = True
+        for shard in self.shards:
+            if shard.reconnect_task:
+                shard.reconnect_task.cancel()
+                shard.reconnect_task = None
+            for _, _, dispose in shard.subscriptions.values():
+                if dispose:
+                    dispose()
+            shard.subscriptions.clear()
+            await self._close_api(shard)
+
 
 class DerivBroker(BrokerInterface):
-    """Deriv broker implementation"""
+    """Deriv broker implementation
+    
+    With ``pool_size`` > 1, market data (ticks, quotes, candles) goes through
+    a DerivConnectionPool; account and order calls stay on the authorized
+    connection.
+    """
     
-    def __init__(self, api_token: str):
+    def __init__(self, api_token: str, pool_size: int = 1, app_id: int = 12345):
         self.api_token = api_token
+        self.app_id = app_id
         self.deriv_api = None
+        self.pool = DerivConnectionPool(app_id, pool_size) if pool_size > 1 else None
         self.is_connected = False
     
+    async def _market(self, symbol: str, method: str, /, *args, **kwargs) -> Any:
+        """Market-data call on the symbol's pool connection (or the main one)"""
+        if self.pool:
+            return await self.pool.request(symbol, method, *args, **kwargs)
+        return await getattr(self.deriv_api, method)(*args, **kwargs)
+    
     async def connect(self) -> bool:
         """Connect to Deriv API"""
         if not DerivAPI:
@@ -137,10 +478,14 @@ class DerivBroker(BrokerInterface):
             return False
         
         try:
-            self.deriv_api = DerivAPI(app_id=12345, creds={
+            self.deriv_api = DerivAPI(app_id=self.app_id, creds={
                 'token': self.api_token
             })
             await self.deriv_api.authorize()
+            if self.pool and not await self.pool.connect():
+                logger.warning("Deriv pool unavailable, market data uses the main connection")
+                await self.pool.close()
+                self.pool = None
             self.is_connected = True
             logger.info("Connected to Deriv API")
             return True
@@ -150,6 +495,8 @@ class DerivBroker(BrokerInterface):
     
     async def disconnect(self) -> bool:
         """Disconnect from Deriv API"""
+        if self.pool:
+            await self.pool.close()
         if self.deriv_api:
             await self.deriv_api.disconnect()
             self.is_connected = False
@@ -169,7 +516,7 @@ class DerivBroker(BrokerInterface):
             return None
         
         try:
-            response = await self.deriv_api.get_tick(symbol)
+            response = await self._market(symbol, 'get_tick', symbol)
             tick = response['tick']
             
             return MarketData(
@@ -180,40 +527,57 @@ class DerivBroker(BrokerInterface):
                 low=tick.get('low'),
                 close=tick.get('quote'),
                 volume=0,
-                timestamp=datetime.fromtimestamp(tick.get('epoch')),
+                timestamp=float(tick.get('epoch')),
                 broker_type=BrokerType.DERIV
             )
         except Exception as e:
             logger.error(f"Error getting market data from Deriv for {symbol}: {e}")
             return None
     
+    async def subscribe_ticks(self, symbol: str, on_tick: Callable[[float, float], None],
+                              on_error: Optional[Callable[[Exception], None]] = None) -> Optional[Callable[[], Any]]:
+        """Subscribe to the Deriv tick stream for a symbol"""
+        if not self.is_connected:
+            return None
+        if self.pool:
+            # The pool resubscribes after reconnects, so errors stay internal
+            return await self.pool.subscribe_ticks(symbol, on_tick)
+        
+        def on_stream_error(error: Exception) -> None:
+            logger.warning(f"Deriv tick stream for {symbol} failed: {error}")
+            if on_error:
+                on_error(error)
+        
+        try:
+            source = await self.deriv_api.subscribe({"ticks": symbol})
+            subscription = source.subscribe(
+                lambda msg: on_tick(msg['tick']['epoch'], float(msg['tick']['quote'])), on_stream_error
+            )
+            return subscription.dispose
+        except Exception as e:
+            logger.error(f"Error subscribing to Deriv ticks for {symbol}: {e}")
+            return None
+    
     async def get_history(self, symbol: str, timeframe: int = 60, count: int = 100) -> List[Dict]:
         """Get historical data from Deriv"""
+        return history_to_rows(await self.get_history_arrays(symbol, timeframe, count))
+    
+    async def get_history_arrays(self, symbol: str, timeframe: int = 60, count: int = 100) -> HistoryArrays:
+        """Get historical data from Deriv as columns (volume is always 0)"""
         if not self.is_connected:
-            return []
+            return empty_history()
         
         try:
-            response = await self.deriv_api.get_candles(
+            response = await self._market(
+                symbol, 'get_candles',
                 symbol=symbol,
                 granularity=timeframe,
                 count=count
             )
-            candles = response.get('candles', [])
-            
-            history = []
-            for candle in candles:
-                history.append({
-                    'open': candle.get('open'),
-                    'high': candle.get('high'),
-                    'low': candle.get('low'),
-                    'close': candle.get('close'),
-                    'volume': 0,
-                    'time': datetime.fromtimestamp(candle.get('epoch'))
-                })
-            return history
+            return history_from_rows(response.get('candles', []), time_key='epoch')
         except Exception as e:
             logger.error(f"Error getting history from Deriv for {symbol}: {e}")
-            return []
+            return empty_history()
     
     async def place_order(self, order: Order) -> Tuple[bool, str]:
         """Place order on Deriv"""
@@ -254,12 +618,19 @@ class DerivBroker(BrokerInterface):
             return None
         
         try:
-            response = await self.deriv_api.get_account_status()
-            return response.get('account_status', {}).get('balance')
+            response = await self.deriv_api.balance()
+            return response.get('balance', {}).get('balance')
         except Exception as e:
             logger.error(f"Error getting balance from Deriv: {e}")
             return None
     
+    async def ping(self) -> bool:
+        """Round trip on the authorized connection"""
+        if not self.is_connected:
+            return False
+        response = await self.deriv_api.ping()
+        return response.get('ping') == 'pong'
+    
     async def get_open_orders(self) -> List[Order]:
         """Get open orders from Deriv"""
         if not self.is_connected:
@@ -275,16 +646,105 @@ class DerivBroker(BrokerInterface):
             return []
 
 
+class SerialExecutor:
+    """Runs blocking calls one at a time on a dedicated worker thread
+    
+    Libraries that are not thread-safe are only touched from this thread,
+    while callers await the result without blocking the event loop.
+    """
+    
+    def __init__(self, name: str, timeout: float = 10.0):
+        self.name = name
+        self.timeout = timeout
+        self.pending = 0
+        self.calls = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+    
+    def _done(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+    
+    async def call(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Queue ``func(*args)`` behind earlier calls and await its result
+        
+        Args:
+            func: Blocking callable (a ``functools.partial`` to pass keywords)
+            timeout: Seconds to wait, including queueing (executor default if None)
+            
+        Returns:
+            Any: The call's return value
+            
+        Raises:
+            TimeoutError: If the call did not finish in time. A call still
+                queued is dropped; one already running finishes in the background.
+        """
+        timeout = timeout or self.timeout
+        call = getattr(getattr(func, 'func', func), '__name__', 'call')
+        queued = time.perf_counter()
+        timing: Dict[str, float] = {}
+        
+        def run() -> Any:
+            timing['started'] = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timing['finished'] = time.perf_counter()
+        
+        future = self._pool.submit(run)
+        with self._lock:
+            self.pending += 1
+            self.calls += 1
+        future.add_done_callback(self._done)
+        EXECUTOR_QUEUE_DEPTH.set(self.pending, executor=self.name)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            EXECUTOR_TIMEOUTS.inc(executor=self.name, call=call)
+            state = 'still running' if 'started' in timing else 'dropped from queue'
+            raise TimeoutError(f"{self.name} {call} timed out after {timeout:g}s ({state})") from None
+        finally:
+            if 'started' in timing:
+                EXECUTOR_WAIT_SECONDS.observe(timing['started'] - queued, executor=self.name)
+            if 'finished' in timing:
+                EXECUTOR_CALL_SECONDS.observe(timing['finished'] - timing['started'],
+                                              executor=self.name, call=call)
+            EXECUTOR_QUEUE_DEPTH.set(self.pending, executor=self.name)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and call counters"""
+        return {'pending': self.pending, 'calls': self.calls, 'timeouts': self.timeouts}
+
+
+# The MT5 terminal API is process-global and not thread-safe: every
+# MT5Broker shares this one worker thread
+MT5_EXECUTOR = SerialExecutor('mt5')
+
+
 class MT5Broker(BrokerInterface):
-    """MetaTrader 5 broker implementation (Universal for Exness, XM, etc.)"""
+    """MetaTrader 5 broker implementation (Universal for Exness, XM, etc.)
     
-    def __init__(self, login: int, password: str, server: str, broker_label: BrokerType = BrokerType.MT5):
+    Terminal calls block, so they run on the shared MT5 worker thread with
+    per-call timeouts instead of on the event loop.
+    """
+    
+    def __init__(self, login: int, password: str, server: str, broker_label: BrokerType = BrokerType.MT5,
+                 call_timeout: float = 10.0, order_timeout: float = 30.0):
         self.login = login
         self.password = password
         self.server = server
         self.broker_label = broker_label
+        self.call_timeout = call_timeout  # Seconds per data call, queueing included
+        self.order_timeout = order_timeout  # Seconds per order_send
+        self.executor = MT5_EXECUTOR
         self.is_connected = False
     
+    async def _mt5(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Run a terminal call on the MT5 worker thread"""
+        return await self.executor.call(func, *args, timeout=timeout or self.call_timeout)
+    
     async def connect(self) -> bool:
         """Connect to MetaTrader 5"""
         if not mt5:
@@ -292,14 +752,17 @@ class MT5Broker(BrokerInterface):
             return False
         
         try:
-            if not mt5.initialize(
+            initialize = functools.partial(
+                mt5.initialize,
                 path=None,
                 login=self.login,
                 password=self.password,
                 server=self.server,
                 timeout=60000
-            ):
-                logger.error(f"MT5 initialization failed for {self.server}: {mt5.last_error()}")
+            )
+            # The terminal itself waits up to 60s for the login
+            if not await self._mt5(initialize, timeout=70.0):
+                logger.error(f"MT5 initialization failed for {self.server}: {await self._mt5(mt5.last_error)}")
                 return False
             
             self.is_connected = True
@@ -312,15 +775,18 @@ class MT5Broker(BrokerInterface):
     async def disconnect(self) -> bool:
         """Disconnect from MetaTrader 5"""
         if mt5 and self.is_connected:
-            mt5.shutdown()
             self.is_connected = False
+            try:
+                await self._mt5(mt5.shutdown)
+            except Exception as e:
+                logger.error(f"Error shutting down MT5: {e}")
             logger.info(f"Disconnected from {self.broker_label.value.upper()}")
         return True
     
     async def get_all_symbols(self) -> List[str]:
         if not self.is_connected: return []
         try:
-            symbols = mt5.symbols_get()
+            symbols = await self._mt5(mt5.symbols_get)
             return [s.name for s in symbols] if symbols else []
         except: return []
 
@@ -330,7 +796,7 @@ class MT5Broker(BrokerInterface):
             return None
         
         try:
-            tick = mt5.symbol_info_tick(symbol)
+            tick = await self._mt5(mt5.symbol_info_tick, symbol)
             if tick is None:
                 logger.error(f"Failed to get tick for {symbol}")
                 return None
@@ -343,7 +809,7 @@ class MT5Broker(BrokerInterface):
                 low=tick.bid,
                 close=tick.last,
                 volume=tick.volume,
-                timestamp=datetime.fromtimestamp(tick.time),
+                timestamp=float(tick.time),
                 broker_type=self.broker_label
             )
         except Exception as e:
@@ -352,8 +818,12 @@ class MT5Broker(BrokerInterface):
     
     async def get_history(self, symbol: str, timeframe: int = 60, count: int = 100) -> List[Dict]:
         """Get historical data from MT5"""
+        return history_to_rows(await self.get_history_arrays(symbol, timeframe, count))
+    
+    async def get_history_arrays(self, symbol: str, timeframe: int = 60, count: int = 100) -> HistoryArrays:
+        """Get historical data from MT5 as columns (volume is the tick volume)"""
         if not self.is_connected:
-            return []
+            return empty_history()
         
         try:
             # Convert timeframe to MT5 timeframe
@@ -364,25 +834,20 @@ class MT5Broker(BrokerInterface):
             }
             tf = mt5_timeframes.get(timeframe, mt5.TIMEFRAME_H1)
             
-            rates = mt5.copy_rates_from_pos(symbol, tf, 0, count)
+            rates = await self._mt5(mt5.copy_rates_from_pos, symbol, tf, 0, count)
             if rates is None:
                 logger.error(f"Failed to get rates for {symbol}")
-                return []
+                return empty_history()
             
-            history = []
-            for rate in rates:
-                history.append({
-                    'open': rate['open'],
-                    'high': rate['high'],
-                    'low': rate['low'],
-                    'close': rate['close'],
-                    'volume': rate['tick_volume'],
-                    'time': datetime.fromtimestamp(rate['time'])
-                })
-            return history
+            # Field views of the record array are strided; copy each column once
+            columns = {'time': np.ascontiguousarray(rates['time'], dtype=np.int64)}
+            for column in HISTORY_COLUMNS[1:-1]:
+                columns[column] = np.ascontiguousarray(rates[column], dtype=np.float64)
+            columns['volume'] = rates['tick_volume'].astype(np.float64)
+            return columns
         except Exception as e:
             logger.error(f"Error getting history from MT5 for {symbol}: {e}")
-            return []
+            return empty_history()
     
     async def place_order(self, order: Order) -> Tuple[bool, str]:
         """Place order on MetaTrader 5"""
@@ -405,12 +870,16 @@ class MT5Broker(BrokerInterface):
                 "type_filling": mt5.ORDER_FILLING_IOC,
             }
             
-            result = mt5.order_send(request)
+            result = await self._mt5(mt5.order_send, request, timeout=self.order_timeout)
             if result.retcode != mt5.TRADE_RETCODE_DONE:
                 logger.error(f"Order failed: {result.comment}")
                 return False, result.comment
             
             return True, str(result.order)
+        except TimeoutError as e:
+            # A running order_send cannot be aborted; check open positions before retrying
+            logger.error(f"Order on MT5 not confirmed, it may still fill: {e}")
+            return False, str(e)
         except Exception as e:
             logger.error(f"Error placing order on MT5: {e}")
             return False, str(e)
@@ -422,12 +891,12 @@ class MT5Broker(BrokerInterface):
         
         try:
             # Get the position and close it
-            result = mt5.order_send({
+            result = await self._mt5(mt5.order_send, {
                 "action": mt5.TRADE_ACTION_DEAL,
                 "position": int(order_id),
                 "type": mt5.ORDER_TYPE_SELL,
                 "volume": 0,
-            })
+            }, timeout=self.order_timeout)
             
             if result.retcode != mt5.TRADE_RETCODE_DONE:
                 return False, result.comment
@@ -442,7 +911,7 @@ class MT5Broker(BrokerInterface):
             return None
         
         try:
-            account_info = mt5.account_info()
+            account_info = await self._mt5(mt5.account_info)
             if account_info is None:
                 return None
             return account_info.balance
@@ -450,13 +919,20 @@ class MT5Broker(BrokerInterface):
             logger.error(f"Error getting balance from MT5: {e}")
             return None
     
+    async def ping(self) -> bool:
+        """Terminal is up and connected to the trade server"""
+        if not self.is_connected:
+            return False
+        info = await self._mt5(mt5.terminal_info)
+        return info is not None and bool(info.connected)
+    
     async def get_open_orders(self) -> List[Order]:
         """Get open orders from MetaTrader 5"""
         if not self.is_connected:
             return []
         
         try:
-            positions = mt5.positions_get()
+            positions = await self._mt5(mt5.positions_get)
             orders = []
             
             if positions:
@@ -471,7 +947,7 @@ class MT5Broker(BrokerInterface):
                         broker_type=self.broker_label,
                         order_id=str(position.ticket),
                         status="OPEN",
-                        timestamp=datetime.fromtimestamp(position.time)
+                        timestamp=float(position.time)
                     )
                     orders.append(order)
             
@@ -481,40 +957,477 @@ class MT5Broker(BrokerInterface):
             return []
 
 
+class SimulatedBroker(BrokerInterface):
+    """Local broker with synthetic or replayed prices for offline testing
+    
+    Prices follow a seeded geometric random walk (or replay supplied candles),
+    ticks are pushed to subscribers on a timer, and orders fill with
+    configurable latency, slippage and rejection rate.
+    """
+    
+    BASE_GRANULARITY = 60  # History is kept as 1-minute bars
+    
+    def __init__(self, symbols: Optional[Sequence[str]] = None, num_symbols: int = 10,
+                 seed: int = 42, tick_interval: float = 1.0, volatility: float = 0.0005,
+                 spread: float = 0.0002, history_bars: int = 1000,
+                 latency: Tuple[float, float] = (0.0, 0.0), data_latency: Tuple[float, float] = (0.0, 0.0),
+                 slippage_bps: float = 0.0, reject_rate: float = 0.0, balance: float = 10000.0,
+                 replay: Optional[Dict[str, Sequence[Dict]]] = None):
+        """Create the simulator
+        
+        Args:
+            symbols: Symbol names (SIM_0.. SIM_n if None)
+            num_symbols: Number of generated symbols when ``symbols`` is None
+            seed: Random seed; the same seed gives the same prices and fills
+            tick_interval: Seconds between pushed ticks
+            volatility: Standard deviation of log returns per tick
+            spread: Bid/ask spread as a fraction of price
+            history_bars: 1-minute bars of history generated at connect
+            latency: (min, max) seconds added to order calls
+            data_latency: (min, max) seconds added to market data calls
+            slippage_bps: Maximum adverse fill slippage in basis points
+            reject_rate: Probability that an order is rejected
+            balance: Starting account balance
+            replay: Candles per symbol to replay instead of a random walk;
+                the first half seeds history, the rest is streamed one close per tick
+        """
+        self.replay = replay
+        if replay:
+            symbols = list(replay)
+        self.symbols = list(symbols) if symbols else [f"SIM_{i}" for i in range(num_symbols)]
+        self.seed = seed
+        self.tick_interval = tick_interval
+        self.volatility = volatility
+        self.spread = spread
+        self.history_bars = history_bars
+        self.latency = latency
+        self.data_latency = data_latency
+        self.slippage_bps = slippage_bps
+        self.reject_rate = reject_rate
+        self.balance = balance
+        self.is_connected = False
+        self.rng = np.random.default_rng(seed)
+        self.prices: Dict[str, float] = {}
+        self.bars: Dict[str, Dict[str, list]] = {}
+        self.positions: Dict[str, Order] = {}
+        self._replay_cursor: Dict[str, int] = {}
+        self._subscribers: Dict[str, Dict[int, Callable[[float, float], None]]] = {}
+        self._sub_ids = itertools.count()
+        self._order_ids = itertools.count(1)
+        self._tick_task: Optional[asyncio.Task] = None
+    
+    async def connect(self) -> bool:
+        """Generate history and start the tick timer"""
+        now = int(time.time())
+        start = now - now % self.BASE_GRANULARITY - self.history_bars * self.BASE_GRANULARITY
+        for i, symbol in enumerate(self.symbols):
+            if self.replay:
+                candles = list(self.replay[symbol])
+                split = max(1, len(candles) // 2)
+                closes = [float(c['close']) for c in candles[:split]]
+                opens = [float(c['open']) for c in candles[:split]]
+                highs = [float(c['high']) for c in candles[:split]]
+                lows = [float(c['low']) for c in candles[:split]]
+                self._replay_cursor[symbol] = split
+                first = now - now % self.BASE_GRANULARITY - split * self.BASE_GRANULARITY
+                epochs = [first + k * self.BASE_GRANULARITY for k in range(split)]
+            else:
+                closes, opens, highs, lows, epochs = self._random_history(100.0 * (1 + i % 10), start)
+            self.bars[symbol] = {'epoch': epochs, 'open': opens, 'high': highs, 'low': lows, 'close': closes}
+            self.prices[symbol] = closes[-1]
+        self.is_connected = True
+        self._tick_task = asyncio.ensure_future(self._tick_loop())
+        logger.info(f"Simulated broker connected with {len(self.symbols)} symbols")
+        return True
+    
+    def _random_history(self, price: float, start: int) -> Tuple[list, list, list, list, list]:
+        """Random-walk 1-minute bars ending at the current minute"""
+        steps = max(1, min(60, int(self.BASE_GRANULARITY / max(self.tick_interval, 1e-3))))
+        returns = self.rng.normal(0.0, self.volatility, (self.history_bars, steps))
+        path = price * np.exp(np.cumsum(returns.ravel())).reshape(returns.shape)
+        closes = path[:, -1]
+        opens = np.r_[price, closes[:-1]]
+        highs = np.maximum(path.max(axis=1), opens)
+        lows = np.minimum(path.min(axis=1), opens)
+        epochs = start + self.BASE_GRANULARITY * np.arange(self.history_bars)
+        return closes.tolist(), opens.tolist(), highs.tolist(), lows.tolist(), epochs.tolist()
+    
+    async def disconnect(self) -> bool:
+        """Stop the tick timer"""
+        if self._tick_task:
+            self._tick_task.cancel()
+            self._tick_task = None
+        self.is_connected = False
+        logger.info("Simulated broker disconnected")
+        return True
+    
+    async def _delay(self, bounds: Tuple[float, float]) -> None:
+        low, high = bounds
+        if high > 0:
+            await asyncio.sleep(self.rng.uniform(low, high))
+    
+    def _next_price(self, symbol: str) -> float:
+        if self.replay:
+            candles = self.replay[symbol]
+            cursor = self._replay_cursor[symbol]
+            if cursor >= len(candles):
+                return self.prices[symbol]  # Replay exhausted: price stays flat
+            self._replay_cursor[symbol] = cursor + 1
+            return float(candles[cursor]['close'])
+        return self.prices[symbol] * float(np.exp(self.rng.normal(0.0, self.volatility)))
+    
+    def _apply_tick(self, symbol: str, epoch: float, price: float) -> None:
+        """Update the last price, the forming 1-minute bar and open positions"""
+        self.prices[symbol] = price
+        bars = self.bars[symbol]
+        bar_epoch = int(epoch) - int(epoch) % self.BASE_GRANULARITY
+        if bar_epoch > bars['epoch'][-1]:
+            for column, value in (('epoch', bar_epoch), ('open', price), ('high', price),
+                                  ('low', price), ('close', price)):
+                bars[column].append(value)
+            if len(bars['epoch']) > self.history_bars * 2:
+                for column in bars:
+                    del bars[column][:self.history_bars]
+        else:
+            bars['high'][-1] = max(bars['high'][-1], price)
+            bars['low'][-1] = min(bars['low'][-1], price)
+            bars['close'][-1] = price
+        
+        for order_id, order in list(self.positions.items()):
+            if order.symbol != symbol:
+                continue
+            long_ = order.direction == "BUY"
+            if order.stop_loss and (price <= order.stop_loss if long_ else price >= order.stop_loss):
+                self._settle(order_id, price)
+            elif order.take_profit and (price >= order.take_profit if long_ else price <= order.take_profit):
+                self._settle(order_id, price)
+    
+    async def _tick_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            now = time.time()
+            for symbol in self.symbols:
+                price = self._next_price(symbol)
+                self._apply_tick(symbol, now, price)
+                for callback in list(self._subscribers.get(symbol, {}).values()):
+                    try:
+                        callback(now, price)
+                    except Exception as e:
+                        logger.error(f"Simulated tick callback error for {symbol}: {e}")
+    
+    async def get_all_symbols(self) -> List[str]:
+        return list(self.symbols) if self.is_connected else []
+    
+    def _quote(self, symbol: str) -> Tuple[float, float]:
+        price = self.prices[symbol]
+        half = price * self.spread / 2
+        return price - half, price + half
+    
+    async def get_market_data(self, symbol: str, timeframe: int = 60) -> Optional[MarketData]:
+        """Get the simulated quote and the forming bar's range"""
+        if not self.is_connected or symbol not in self.prices:
+            return None
+        await self._delay(self.data_latency)
+        bid, ask = self._quote(symbol)
+        bars = self.bars[symbol]
+        return MarketData(
+            symbol=symbol,
+            bid=bid,
+            ask=ask,
+            high=bars['high'][-1],
+            low=bars['low'][-1],
+            close=self.prices[symbol],
+            volume=0,
+            timestamp=time.time(),
+            broker_type=BrokerType.SIM
+        )
+    
+    async def subscribe_ticks(self, symbol: str, on_tick: Callable[[float, float], None],
+                              on_error: Optional[Callable[[Exception], None]] = None) -> Optional[Callable[[], Any]]:
+        """Push every simulated tick of a symbol to ``on_tick``"""
+        if not self.is_connected or symbol not in self.prices:
+            return None
+        sub_id = next(self._sub_ids)
+        self._subscribers.setdefault(symbol, {})[sub_id] = on_tick
+        return lambda: self._subscribers.get(symbol, {}).pop(sub_id, None)
+    
+    async def get_history(self, symbol: str, timeframe: int = 60, count: int = 100) -> List[Dict]:
+        """Get simulated bars, aggregated from 1-minute bars to ``timeframe``"""
+        return history_to_rows(await self.get_history_arrays(symbol, timeframe, count))
+    
+    async def get_history_arrays(self, symbol: str, timeframe: int = 60, count: int = 100) -> HistoryArrays:
+        """Get simulated bars as columns, aggregated from 1-minute bars to ``timeframe``"""
+        if not self.is_connected or symbol not in self.bars or count <= 0:
+            return empty_history()
+        await self._delay(self.data_latency)
+        bars = self.bars[symbol]
+        factor = max(1, timeframe // self.BASE_GRANULARITY)
+        period = factor * self.BASE_GRANULARITY
+        
+        # Enough 1-minute bars for ``count`` buckets plus a partial first one
+        tail = -(count + 1) * factor
+        epochs = np.asarray(bars['epoch'][tail:], dtype=np.int64)
+        buckets = epochs - epochs % period
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])[-count:]
+        ends = np.r_[starts[1:], len(epochs)] - 1
+        first = starts[0]
+        return {
+            'time': buckets[starts],
+            'open': np.asarray(bars['open'][tail:])[starts],
+            'high': np.maximum.reduceat(np.asarray(bars['high'][tail:])[first:], starts - first),
+            'low': np.minimum.reduceat(np.asarray(bars['low'][tail:])[first:], starts - first),
+            'close': np.asarray(bars['close'][tail:])[ends],
+            'volume': np.zeros(len(starts)),
+        }
+    
+    async def place_order(self, order: Order) -> Tuple[bool, str]:
+        """Fill at the simulated quote after latency, slippage and random rejection"""
+        if not self.is_connected:
+            return False, "Not connected"
+        if order.symbol not in self.prices:
+            return False, f"Unknown symbol {order.symbol}"
+        
+        await self._delay(self.latency)
+        if self.rng.random() < self.reject_rate:
+            return False, "Rejected by simulator"
+        
+        bid, ask = self._quote(order.symbol)
+        slippage = self.rng.uniform(0.0, self.slippage_bps) / 10000
+        if order.direction == "BUY":
+            fill = ask * (1 + slippage)
+        else:
+            fill = bid * (1 - slippage)
+        
+        order_id = f"SIM{next(self._order_ids)}"
+        order.order_id = order_id
+        order.entry_price = fill
+        order.status = "OPEN"
+        self.positions[order_id] = order
+        return True, order_id
+    
+    def _settle(self, order_id: str, price: float) -> float:
+        """Close a position at ``price`` and book its P&L"""
+        order = self.positions.pop(order_id)
+        sign = 1 if order.direction == "BUY" else -1
+        pnl = order.stake * sign * (price - order.entry_price) / order.entry_price
+        self.balance += pnl
+        order.status = "CLOSED"
+        return pnl
+    
+    async def close_order(self, order_id: str) -> Tuple[bool, str]:
+        """Close a simulated position at the current quote"""
+        if not self.is_connected:
+            return False, "Not connected"
+        order = self.positions.get(order_id)
+        if order is None:
+            return False, f"Unknown order {order_id}"
+        await self._delay(self.latency)
+        bid, ask = self._quote(order.symbol)
+        pnl = self._settle(order_id, bid if order.direction == "BUY" else ask)
+        return True, f"Order closed, P&L {pnl:.2f}"
+    
+    async def get_balance(self) -> Optional[float]:
+        if not self.is_connected:
+            return None
+        await self._delay(self.data_latency)
+        return self.balance
+    
+    async def ping(self) -> bool:
+        await self._delay(self.data_latency)
+        return self.is_connected
+    
+    async def get_open_orders(self) -> List[Order]:
+        if not self.is_connected:
+            return []
+        return list(self.positions.values())
+
+
+class BrokerHealth:
+    """Rolling latency and error rate of one broker, with a hysteretic verdict
+    
+    A broker turns unhealthy when its error rate reaches ``fail_error_rate``,
+    its p95 latency exceeds ``latency_limit`` or ``max_consecutive`` calls fail
+    in a row. It turns healthy again only once the error rate is back under
+    ``recover_error_rate`` and the p95 under half the latency limit.
+    
+    Successful calls also feed a latency window per method, so a method's
+    p95 is not skewed by slower or faster calls of other methods.
+    """
+    
+    def __init__(self, window: int = 20, latency_window: int = 200, min_samples: int = 10,
+                 fail_error_rate: float = 0.5, recover_error_rate: float = 0.1,
+                 latency_limit: float = 2.0, max_consecutive: int = 5):
+        self.outcomes: deque = deque(maxlen=window)
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.method_latencies: Dict[str, deque] = {}
+        self.latency_window = latency_window
+        self.min_samples = min_samples
+        self.fail_error_rate = fail_error_rate
+        self.recover_error_rate = recover_error_rate
+        self.latency_limit = latency_limit
+        self.max_consecutive = max_consecutive
+        self.consecutive = 0
+        self.healthy = True
+        self.changed_at = time.monotonic()
+        self.last_seen = 0.0
+    
+    def record(self, latency: float, ok: bool, method: Optional[str] = None) -> None:
+        """Record one completed call (of ``method``, if given)"""
+        if ok and method:
+            window = self.method_latencies.get(method)
+            if window is None:
+                window = self.method_latencies[method] = deque(maxlen=self.latency_window)
+            window.append(latency)
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+        self.consecutive = 0 if ok else self.consecutive + 1
+        self.last_seen = time.monotonic()
+        self._evaluate()
+    
+    def record_latency(self, latency: float) -> None:
+        """Record a lower bound for a call abandoned before it finished"""
+        self.latencies.append(latency)
+    
+    def p95(self, method: Optional[str] = None) -> Optional[float]:
+        """95th percentile latency (of one method's successful calls, if given)
+        
+        Returns None before ``min_samples`` calls.
+        """
+        samples = self.latencies if method is None else self.method_latencies.get(method, ())
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+    
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+    
+    def _evaluate(self) -> None:
+        p95 = self.p95()
+        if self.healthy:
+            if self.consecutive >= self.max_consecutive or (
+                    len(self.outcomes) >= self.min_samples and
+                    (self.error_rate >= self.fail_error_rate or (p95 or 0.0) > self.latency_limit)):
+                self.healthy = False
+                self.changed_at = time.monotonic()
+        elif (self.consecutive == 0 and self.error_rate <= self.recover_error_rate and
+              (p95 or 0.0) <= self.latency_limit / 2):
+            self.healthy = True
+            self.changed_at = time.monotonic()
+    
+    def report(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            'healthy': self.healthy,
+            'error_rate': round(self.error_rate, 3),
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'samples': len(self.outcomes),
+        }
+
+
 class HybridBroker:
     """
     Unified broker interface supporting both Deriv and MetaTrader 5
     Provides fallback mechanism for hybrid mode
+    
+    With a fallback, both brokers stay connected: every call and a periodic
+    probe feed a BrokerHealth per broker, and the active broker fails over
+    when it turns unhealthy (and back once it has stayed healthy for
+    ``failback_after`` seconds). With ``hedge_reads``, a quote or history
+    read that the active broker has not answered within its p95 latency for
+    that method is also sent to the backup, and the first usable answer
+    wins; both brokers must then use the same symbol names.
+    
+    Two MT5-based brokers share one process-global terminal, so that pair
+    keeps the fallback as a cold standby instead: it is connected only on
+    failover (after the active one is shut down), it is neither probed nor
+    hedged to, and the brokers swap again only when the active one turns
+    unhealthy.
+    
+    Streamed ticks, quotes and placed orders are kept in bounded
+    per-symbol ring stores (``ticks`` and ``orders``).
     """
     
-    def __init__(self, primary: BrokerInterface, fallback: Optional[BrokerInterface] = None):
+    HEDGED_METHODS = ('get_market_data', 'get_history', 'get_history_arrays')
+    
+    def __init__(self, primary: BrokerInterface, fallback: Optional[BrokerInterface] = None,
+                 tick_history: int = 50_000, order_history: int = 10_000,
+                 health_interval: float = 10.0, hedge_reads: bool = False, hedge_delay: float = 0.5,
+                 failback_after: float = 60.0, min_dwell: float = 30.0, probe_timeout: float = 5.0):
+        """Create the hybrid broker
+        
+        Args:
+            primary: Preferred broker
+            fallback: Standby broker used on failover and for hedged reads
+            tick_history: Ticks kept per symbol
+            order_history: Order events kept per symbol
+            health_interval: Seconds between health probes (0 disables probing)
+            hedge_reads: Send slow reads to the backup broker as well
+            hedge_delay: Hedge delay before the active broker has a p95 latency
+            failback_after: Seconds the primary must stay healthy before it is active again
+            min_dwell: Minimum seconds between two switches
+            probe_timeout: Seconds before a health probe counts as failed
+        """
         self.primary = primary
         self.fallback = fallback
         self.active_broker = None
+        self.ticks = TickStore(tick_history)
+        self.orders = OrderStore(order_history)
+        self.health = {'primary': BrokerHealth(), 'fallback': BrokerHealth()}
+        self.health_interval = health_interval
+        self.hedge_reads = hedge_reads
+        self.hedge_delay = hedge_delay
+        self.failback_after = failback_after
+        self.min_dwell = min_dwell
+        self.probe_timeout = probe_timeout
+        self._switched_at = 0.0
+        self._health_task: Optional[asyncio.Task] = None
+        # One MT5 terminal per process: only one of the two can be logged in
+        self.cold_standby = isinstance(primary, MT5Broker) and isinstance(fallback, MT5Broker)
+        self._handover: Optional[asyncio.Task] = None
     
-    async def connect(self) -> bool:
-        """Connect to primary broker, fallback if needed"""
+    def _role(self, broker: BrokerInterface) -> str:
+        return 'primary' if broker is self.primary else 'fallback'
+    
+    async def _connect_one(self, broker: BrokerInterface, role: str) -> bool:
         try:
-            if await self.primary.connect():
-                self.active_broker = self.primary
-                logger.info("Connected to primary broker")
-                return True
+            return bool(await broker.connect())
         except Exception as e:
-            logger.error(f"Primary broker connection failed: {e}")
+            logger.error(f"{role.capitalize()} broker connection failed: {e}")
+            return False
+    
+    async def connect(self) -> bool:
+        """Connect the primary broker (and the fallback as a warm standby)"""
+        if self.fallback and not self.cold_standby:
+            primary_ok, fallback_ok = await asyncio.gather(
+                self._connect_one(self.primary, 'primary'), self._connect_one(self.fallback, 'fallback'))
+        else:
+            primary_ok = await self._connect_one(self.primary, 'primary')
+            fallback_ok = bool(self.fallback) and not primary_ok and \
+                await self._connect_one(self.fallback, 'fallback')
         
-        if self.fallback:
-            try:
-                if await self.fallback.connect():
-                    self.active_broker = self.fallback
-                    logger.warning("Switched to fallback broker")
-                    return True
-            except Exception as e:
-                logger.error(f"Fallback broker connection failed: {e}")
+        if primary_ok:
+            self.active_broker = self.primary
+            logger.info("Connected to primary broker")
+        elif fallback_ok:
+            self.active_broker = self.fallback
+            self.health['primary'].healthy = False
+            logger.warning("Switched to fallback broker")
+        else:
+            return False
         
-        return False
+        self._switched_at = time.monotonic()
+        if self.fallback and self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+        return True
     
     async def disconnect(self) -> bool:
         """Disconnect all brokers"""
+        for task in (self._health_task, self._handover):
+            if task:
+                task.cancel()
+        self._health_task = self._handover = None
         success = True
         if self.primary:
             success &= await self.primary.disconnect()
@@ -523,44 +1436,232 @@ class HybridBroker:
         self.active_broker = None
         return success
     
+    @staticmethod
+    def _failed(method: str, result: Any) -> bool:
+        return (result is None and method != 'subscribe_ticks') or result is False or \
+            (isinstance(result, tuple) and bool(result) and result[0] is False)
+    
+    async def _invoke(self, broker: BrokerInterface, method: str, *args) -> Any:
+        """Call one broker, recording latency, failures and health"""
+        broker_type = self._broker_type(broker)
+        labels = {'broker': broker_type.value if broker_type else 'unknown', 'method': method}
+        health = self.health[self._role(broker)]
+        started = time.perf_counter()
+        try:
+            result = await getattr(broker, method)(*args)
+        except asyncio.CancelledError:
+            health.record_latency(time.perf_counter() - started)
+            raise
+        except Exception:
+            BROKER_ERRORS.inc(**labels)
+            health.record(time.perf_counter() - started, False, method)
+            self._select()
+            raise
+        finally:
+            BROKER_SECONDS.observe(time.perf_counter() - started, **labels)
+        failed = self._failed(method, result)
+        if failed:
+            BROKER_ERRORS.inc(**labels)
+        health.record(time.perf_counter() - started, not failed, method)
+        if failed:
+            self._select()
+        return result
+    
+    async def _call(self, method: str, default: Any, *args) -> Any:
+        """Call the active broker, recording latency and failures
+
+        A call fails if it raises, returns None where data was expected,
+        returns False (a failed ping) or a ``(False, message)`` result.
+        """
+        if not self.active_broker:
+            return default
+        return await self._invoke(self.active_broker, method, *args)
+    
+    def _backup(self) -> Optional[BrokerInterface]:
+        """The standby broker, if it is connected and healthy"""
+        if self.cold_standby:
+            return None
+        backup = self.fallback if self.active_broker is self.primary else self.primary
+        if backup is None or not getattr(backup, 'is_connected', True) or \
+                not self.health[self._role(backup)].healthy:
+            return None
+        return backup
+    
+    @classmethod
+    def _usable(cls, method: str, task: asyncio.Future) -> bool:
+        if task.cancelled() or task.exception() is not None:
+            return False
+        result = task.result()
+        if cls._failed(method, result):
+            return False
+        if isinstance(result, dict) and 'close' in result:
+            return len(result['close']) > 0
+        return not isinstance(result, list) or bool(result)
+    
+    async def _read(self, method: str, default: Any, *args) -> Any:
+        """Read from the active broker, hedged to the backup when enabled"""
+        active = self.active_broker
+        backup = self._backup() if self.hedge_reads and active else None
+        if backup is None:
+            return await self._call(method, default, *args)
+        
+        delay = self.health[self._role(active)].p95(method) or self.hedge_delay
+        first = asyncio.ensure_future(self._invoke(active, method, *args))
+        await asyncio.wait({first}, timeout=delay)
+        if first.done() and self._usable(method, first):
+            return first.result()
+        
+        # Slow or failed: race the backup against the still-running request
+        second = asyncio.ensure_future(self._invoke(backup, method, *args))
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if self._usable(method, task):
+                        HEDGED_READS.inc(method=method, winner=self._role(active if task is first else backup))
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        return first.result()
+    
+    def _select(self) -> None:
+        """Switch the active broker when health says so (with hysteresis)"""
+        if not self.fallback or self.active_broker is None:
+            return
+        now = time.monotonic()
+        for role, health in self.health.items():
+            BROKER_HEALTHY.set(1 if health.healthy else 0, role=role)
+        if now - self._switched_at < self.min_dwell:
+            return
+        
+        if self.cold_standby:
+            # The standby's health is unknown until it holds the terminal
+            active = self._role(self.active_broker)
+            if not self.health[active].healthy and (self._handover is None or self._handover.done()):
+                standby = self.fallback if self.active_broker is self.primary else self.primary
+                self._handover = asyncio.ensure_future(
+                    self._hand_over(standby, f"{active} unhealthy ({self.health[active].report()})"))
+            return
+        
+        primary, fallback = self.health['primary'], self.health['fallback']
+        if self.active_broker is self.primary:
+            if not primary.healthy and fallback.healthy and getattr(self.fallback, 'is_connected', True):
+                self._switch(self.fallback, f"primary unhealthy ({primary.report()})")
+        elif primary.healthy and getattr(self.primary, 'is_connected', True) and \
+                (not fallback.healthy or now - primary.changed_at >= self.failback_after):
+            self._switch(self.primary, "primary healthy again")
+    
+    def _switch(self, broker: BrokerInterface, reason: str) -> None:
+        self.active_broker = broker
+        self._switched_at = time.monotonic()
+        role = self._role(broker)
+        BROKER_FAILOVERS.inc(to=role)
+        logger.warning(f"Switched to {role} broker: {reason}")
+    
+    async def _hand_over(self, broker: BrokerInterface, reason: str) -> None:
+        """Move the shared MT5 terminal from the active broker to ``broker``"""
+        current, self.active_broker = self.active_broker, None
+        await current.disconnect()
+        role = self._role(broker)
+        if await self._connect_one(broker, role):
+            self.health[role] = BrokerHealth()
+            self._switch(broker, reason)
+            return
+        logger.error(f"Could not switch to {role} broker, staying on {self._role(current)}")
+        await self._connect_one(current, self._role(current))
+        self.active_broker = current
+        self._switched_at = time.monotonic()
+    
+    async def _probe(self, broker: BrokerInterface) -> None:
+        role = self._role(broker)
+        if not getattr(broker, 'is_connected', True) and not await self._connect_one(broker, role):
+            self.health[role].record(0.0, False)
+            return
+        try:
+            await asyncio.wait_for(self._invoke(broker, 'ping'), self.probe_timeout)
+        except asyncio.TimeoutError:
+            self.health[role].record(self.probe_timeout, False)
+        except Exception as e:
+            logger.debug(f"Health probe of {role} broker failed: {e}")
+    
+    async def _health_loop(self) -> None:
+        """Probe brokers without recent traffic and re-evaluate failover"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                now = time.monotonic()
+                probes = [
+                    self._probe(broker) for broker in (self.primary, self.fallback)
+                    if broker is not None and (not self.cold_standby or broker is self.active_broker) and
+                    now - self.health[self._role(broker)].last_seen >= self.health_interval
+                ]
+                await asyncio.gather(*probes)
+                self._select()
+            except Exception as e:
+                logger.error(f"Broker health check error: {e}")
+    
+    def health_report(self) -> Dict[str, Any]:
+        """Health of each broker role and which one is active"""
+        report = {role: health.report() for role, health in self.health.items()
+                  if role == 'primary' or self.fallback}
+        report['active'] = self._role(self.active_broker) if self.active_broker else None
+        return report
+    
     async def get_all_symbols(self) -> List[str]:
-        if self.active_broker:
-            return await self.active_broker.get_all_symbols()
-        return []
+        return await self._call('get_all_symbols', [])
 
     async def get_market_data(self, symbol: str, timeframe: int = 60) -> Optional[MarketData]:
-        if self.active_broker:
-            return await self.active_broker.get_market_data(symbol, timeframe)
-        return None
+        data = await self._read('get_market_data', None, symbol, timeframe)
+        if data is not None and data.bid is not None:
+            self.ticks.add(symbol, data.timestamp, data.bid, data.ask)
+        return data
     
     async def get_history(self, symbol: str, timeframe: int = 60, count: int = 100) -> List[Dict]:
-        if self.active_broker:
-            return await self.active_broker.get_history(symbol, timeframe, count)
-        return []
+        return await self._read('get_history', [], symbol, timeframe, count)
+    
+    async def get_history_arrays(self, symbol: str, timeframe: int = 60, count: int = 100) -> HistoryArrays:
+        return await self._read('get_history_arrays', empty_history(), symbol, timeframe, count)
+    
+    async def subscribe_ticks(self, symbol: str, on_tick: Callable[[float, float], None],
+                              on_error: Optional[Callable[[Exception], None]] = None) -> Optional[Callable[[], Any]]:
+        def record(epoch: float, price: float) -> None:
+            self.ticks.add(symbol, epoch, price)
+            on_tick(epoch, price)
+        return await self._call('subscribe_ticks', None, symbol, record, on_error)
     
     async def place_order(self, order: Order) -> Tuple[bool, str]:
-        if self.active_broker:
-            return await self.active_broker.place_order(order)
-        return False, "No active broker"
+        success, message = await self._call('place_order', (False, "No active broker"), order)
+        if success:
+            order.order_id = str(order.order_id or message)
+            if order.status == "PENDING":
+                order.status = "OPEN"
+        try:
+            self.orders.add(order, status=None if success else "REJECTED")
+        except Exception as e:
+            # The order is already placed; history is best-effort
+            logger.error(f"Could not record order {order.order_id} for {order.symbol}: {e}")
+        return success, message
     
     async def close_order(self, order_id: str) -> Tuple[bool, str]:
-        if self.active_broker:
-            return await self.active_broker.close_order(order_id)
-        return False, "No active broker"
+        return await self._call('close_order', (False, "No active broker"), order_id)
     
     async def get_balance(self) -> Optional[float]:
-        if self.active_broker:
-            return await self.active_broker.get_balance()
-        return None
+        return await self._call('get_balance', None)
     
     async def get_open_orders(self) -> List[Order]:
-        if self.active_broker:
-            return await self.active_broker.get_open_orders()
-        return []
+        return await self._call('get_open_orders', [])
     
     def get_active_broker_type(self) -> Optional[BrokerType]:
-        if isinstance(self.active_broker, DerivBroker):
+        return self._broker_type(self.active_broker)
+    
+    @staticmethod
+    def _broker_type(broker: Optional[BrokerInterface]) -> Optional[BrokerType]:
+        if isinstance(broker, DerivBroker):
             return BrokerType.DERIV
-        elif isinstance(self.active_broker, MT5Broker):
-            return self.active_broker.broker_label
+        elif isinstance(broker, MT5Broker):
+            return broker.broker_label
+        elif isinstance(broker, SimulatedBroker):
+            return BrokerType.SIM
         return None
@@ -3,21 +3,25 @@ FastAPI Backend for Trading Bot
 Supports Deriv, MT5, Exness, and XM brokers
 Includes Market Scanner
 """
-from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence
 from datetime import datetime
+from collections import deque
 import asyncio
 import logging
 import os
+import time
 from dotenv import load_dotenv
 import json
 
 from backend.broker_connector import (
-    HybridBroker, DerivBroker, MT5Broker, BrokerConfig, 
+    HybridBroker, DerivBroker, MT5Broker, SimulatedBroker, BrokerConfig, 
     BrokerType, Order, MarketData
 )
+from instrumentation import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from market_stream import Bar, MarketStream
 
 load_dotenv()
 
@@ -44,6 +48,21 @@ active_connections: List[WebSocket] = []
 scanner_task: Optional[asyncio.Task] = None
 scanned_symbols: List[str] = []
 signals: List[Dict] = []
+symbol_signals: Dict[str, Dict] = {}
+
+# Tick streaming for the scanner
+SCANNER_TIMEFRAME = 60
+SCANNER_HISTORY = 50
+scanner_streaming: bool = os.getenv("SCANNER_STREAMING", "1") != "0"
+market_stream: Optional[MarketStream] = None
+stream_broker: Optional[HybridBroker] = None
+stream_source = None  # Broker the scanner's tick streams were opened on (changes on failover)
+scanner_history: Dict[str, Dict] = {}  # symbol -> {"closes": deque, "epoch": last bar epoch}
+
+# Scanner metrics (served with the broker metrics on /metrics)
+SCANNER_LOOP_SECONDS = REGISTRY.histogram('scanner_loop_seconds', 'Duration of one market scanner pass')
+SCANNER_SYMBOL_SECONDS = REGISTRY.histogram('scanner_symbol_seconds', 'Time to scan one symbol', ('symbol',))
+SCANNER_ERRORS = REGISTRY.counter('scanner_errors_total', 'Market scanner passes that failed')
 
 
 # ============ Pydantic Models ============
@@ -52,9 +71,18 @@ class BrokerConfigRequest(BaseModel):
     primary_broker: str
     fallback_broker: Optional[str] = None
     deriv_token: Optional[str] = None
+    deriv_connections: int = 1  # Market-data websockets (sharded by symbol when > 1)
     mt5_login: Optional[int] = None
     mt5_password: Optional[str] = None
     mt5_server: Optional[str] = None
+    sim_symbols: int = 10
+    sim_seed: int = 42
+    sim_tick_interval: float = 1.0
+    sim_latency_ms: float = 0.0
+    sim_slippage_bps: float = 0.0
+    sim_reject_rate: float = 0.0
+    health_interval: float = 10.0  # Seconds between broker health probes (0 disables)
+    hedge_reads: bool = False  # Also ask the fallback when the primary is slower than its p95
 
 class OrderRequest(BaseModel):
     symbol: str
@@ -67,48 +95,143 @@ class OrderRequest(BaseModel):
 class ScannerConfigRequest(BaseModel):
     symbols: List[str]
     interval: int = 60 # seconds
+    streaming: bool = True
 
 # ============ Scanner Logic ============
 
-async def market_scanner():
-    """Background task to scan markets for signals"""
+def ema_crossover_signal(symbol: str, closes: Sequence[float]) -> Optional[Dict]:
+    """Simplified EMA Crossover Strategy for demo"""
+    if len(closes) < 21:
+        return None
+    ema8 = sum(closes[-8:]) / 8
+    ema20 = sum(closes[-20:]) / 20
+
+    prev_ema8 = sum(closes[-9:-1]) / 8
+    prev_ema20 = sum(closes[-21:-1]) / 20
+
+    if prev_ema8 <= prev_ema20 and ema8 > ema20:
+        return {
+            "symbol": symbol,
+            "type": "BUY",
+            "reason": "EMA 8 crossed above EMA 20",
+            "timestamp": datetime.now().isoformat()
+        }
+    elif prev_ema8 >= prev_ema20 and ema8 < ema20:
+        return {
+            "symbol": symbol,
+            "type": "SELL",
+            "reason": "EMA 8 crossed below EMA 20",
+            "timestamp": datetime.now().isoformat()
+        }
+    return None
+
+async def on_scanner_bar(bar: Bar):
+    """Evaluate a scanned symbol when its streamed bar closes"""
     global signals
+    state = scanner_history.get(bar.symbol)
+    if state is None:
+        return
+    started = time.perf_counter()
+    closes = state["closes"]
+    if state["epoch"] is not None and bar.epoch <= state["epoch"]:
+        if closes:
+            closes[-1] = bar.close  # Seeded history already holds this bar
+    else:
+        closes.append(bar.close)
+    state["epoch"] = bar.epoch
+
+    signal = ema_crossover_signal(bar.symbol, list(closes))
+    symbol_signals.pop(bar.symbol, None)
+    if signal:
+        symbol_signals[bar.symbol] = signal
+    signals = list(symbol_signals.values())
+    SCANNER_SYMBOL_SECONDS.observe(time.perf_counter() - started, symbol=bar.symbol)
+    if signal:
+        await notify_clients({"type": "scanner_update", "signals": signals})
+
+async def stop_scanner_stream():
+    global market_stream, stream_broker, stream_source
+    if market_stream:
+        await market_stream.close()
+    market_stream = None
+    stream_broker = None
+    stream_source = None
+    scanner_history.clear()
+
+async def sync_scanner_stream() -> set:
+    """Match tick subscriptions to the scanned symbols
+
+    Failed streams are dropped by the MarketStream and resubscribed here on
+    the next pass.
+
+    Returns:
+        set: Symbols evaluated from the stream (ticked recently)
+    """
+    global market_stream, stream_broker, stream_source
+    if broker is not stream_broker or broker.active_broker is not stream_source:
+        # New broker, or a failover: resubscribe on the active one
+        await stop_scanner_stream()
+        market_stream = MarketStream(broker.subscribe_ticks, granularities=(SCANNER_TIMEFRAME,))
+        market_stream.on_bar_close(on_scanner_bar, SCANNER_TIMEFRAME)
+        stream_broker = broker
+        stream_source = broker.active_broker
+
+    wanted = set(scanned_symbols)
+    for symbol in market_stream.symbols:
+        if symbol not in wanted:
+            await market_stream.unsubscribe(symbol)
+            scanner_history.pop(symbol, None)
+            symbol_signals.pop(symbol, None)
+
+    for symbol in wanted - set(market_stream.symbols):
+        # Seed the close window once; afterwards closes come from the stream
+        history = await broker.get_history_arrays(symbol, timeframe=SCANNER_TIMEFRAME, count=SCANNER_HISTORY)
+        if not len(history['close']):
+            continue
+        scanner_history[symbol] = {
+            "closes": deque(history['close'].tolist(), maxlen=SCANNER_HISTORY),
+            "epoch": int(history['time'][-1]),
+        }
+        if not await market_stream.subscribe(symbol):
+            scanner_history.pop(symbol, None)
+
+    return set(market_stream.live_symbols)
+
+async def scan_once():
+    """One scanner pass: sync the tick streams and poll the other symbols"""
+    global signals
+    if broker and broker.active_broker and scanned_symbols:
+        streaming = await sync_scanner_stream() if scanner_streaming else set()
+        polled = [s for s in scanned_symbols if s not in streaming]
+        if polled:
+            for symbol in polled:
+                with SCANNER_SYMBOL_SECONDS.time(symbol=symbol):
+                    symbol_signals.pop(symbol, None)
+                    history = await broker.get_history_arrays(symbol, timeframe=SCANNER_TIMEFRAME, count=SCANNER_HISTORY)
+                    if len(history['close']) >= 20:
+                        signal = ema_crossover_signal(symbol, history['close'])
+                        if signal:
+                            symbol_signals[symbol] = signal
+
+            signals = list(symbol_signals.values())
+            if signals:
+                await notify_clients({"type": "scanner_update", "signals": signals})
+    elif market_stream:
+        await stop_scanner_stream()
+
+async def market_scanner():
+    """Background task to scan markets for signals
+
+    Streamed symbols are evaluated on bar close; symbols whose broker has
+    no tick feed fall back to polling history every minute.
+    """
     while True:
         try:
-            if broker and broker.active_broker and scanned_symbols:
-                new_signals = []
-                for symbol in scanned_symbols:
-                    # Simplified EMA Crossover Strategy for demo
-                    history = await broker.get_history(symbol, timeframe=60, count=50)
-                    if len(history) >= 20:
-                        closes = [h['close'] for h in history]
-                        ema8 = sum(closes[-8:]) / 8
-                        ema20 = sum(closes[-20:]) / 20
-
-                        prev_ema8 = sum(closes[-9:-1]) / 8
-                        prev_ema20 = sum(closes[-21:-1]) / 20
-
-                        if prev_ema8 <= prev_ema20 and ema8 > ema20:
-                            new_signals.append({
-                                "symbol": symbol,
-                                "type": "BUY",
-                                "reason": "EMA 8 crossed above EMA 20",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        elif prev_ema8 >= prev_ema20 and ema8 < ema20:
-                            new_signals.append({
-                                "symbol": symbol,
-                                "type": "SELL",
-                                "reason": "EMA 8 crossed below EMA 20",
-                                "timestamp": datetime.now().isoformat()
-                            })
-
-                signals = new_signals
-                if signals:
-                    await notify_clients({"type": "scanner_update", "signals": signals})
-
+            with SCANNER_LOOP_SECONDS.time():
+                await scan_once()
             await asyncio.sleep(60) # Scan every minute
         except Exception as e:
+            SCANNER_ERRORS.inc()
             logger.error(f"Scanner error: {e}")
             await asyncio.sleep(10)
 
@@ -119,15 +242,30 @@ async def startup_event():
     global scanner_task
     scanner_task = asyncio.create_task(market_scanner())
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/api/market/symbols")
 async def get_symbols():
     if not broker: return []
     return await broker.get_all_symbols()
 
+@app.get("/api/market/ticks/{symbol}")
+async def get_ticks(symbol: str, limit: int = 500):
+    """Most recent recorded ticks of a symbol as columns"""
+    if not broker: raise HTTPException(status_code=400, detail="Not connected")
+    ticks = broker.ticks.last(symbol, max(0, limit))
+    return {name: ticks[name].tolist() for name in ticks.dtype.names}
+
 @app.post("/api/scanner/configure")
 async def configure_scanner(config: ScannerConfigRequest):
-    global scanned_symbols
+    global scanned_symbols, scanner_streaming
     scanned_symbols = config.symbols
+    scanner_streaming = config.streaming
+    if not scanner_streaming:
+        await stop_scanner_stream()
     return {"status": "success", "scanning": scanned_symbols}
 
 @app.get("/api/scanner/signals")
@@ -138,7 +276,7 @@ def create_broker_instance(broker_type_str: str, config: BrokerConfigRequest):
     if broker_type_str == "deriv":
         token = config.deriv_token or os.getenv("DERIV_TOKEN")
         if not token: raise ValueError("Deriv token not provided")
-        return DerivBroker(token)
+        return DerivBroker(token, pool_size=config.deriv_connections)
     elif broker_type_str in ["mt5", "exness", "xm"]:
         if not all([config.mt5_login, config.mt5_password, config.mt5_server]):
             raise ValueError(f"{broker_type_str.upper()} credentials incomplete")
@@ -146,6 +284,13 @@ def create_broker_instance(broker_type_str: str, config: BrokerConfigRequest):
         if broker_type_str == "exness": b_type = BrokerType.EXNESS
         elif broker_type_str == "xm": b_type = BrokerType.XM
         return MT5Broker(config.mt5_login, config.mt5_password, config.mt5_server, b_type)
+    elif broker_type_str == "sim":
+        latency = config.sim_latency_ms / 1000
+        return SimulatedBroker(
+            num_symbols=config.sim_symbols, seed=config.sim_seed,
+            tick_interval=config.sim_tick_interval, latency=(latency / 2, latency),
+            slippage_bps=config.sim_slippage_bps, reject_rate=config.sim_reject_rate
+        )
     raise ValueError(f"Unknown broker: {broker_type_str}")
 
 @app.post("/api/broker/configure")
@@ -156,7 +301,10 @@ async def configure_broker(config: BrokerConfigRequest):
         fallback = None
         if config.fallback_broker and config.fallback_broker != "none":
             fallback = create_broker_instance(config.fallback_broker.lower(), config)
-        broker = HybridBroker(primary, fallback)
+        if broker:
+            await broker.disconnect()
+        broker = HybridBroker(primary, fallback, health_interval=config.health_interval,
+                              hedge_reads=config.hedge_reads)
         if await broker.connect():
             return {"success": True, "message": "Broker configured"}
         raise ConnectionError("Failed to connect")
@@ -167,11 +315,17 @@ async def configure_broker(config: BrokerConfigRequest):
 async def get_broker_status():
     if not broker: return {"connected": False}
     balance = await broker.get_balance()
-    return {
+    status = {
         "connected": broker.active_broker is not None,
         "active_broker": broker.get_active_broker_type().value if broker.active_broker else None,
-        "balance": balance
+        "balance": balance,
+        "health": broker.health_report()
     }
+    if isinstance(broker.active_broker, MT5Broker):
+        status["mt5_queue"] = broker.active_broker.executor.stats()
+    elif isinstance(broker.active_broker, DerivBroker) and broker.active_broker.pool:
+        status["deriv_pool"] = broker.active_broker.pool.load()
+    return status
 
 @app.get("/api/account/balance")
 async def get_balance():
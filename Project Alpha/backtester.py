@@ -0,0 +1,337 @@
+"""
+Backtester - Vectorized offline replay of the DerivTradingBot strategy
+Indicators, patterns and signals are computed over whole OHLC series at once;
+only the sparse trade entries are walked to simulate the ATR/RR exits
+"""
+import argparse
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import talib
+
+from account import size_stakes
+from patterns import BEARISH_PATTERNS, BULLISH_PATTERNS, TALIB_PATTERNS
+from performance import PerformanceTracker
+
+logger = logging.getLogger(__name__)
+
+OHLC = ('open', 'high', 'low', 'close')
+TRADE_COLUMNS = ('symbol', 'direction', 'entry_epoch', 'entry_price', 'stop_price',
+                 'target_price', 'exit_epoch', 'exit_price', 'status', 'profit_loss')
+
+
+@dataclass
+class BacktestSettings:
+    """Strategy parameters (as in BotConfig) and simulation settings"""
+    rsi_period: int = 14
+    atr_period: int = 14
+    adx_period: int = 14
+    bb_period: int = 20  # Not part of the entry rules; kept for parity with BotConfig
+    rr_ratio: float = 3.0
+    risk_percent: float = 0.01
+    sentiment_threshold: float = 0.5
+    min_candles: int = 60
+    trade_cooldown: int = 900
+
+    granularity: int = 900  # Bar size of the replayed data in seconds
+    initial_balance: float = 1000.0  # Balance the stake is sized from
+    sentiment: float = 0.0  # Sentiment score assumed for every bar
+    atr_stop_multiple: float = 1.0  # Stop distance in ATRs (target = rr_ratio x stop)
+    max_hold_bars: int = 96  # Close at market after this many bars
+
+    @classmethod
+    def from_config(cls, config, **overrides) -> 'BacktestSettings':
+        """Take the shared strategy fields from a BotConfig"""
+        names = {f.name for f in fields(cls)}
+        values = {name: getattr(config, name) for name in names if hasattr(config, name)}
+        values.update(overrides)
+        return cls(**values)
+
+
+@dataclass
+class BacktestResult:
+    """Trades and metrics of one backtest run"""
+    trades: pd.DataFrame
+    performance: PerformanceTracker
+    elapsed: float
+    bars: int
+    settings: BacktestSettings = field(repr=False, default_factory=BacktestSettings)
+
+    @property
+    def metrics(self) -> Dict:
+        """Headline metrics in the format of get_performance_metrics"""
+        return self.performance.summary()
+
+
+# --- DATA LOADING ---
+
+def load_candles(path: str) -> pd.DataFrame:
+    """Load OHLC candles from a CSV or Deriv-style JSON file
+
+    CSV files need open, high, low and close columns plus an epoch (or
+    time/timestamp) column; JSON files hold a list of candles or a
+    ``ticks_history`` response with a ``candles`` key.
+
+    Args:
+        path: Candle file
+
+    Returns:
+        pd.DataFrame: epoch, open, high, low, close sorted by epoch
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        df = pd.DataFrame(data['candles'] if isinstance(data, dict) else data)
+    else:
+        df = pd.read_csv(path)
+    df.columns = [str(c).lower() for c in df.columns]
+
+    if 'epoch' not in df:
+        time_col = next((c for c in ('time', 'timestamp', 'date', 'datetime') if c in df), None)
+        if time_col is None:
+            raise ValueError(f"{path}: no epoch/time column")
+        times = df[time_col]
+        if pd.api.types.is_numeric_dtype(times):
+            df['epoch'] = times.astype(np.int64)
+        else:
+            df['epoch'] = pd.to_datetime(times, utc=True).astype('int64') // 10**9
+
+    df = df[['epoch', 'open', 'high', 'low', 'close']].apply(pd.to_numeric, errors='coerce').dropna()
+    df['epoch'] = df['epoch'].astype(np.int64)
+    return df.sort_values('epoch').drop_duplicates('epoch', keep='last').reset_index(drop=True)
+
+
+def load_directory(path: str) -> Dict[str, pd.DataFrame]:
+    """Load every CSV/JSON candle file in a directory, keyed by file stem (the symbol)"""
+    frames = {}
+    for file in sorted(Path(path).iterdir()):
+        if file.suffix.lower() in ('.csv', '.json'):
+            frames[file.stem] = load_candles(str(file))
+    return frames
+
+
+# --- VECTORIZED STRATEGY ---
+
+def month_to_date_bias(epoch: np.ndarray, open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Bias of the forming monthly candle at every bar: +1 bullish, -1 bearish
+
+    Matches update_symbol_bias, which compares the latest monthly candle's
+    close with its open.
+    """
+    months = epoch.astype('datetime64[s]').astype('datetime64[M]')
+    starts = np.ones(len(epoch), dtype=bool)
+    starts[1:] = months[1:] != months[:-1]
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(epoch)), 0))
+    return np.where(close > open_[first], 1, -1).astype(np.int8)
+
+
+def pattern_flags(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                  close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Whether any bullish / bearish pattern column fires at each bar
+
+    Columns carry the signs of detect_patterns, so a bar counts as bullish
+    when a bullish column is > 0 and as bearish when a bearish column is < 0.
+    """
+    outputs: Dict[str, np.ndarray] = {}
+
+    def column(name: str) -> np.ndarray:
+        func, sign = TALIB_PATTERNS[name]
+        if func not in outputs:
+            outputs[func] = getattr(talib, func)(open_, high, low, close)
+        return outputs[func] * sign
+
+    bullish = np.zeros(len(close), dtype=bool)
+    for name in BULLISH_PATTERNS:
+        bullish |= column(name) > 0
+    bearish = np.zeros(len(close), dtype=bool)
+    for name in BEARISH_PATTERNS:
+        bearish |= column(name) < 0
+    return bullish, bearish
+
+
+def strategy_signals(epoch: np.ndarray, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                     close: np.ndarray, settings: BacktestSettings,
+                     sentiment: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Entry direction at every bar close under the process_symbol rules
+
+    Args:
+        epoch, open_, high, low, close: Candle series (float64, oldest first)
+        settings: Strategy parameters
+        sentiment: Per-bar sentiment (settings.sentiment everywhere if None)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Direction per bar (+1, -1 or 0) and ATR
+    """
+    rsi = talib.RSI(close, timeperiod=settings.rsi_period)
+    atr = talib.ATR(high, low, close, timeperiod=settings.atr_period)
+    adx = talib.ADX(high, low, close, timeperiod=settings.adx_period)
+    if sentiment is None:
+        sentiment = np.full(len(close), settings.sentiment)
+
+    bias = month_to_date_bias(epoch, open_, close)
+    bullish, bearish = pattern_flags(open_, high, low, close)
+    threshold = settings.sentiment_threshold
+
+    with np.errstate(invalid='ignore'):
+        trending = adx > 25
+        long_ = (bias == 1) & bullish & (sentiment > -threshold) & (rsi < 70) & trending
+        short = (bias == -1) & bearish & (sentiment < threshold) & (rsi > 30) & trending
+
+    direction = np.where(long_, 1, np.where(short, -1, 0)).astype(np.int8)
+    # The live bot needs min_candles bars before it evaluates a pair
+    direction[:max(settings.min_candles - 1, 0)] = 0
+    return direction, atr
+
+
+def simulate_exits(high: np.ndarray, low: np.ndarray, close: np.ndarray, entries: np.ndarray,
+                   directions: np.ndarray, stops: np.ndarray, targets: np.ndarray,
+                   max_hold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """First bar at which each trade's stop or target is touched
+
+    A bar touching both counts as a stop. Trades that touch neither close
+    at market ``max_hold`` bars (or the end of the data) later.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Exit bar index and exit price per trade
+    """
+    n = len(close)
+    exit_idx = np.empty(len(entries), dtype=np.int64)
+    exit_price = np.empty(len(entries))
+    for k, (i, d, stop, target) in enumerate(zip(entries, directions, stops, targets)):
+        last = min(i + max_hold, n - 1)
+        hi, lo = high[i + 1:last + 1], low[i + 1:last + 1]
+        if d > 0:
+            hit_stop, hit_target = lo <= stop, hi >= target
+        else:
+            hit_stop, hit_target = hi >= stop, lo <= target
+        s = np.argmax(hit_stop) if hit_stop.any() else n
+        t = np.argmax(hit_target) if hit_target.any() else n
+        if s == n and t == n:
+            exit_idx[k], exit_price[k] = last, close[last]
+        elif s <= t:
+            exit_idx[k], exit_price[k] = i + 1 + s, stop
+        else:
+            exit_idx[k], exit_price[k] = i + 1 + t, target
+    return exit_idx, exit_price
+
+
+class Backtester:
+    """Replays candle files through the strategy and scores the trades"""
+
+    def __init__(self, settings: Optional[BacktestSettings] = None):
+        self.settings = settings or BacktestSettings()
+
+    def run_symbol(self, symbol: str, data: Union[pd.DataFrame, Mapping[str, np.ndarray]]) -> pd.DataFrame:
+        """Backtest one symbol
+
+        Args:
+            symbol: Trading symbol
+            data: Candles with epoch, open, high, low, close columns; a
+                mapping of float64 arrays (e.g. memory-mapped) is used without copying
+
+        Returns:
+            pd.DataFrame: One row per trade (TRADE_COLUMNS)
+        """
+        s = self.settings
+        epoch = np.asarray(data['epoch'], dtype=np.int64)
+        o, h, l, c = (np.asarray(data[col], dtype=np.float64) for col in OHLC)
+        direction, atr = strategy_signals(epoch, o, h, l, c, s)
+
+        # Sequential only over the sparse signal bars: apply the trade cooldown
+        cooldown_bars = max(1, math.ceil(s.trade_cooldown / s.granularity))
+        entries, next_allowed = [], 0
+        for i in np.flatnonzero(direction):
+            if i >= next_allowed and i < len(c) - 1 and atr[i] > 0:
+                entries.append(i)
+                next_allowed = i + cooldown_bars
+        entries = np.asarray(entries, dtype=np.int64)
+        if not len(entries):
+            return pd.DataFrame(columns=list(TRADE_COLUMNS))
+
+        dirs = direction[entries].astype(np.float64)
+        entry_price = c[entries]
+        distance = atr[entries] * s.atr_stop_multiple
+        stops = entry_price - dirs * distance
+        targets = entry_price + dirs * distance * s.rr_ratio
+        exit_idx, exit_price = simulate_exits(h, l, c, entries, dirs, stops, targets, s.max_hold_bars)
+
+        # calculate_atr_limits risks one stake to make rr_ratio stakes
+        stake = size_stakes(s.initial_balance, [symbol], s.risk_percent)[symbol]
+        r_multiple = np.clip(dirs * (exit_price - entry_price) / distance, -1.0, s.rr_ratio)
+        profit = stake * r_multiple
+
+        return pd.DataFrame({
+            'symbol': symbol,
+            'direction': np.where(dirs > 0, 'BULLISH', 'BEARISH'),
+            'entry_epoch': epoch[entries],
+            'entry_price': entry_price,
+            'stop_price': stops,
+            'target_price': targets,
+            'exit_epoch': epoch[exit_idx],
+            'exit_price': exit_price,
+            'status': np.where(profit > 0, 'WON', 'LOST'),
+            'profit_loss': profit,
+        })
+
+    def run(self, frames: Mapping[str, Union[pd.DataFrame, Mapping[str, np.ndarray]]]) -> BacktestResult:
+        """Backtest every symbol and aggregate the metrics
+
+        Args:
+            frames: Candles per symbol (DataFrame or mapping of column arrays)
+
+        Returns:
+            BacktestResult: Trades ordered by exit time and their metrics
+        """
+        started = time.perf_counter()
+        trades = [self.run_symbol(symbol, df) for symbol, df in frames.items()]
+        trades = [t for t in trades if len(t)]
+        if trades:
+            trades = pd.concat(trades, ignore_index=True).sort_values(['exit_epoch', 'entry_epoch'],
+                                                                      kind='stable', ignore_index=True)
+        else:
+            trades = pd.DataFrame(columns=list(TRADE_COLUMNS))
+
+        performance = PerformanceTracker()
+        for symbol, status, pnl in zip(trades['symbol'], trades['status'], trades['profit_loss']):
+            performance.record_open(symbol)
+            performance.record_close(symbol, status, pnl)
+
+        return BacktestResult(
+            trades=trades,
+            performance=performance,
+            elapsed=time.perf_counter() - started,
+            bars=sum(len(data['close']) for data in frames.values()),
+            settings=self.settings,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest the trading bot strategy on local candle files")
+    parser.add_argument('data', help="Directory of <symbol>.csv / <symbol>.json candle files")
+    parser.add_argument('--granularity', type=int, default=900, help="Bar size in seconds")
+    parser.add_argument('--sentiment', type=float, default=0.0, help="Sentiment score assumed for every bar")
+    parser.add_argument('--trades', help="Write the trade list to this CSV file")
+    args = parser.parse_args()
+
+    frames = load_directory(args.data)
+    result = Backtester(BacktestSettings(granularity=args.granularity, sentiment=args.sentiment)).run(frames)
+
+    print(f"Backtested {len(frames)} symbols, {result.bars} bars in {result.elapsed:.2f}s")
+    for key, value in result.metrics.items():
+        print(f"{key}: {value}")
+    for symbol in frames:
+        print(f"  {symbol}: {result.performance.symbol_metrics(symbol)}")
+    if args.trades:
+        result.trades.to_csv(args.trades, index=False)
+
+
+if __name__ == "__main__":
+    main()
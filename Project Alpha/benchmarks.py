@@ -0,0 +1,276 @@
+"""
+Benchmarks - Offline timing of the trading hot paths
+Runs on fixed synthetic data across symbol counts and history lengths and
+saves the results to JSON so runs can be compared between commits
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RESULTS_DIR = Path('benchmark_results')
+
+
+def synthetic_candles(bars: int, seed: int = 0, granularity: int = 900) -> pd.DataFrame:
+    """Deterministic random-walk OHLC candles"""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.0, 0.001, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.0, 0.001, bars)))
+    epoch = 1_700_000_000 - 1_700_000_000 % granularity + granularity * np.arange(bars)
+    return pd.DataFrame({'epoch': epoch, 'open': open_, 'high': high, 'low': low, 'close': close})
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """Time ``number`` calls of ``func``, ``repeat`` times
+
+    Returns:
+        Dict[str, float]: min, median and mean milliseconds per call
+    """
+    func()  # Warm-up (imports, caches, first allocation)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number * 1000)
+    return {
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'calls': repeat * number,
+    }
+
+
+def measure_async(loop: asyncio.AbstractEventLoop, func: Callable[[], Awaitable[Any]],
+                  repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """``measure`` for a coroutine function, run on ``loop``"""
+    return measure(lambda: loop.run_until_complete(func()), repeat, number)
+
+
+class BenchmarkSuite:
+    """Registry of benchmark cases and their results"""
+
+    def __init__(self, symbol_counts: List[int], history_lengths: List[int],
+                 client_counts: List[int], repeat: int = 5):
+        self.symbol_counts = symbol_counts
+        self.history_lengths = history_lengths
+        self.client_counts = client_counts
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+        self.skipped: Dict[str, str] = {}
+        self.loop = asyncio.new_event_loop()
+        self._tmp = tempfile.TemporaryDirectory(prefix='bench-')
+
+    def record(self, case: str, params: Dict[str, Any], timing: Dict[str, float]) -> None:
+        self.results.append({'case': case, 'params': params, **timing})
+        label = ', '.join(f"{k}={v}" for k, v in params.items())
+        print(f"{case:<28} {label:<28} {timing['median_ms']:>10.3f} ms (min {timing['min_ms']:.3f})")
+
+    # --- DerivTradingBot ---
+
+    def _make_bot(self, symbols: List[str]):
+        from TradingAIBot import BotConfig, DerivTradingBot
+        logging.getLogger().setLevel(logging.WARNING)
+        config = BotConfig(
+            trading_pairs=symbols,
+            journal_path=str(Path(self._tmp.name) / 'trades.json'),
+            proposal_streams=False,
+            tick_streaming=False,
+        )
+        bot = DerivTradingBot(config)
+
+        async def no_trade(*args, **kwargs) -> None:
+            return None
+        bot.execute_trade = no_trade
+        return bot
+
+    def bench_bot(self) -> None:
+        try:
+            self._make_bot(['SYM0'])
+        except ImportError as e:
+            self.skipped['bot'] = str(e)
+            return
+
+        for bars in self.history_lengths:
+            df = synthetic_candles(bars)
+            bot = self._make_bot(['SYM0'])
+            self.record('calculate_indicators', {'bars': bars},
+                        measure(lambda: bot.calculate_indicators(df.copy()), self.repeat, 10))
+            self.record('detect_patterns', {'bars': bars},
+                        measure(lambda: bot.detect_patterns(df.copy()), self.repeat, 10))
+
+        from patterns import PatternEvaluator
+        df = synthetic_candles(max(self.history_lengths))
+        self.record('lazy_patterns', {'bars': len(df)},
+                    measure(lambda: PatternEvaluator.evaluate(df, 'BULLISH'), self.repeat, 100))
+
+        for count in self.symbol_counts:
+            for bars in self.history_lengths:
+                symbols = [f"SYM{i}" for i in range(count)]
+                frames = {s: synthetic_candles(bars, seed=i) for i, s in enumerate(symbols)}
+                bot = self._make_bot(symbols)
+                for i, s in enumerate(symbols):
+                    bot.bias[s] = 'BULLISH' if i % 2 else 'BEARISH'
+                    bot.stakes[s] = 1.0
+
+                async def decide_all() -> None:
+                    bot.cooldown_until.clear()
+                    for s in symbols:
+                        await bot.process_symbol(s, 0.0, frames[s])
+                self.record('process_symbol', {'symbols': count, 'bars': bars},
+                            measure_async(self.loop, decide_all, self.repeat))
+
+        bot = self._make_bot(['SYM0'])
+        from TradingAIBot import TradeRecord
+        trade = TradeRecord(timestamp=time.time(), symbol='SYM0', direction='BULLISH',
+                            entry_price=1.0, stake=1.0, stop_loss=1.0, take_profit=3.0)
+
+        async def save_many() -> None:
+            for _ in range(100):
+                bot.save_trade(trade)
+        self.record('save_trade', {'trades': 100}, measure_async(self.loop, save_many, self.repeat))
+        self.loop.run_until_complete(bot.journal.close())
+
+    # --- Backend ---
+
+    def bench_backend(self) -> None:
+        try:
+            import backend.main as api
+            from backend.broker_connector import DerivBroker, HybridBroker, SimulatedBroker
+        except ImportError as e:
+            self.skipped['backend'] = str(e)
+            return
+        logging.getLogger().setLevel(logging.WARNING)
+
+        for count in self.symbol_counts:
+            sim = SimulatedBroker(num_symbols=count, seed=1, history_bars=api.SCANNER_HISTORY * 2)
+            api.broker = HybridBroker(sim)
+            self.loop.run_until_complete(api.broker.connect())
+            api.scanned_symbols = list(sim.symbols)
+            api.scanner_streaming = False
+            self.record('market_scanner', {'symbols': count},
+                        measure_async(self.loop, api.scan_once, self.repeat))
+            self.loop.run_until_complete(api.broker.disconnect())
+        api.broker = None
+
+        for bars in self.history_lengths:
+            candles = synthetic_candles(bars, granularity=60)
+            response = {'candles': candles.to_dict('records')}
+
+            class CannedDerivAPI:
+                async def get_candles(self, **kwargs):
+                    return response
+
+            deriv = DerivBroker('benchmark')
+            deriv.deriv_api, deriv.is_connected = CannedDerivAPI(), True
+            self.record('get_history', {'broker': 'deriv', 'bars': bars},
+                        measure_async(self.loop, lambda: deriv.get_history('SYM0', 60, bars), self.repeat))
+            self.record('get_history_arrays', {'broker': 'deriv', 'bars': bars},
+                        measure_async(self.loop, lambda: deriv.get_history_arrays('SYM0', 60, bars), self.repeat))
+
+        class NullWebSocket:
+            async def send_json(self, message: Dict) -> None:
+                json.dumps(message)
+
+        message = {"type": "scanner_update", "signals": [
+            {"symbol": f"SYM{i}", "type": "BUY", "reason": "benchmark",
+             "timestamp": datetime.now().isoformat()} for i in range(20)
+        ]}
+        for clients in self.client_counts:
+            api.active_connections[:] = [NullWebSocket() for _ in range(clients)]
+            self.record('notify_clients', {'clients': clients},
+                        measure_async(self.loop, lambda: api.notify_clients(message), self.repeat, 10))
+        api.active_connections.clear()
+
+    def run(self) -> None:
+        self.bench_bot()
+        self.bench_backend()
+        for group, reason in self.skipped.items():
+            print(f"Skipped {group} benchmarks: {reason}")
+
+    def close(self) -> None:
+        self.loop.close()
+        self._tmp.cleanup()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'meta': run_metadata(), 'results': self.results, 'skipped': self.skipped}
+
+
+def run_metadata() -> Dict[str, Any]:
+    """Commit, interpreter and platform of this run"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def compare(baseline_path: str, results: List[Dict[str, Any]]) -> None:
+    """Print the median change of every case also present in a baseline file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {
+            (r['case'], json.dumps(r['params'], sort_keys=True)): r['median_ms']
+            for r in json.load(f)['results']
+        }
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        before = baseline.get((r['case'], json.dumps(r['params'], sort_keys=True)))
+        if before:
+            change = (r['median_ms'] - before) / before * 100
+            print(f"{r['case']:<28} {json.dumps(r['params']):<36} {before:>10.3f} -> {r['median_ms']:>10.3f} ms ({change:+.1f}%)")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the trading hot paths on synthetic data")
+    parser.add_argument('--symbols', type=_int_list, default=[1, 10, 50], help="Comma-separated symbol counts")
+    parser.add_argument('--bars', type=_int_list, default=[200, 1000, 5000], help="Comma-separated history lengths")
+    parser.add_argument('--clients', type=_int_list, default=[1, 10, 100], help="Comma-separated websocket client counts")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Results file (default: benchmark_results/<commit>-<time>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(args.symbols, args.bars, args.clients, args.repeat)
+    try:
+        suite.run()
+    finally:
+        suite.close()
+
+    data = suite.to_dict()
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{data['meta']['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(data, indent=2))
+    print(f"\nResults saved to {output}")
+    if args.compare:
+        compare(args.compare, suite.results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Candle Cache - Incremental per-symbol OHLC storage
+Backfills once, then only fetches bars newer than the last cached epoch
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLC_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+class CandleRingBuffer:
+    """Fixed-size ring buffer of OHLC candles ordered by epoch"""
+
+    def __init__(self, capacity: int):
+        """Create an empty buffer
+
+        Args:
+            capacity: Maximum number of candles retained
+        """
+        self.capacity = capacity
+        self._epochs = np.zeros(capacity, dtype=np.int64)
+        self._ohlc = np.zeros((capacity, len(OHLC_COLUMNS)), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_epoch(self) -> Optional[int]:
+        """Epoch of the newest cached candle, or None when empty"""
+        if not self._size:
+            return None
+        return int(self._epochs[(self._start + self._size - 1) % self.capacity])
+
+    def clear(self) -> None:
+        """Drop all cached candles"""
+        self._start = 0
+        self._size = 0
+
+    def upsert(self, candles: List[Dict]) -> int:
+        """Merge candles into the buffer
+
+        A candle with the same epoch as the newest cached one replaces it
+        (the forming bar keeps updating); newer candles are appended and
+        older ones are ignored.
+
+        Args:
+            candles: Candle dicts with epoch, open, high, low and close
+
+        Returns:
+            int: Number of candles appended
+        """
+        appended = 0
+        for candle in candles:
+            try:
+                epoch = int(candle['epoch'])
+                row = [float(candle[col]) for col in OHLC_COLUMNS]
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            last = self.last_epoch
+            if last is not None and epoch < last:
+                continue
+            if last is not None and epoch == last:
+                idx = (self._start + self._size - 1) % self.capacity
+            elif self._size < self.capacity:
+                idx = (self._start + self._size) % self.capacity
+                self._size += 1
+                appended += 1
+            else:
+                idx = self._start
+                self._start = (self._start + 1) % self.capacity
+                appended += 1
+
+            self._epochs[idx] = epoch
+            self._ohlc[idx] = row
+        return appended
+
+    def _order(self, count: Optional[int] = None) -> np.ndarray:
+        """Physical indices of the newest ``count`` candles, oldest first"""
+        size = self._size if count is None else min(count, self._size)
+        first = self._start + self._size - size
+        return (first + np.arange(size)) % self.capacity
+
+    def to_frame(self, count: Optional[int] = None) -> pd.DataFrame:
+        """Build a DataFrame of the newest candles
+
+        Args:
+            count: Number of candles to return (all if None)
+
+        Returns:
+            pd.DataFrame: epoch, open, high, low, close columns
+        """
+        order = self._order(count)
+        df = pd.DataFrame(self._ohlc[order], columns=list(OHLC_COLUMNS))
+        df.insert(0, 'epoch', self._epochs[order])
+        return df
+
+    def to_state(self) -> Dict:
+        """Compact, JSON-serializable copy of the buffer, oldest first"""
+        order = self._order()
+        return {
+            'capacity': self.capacity,
+            'epoch': self._epochs[order].tolist(),
+            'ohlc': self._ohlc[order].tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'CandleRingBuffer':
+        """Rebuild a buffer saved with ``to_state``"""
+        buffer = cls(int(state['capacity']))
+        size = min(len(state['epoch']), buffer.capacity)
+        if size:
+            buffer._epochs[:size] = state['epoch'][-size:]
+            buffer._ohlc[:size] = state['ohlc'][-size:]
+            buffer._size = size
+        return buffer
+
+
+class CandleCache:
+    """Candle cache keyed by symbol and granularity"""
+
+    def __init__(self, fetch: Callable[[Dict], Awaitable[Dict]]):
+        """Create the cache
+
+        Args:
+            fetch: Coroutine function issuing a Deriv ``ticks_history`` request
+        """
+        self.fetch = fetch
+        self.buffers: Dict[Tuple[str, int], CandleRingBuffer] = {}
+        self._locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Forget cached candles for one symbol, or for all symbols"""
+        if symbol is None:
+            self.buffers.clear()
+            return
+        for key in [k for k in self.buffers if k[0] == symbol]:
+            del self.buffers[key]
+
+    def export(self) -> Dict[str, Dict]:
+        """Serialize every non-empty buffer, keyed by symbol and granularity"""
+        return {
+            f"{symbol}|{granularity}": buffer.to_state()
+            for (symbol, granularity), buffer in self.buffers.items() if len(buffer)
+        }
+
+    def restore(self, state: Dict[str, Dict]) -> int:
+        """Load buffers saved with ``export``
+        
+        Restored buffers are refreshed incrementally on the next ``get``, or
+        backfilled again if the gap is wider than the buffer.
+
+        Returns:
+            int: Number of buffers restored
+        """
+        restored = 0
+        for key, buffer_state in state.items():
+            try:
+                symbol, granularity = key.rsplit('|', 1)
+                self.buffers[(symbol, int(granularity))] = CandleRingBuffer.from_state(buffer_state)
+                restored += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping cached candles {key}: {e}")
+        return restored
+
+    def push(self, symbol: str, granularity: int, candles: List[Dict]) -> bool:
+        """Merge locally built candles into an already backfilled buffer
+
+        Returns:
+            bool: False if the symbol has not been backfilled yet
+        """
+        buffer = self.buffers.get((symbol, granularity))
+        if buffer is None or not len(buffer):
+            return False
+        buffer.upsert(candles)
+        return True
+
+    def peek(self, symbol: str, granularity: int, count: int) -> Optional[pd.DataFrame]:
+        """Return cached candles without issuing a request"""
+        buffer = self.buffers.get((symbol, granularity))
+        if buffer is None or not len(buffer):
+            return None
+        return buffer.to_frame(count)
+
+    async def _request(self, symbol: str, granularity: int, count: int,
+                       start: Optional[int] = None) -> List[Dict]:
+        payload = {
+            "ticks_history": symbol,
+            "count": count,
+            "end": "latest",
+            "granularity": granularity,
+            "style": "candles"
+        }
+        if start is not None:
+            payload["start"] = start
+        res = await self.fetch(payload)
+        return res.get('candles') or []
+
+    async def get(self, symbol: str, granularity: int, count: int) -> Optional[pd.DataFrame]:
+        """Return the newest ``count`` candles, refreshing incrementally
+
+        Args:
+            symbol: Trading symbol
+            granularity: Time period in seconds
+            count: Number of candles required
+
+        Returns:
+            Optional[pd.DataFrame]: Candle data or None when nothing is cached
+        """
+        key = (symbol, granularity)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            buffer = self.buffers.get(key)
+            if buffer is None or buffer.capacity < count:
+                buffer = CandleRingBuffer(count)
+                self.buffers[key] = buffer
+
+            last = buffer.last_epoch
+            # A gap wider than the buffer cannot be bridged incrementally
+            if last is not None and (last + granularity * buffer.capacity) < self._latest_epoch_hint(granularity):
+                buffer.clear()
+                last = None
+
+            if last is None:
+                candles = await self._request(symbol, granularity, buffer.capacity)
+                buffer.upsert(candles)
+                logger.debug(f"[{symbol}] Backfilled {len(buffer)} candles ({granularity}s)")
+            else:
+                candles = await self._request(symbol, granularity, buffer.capacity, start=last)
+                appended = buffer.upsert(candles)
+                logger.debug(f"[{symbol}] Cache refresh: {len(candles)} received, {appended} new")
+
+            if not len(buffer):
+                return None
+            return buffer.to_frame(count)
+
+    @staticmethod
+    def _latest_epoch_hint(granularity: int) -> int:
+        """Start epoch of the current bar according to the local clock"""
+        now = int(time.time())
+        return now - now % granularity
@@ -0,0 +1,485 @@
+"""
+Indicators - Streaming and vectorized RSI, ATR, ADX and Bollinger Bands
+Mirrors TA-Lib's seeding and Wilder smoothing so values match talib output
+"""
+import math
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+INDICATOR_COLUMNS = ('RSI', 'ATR', 'ADX', 'BB_upper', 'BB_middle', 'BB_lower')
+
+
+def _is_zero(value: float) -> bool:
+    """Same zero test TA-Lib uses (TA_IS_ZERO)"""
+    return -1e-8 < value < 1e-8
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    return max(high - low, abs(prev_close - high), abs(low - prev_close))
+
+
+class StreamingRSI:
+    """Wilder RSI, seeded with the simple average of the first ``period`` changes"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.count = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, close: float, commit: bool = True) -> float:
+        if self.prev_close is None:
+            if commit:
+                self.prev_close = close
+            return NAN
+
+        n = self.period
+        diff = close - self.prev_close
+        up = diff if diff >= 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        count = self.count + 1
+
+        if count < n:
+            gain, loss, value = self.gain + up, self.loss + down, NAN
+        else:
+            if count == n:
+                gain = (self.gain + up) / n
+                loss = (self.loss + down) / n
+            else:
+                gain = (self.gain * (n - 1) + up) / n
+                loss = (self.loss * (n - 1) + down) / n
+            total = gain + loss
+            value = 100.0 * (gain / total) if not _is_zero(total) else 0.0
+
+        if commit:
+            self.prev_close, self.count, self.gain, self.loss = close, count, gain, loss
+        return value
+
+
+class StreamingATR:
+    """Wilder ATR, seeded with the simple average of the first ``period`` true ranges"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.count = 0
+        self.atr = 0.0
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> float:
+        if self.prev_close is None:
+            if commit:
+                self.prev_close = close
+            return NAN
+
+        n = self.period
+        tr = _true_range(high, low, self.prev_close)
+        count = self.count + 1
+
+        if count < n:
+            atr, value = self.atr + tr, NAN
+        else:
+            if count == n:
+                atr = (self.atr + tr) / n
+            else:
+                atr = (self.atr * (n - 1) + tr) / n
+            value = atr
+
+        if commit:
+            self.prev_close, self.count, self.atr = close, count, atr
+        return value
+
+
+class StreamingADX:
+    """Wilder ADX following TA-Lib's 2 * period - 1 bar warm-up"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev: Optional[tuple] = None  # (high, low, close)
+        self.count = 0
+        self.plus_dm = 0.0
+        self.minus_dm = 0.0
+        self.tr = 0.0
+        self.sum_dx = 0.0
+        self.adx = NAN
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> float:
+        if self.prev is None:
+            if commit:
+                self.prev = (high, low, close)
+            return NAN
+
+        n = self.period
+        prev_high, prev_low, prev_close = self.prev
+        diff_p = high - prev_high
+        diff_m = prev_low - low
+        plus_dm1 = minus_dm1 = 0.0
+        if diff_m > 0 and diff_p < diff_m:
+            minus_dm1 = diff_m
+        elif diff_p > 0 and diff_p > diff_m:
+            plus_dm1 = diff_p
+        tr1 = _true_range(high, low, prev_close)
+
+        count = self.count + 1
+        plus_dm, minus_dm, tr = self.plus_dm, self.minus_dm, self.tr
+        sum_dx, adx, value = self.sum_dx, self.adx, NAN
+
+        if count < n:
+            plus_dm += plus_dm1
+            minus_dm += minus_dm1
+            tr += tr1
+        else:
+            plus_dm = plus_dm - plus_dm / n + plus_dm1
+            minus_dm = minus_dm - minus_dm / n + minus_dm1
+            tr = tr - tr / n + tr1
+
+            dx = None
+            if not _is_zero(tr):
+                plus_di = 100.0 * (plus_dm / tr)
+                minus_di = 100.0 * (minus_dm / tr)
+                di_sum = plus_di + minus_di
+                if not _is_zero(di_sum):
+                    dx = 100.0 * (abs(minus_di - plus_di) / di_sum)
+
+            if count < 2 * n - 1:
+                if dx is not None:
+                    sum_dx += dx
+            elif count == 2 * n - 1:
+                if dx is not None:
+                    sum_dx += dx
+                adx = value = sum_dx / n
+            else:
+                if dx is not None:
+                    adx = (adx * (n - 1) + dx) / n
+                value = adx
+
+        if commit:
+            self.prev = (high, low, close)
+            self.count = count
+            self.plus_dm, self.minus_dm, self.tr = plus_dm, minus_dm, tr
+            self.sum_dx, self.adx = sum_dx, adx
+        return value
+
+
+class StreamingBollinger:
+    """SMA Bollinger Bands over a rolling window using running sums"""
+
+    def __init__(self, period: int = 20, nbdev: float = 2.0):
+        self.period = period
+        self.nbdev = nbdev
+        self.window: deque = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, close: float, commit: bool = True) -> tuple:
+        n = self.period
+        total = self.total + close
+        total_sq = self.total_sq + close * close
+        size = len(self.window) + 1
+        if size > n:
+            oldest = self.window[0]
+            total -= oldest
+            total_sq -= oldest * oldest
+            size = n
+
+        if commit:
+            self.window.append(close)
+            if len(self.window) > n:
+                self.window.popleft()
+            self.total, self.total_sq = total, total_sq
+
+        if size < n:
+            return NAN, NAN, NAN
+        middle = total / n
+        variance = total_sq / n - middle * middle
+        band = self.nbdev * (math.sqrt(variance) if variance > 0 else 0.0)
+        return middle + band, middle, middle - band
+
+
+class IndicatorEngine:
+    """Incremental RSI/ATR/ADX/BBANDS state for one symbol
+
+    ``update`` consumes one closed candle in constant time and returns the
+    indicator row for it. ``preview`` evaluates a still-forming candle
+    without advancing the state.
+    """
+
+    def __init__(self, rsi_period: int = 14, atr_period: int = 14,
+                 adx_period: int = 14, bb_period: int = 20, bb_dev: float = 2.0):
+        self.rsi = StreamingRSI(rsi_period)
+        self.atr = StreamingATR(atr_period)
+        self.adx = StreamingADX(adx_period)
+        self.bbands = StreamingBollinger(bb_period, bb_dev)
+        self.last_epoch: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config) -> 'IndicatorEngine':
+        """Build an engine using the periods of a BotConfig"""
+        return cls(config.rsi_period, config.atr_period, config.adx_period, config.bb_period)
+
+    def _step(self, candle: Dict, commit: bool) -> Dict[str, float]:
+        high, low, close = float(candle['high']), float(candle['low']), float(candle['close'])
+        upper, middle, lower = self.bbands.update(close, commit)
+        row = {
+            'RSI': self.rsi.update(close, commit),
+            'ATR': self.atr.update(high, low, close, commit),
+            'ADX': self.adx.update(high, low, close, commit),
+            'BB_upper': upper,
+            'BB_middle': middle,
+            'BB_lower': lower,
+        }
+        if commit and 'epoch' in candle:
+            self.last_epoch = int(candle['epoch'])
+        return row
+
+    def update(self, candle: Dict) -> Dict[str, float]:
+        """Advance the state with a closed candle
+
+        Args:
+            candle: Mapping with high, low, close (and optionally epoch)
+
+        Returns:
+            Dict[str, float]: Indicator row, NaN while warming up
+        """
+        return self._step(candle, commit=True)
+
+    def preview(self, candle: Dict) -> Dict[str, float]:
+        """Indicator row for a forming candle, leaving the state untouched"""
+        return self._step(candle, commit=False)
+
+    @property
+    def ready(self) -> bool:
+        """True once every indicator has produced a value"""
+        return (self.adx.count >= 2 * self.adx.period - 1
+                and self.rsi.count >= self.rsi.period
+                and self.atr.count >= self.atr.period
+                and len(self.bbands.window) >= self.bbands.period)
+
+
+class StreamingIndicators:
+    """Per-symbol indicator engines fed from candle DataFrames"""
+
+    def __init__(self, config):
+        self.config = config
+        self.engines: Dict[str, IndicatorEngine] = {}
+
+    def reset(self, symbol: str) -> None:
+        self.engines.pop(symbol, None)
+
+    def sync(self, symbol: str, df: pd.DataFrame) -> Dict[str, float]:
+        """Feed closed bars not seen yet and evaluate the last (forming) bar
+
+        Args:
+            symbol: Trading symbol
+            df: Candle DataFrame with epoch, high, low and close columns
+
+        Returns:
+            Dict[str, float]: Indicator row for the last bar of ``df``
+        """
+        engine = self.engines.get(symbol)
+        epochs = df['epoch'].to_numpy()
+        closed = len(df) - 1
+
+        # History that no longer overlaps the engine state means bars were missed
+        if engine is not None and engine.last_epoch is not None and epochs[0] > engine.last_epoch:
+            engine = None
+        if engine is None:
+            engine = self.engines[symbol] = IndicatorEngine.from_config(self.config)
+
+        start = 0
+        if engine.last_epoch is not None:
+            start = int(np.searchsorted(epochs[:closed], engine.last_epoch, side='right'))
+
+        highs = df['high'].to_numpy()
+        lows = df['low'].to_numpy()
+        closes = df['close'].to_numpy()
+        for i in range(start, closed):
+            engine.update({'epoch': epochs[i], 'high': highs[i], 'low': lows[i], 'close': closes[i]})
+
+        return engine.preview({'high': highs[-1], 'low': lows[-1], 'close': closes[-1]})
+
+
+# --- VECTORIZED MULTI-SYMBOL PANEL ---
+
+def panel_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """RSI for every row of a (symbols x bars) close panel"""
+    out = np.full(close.shape, np.nan)
+    n = period
+    if close.shape[1] <= n:
+        return out
+    diff = np.diff(close, axis=1)
+    up = np.where(diff >= 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    gain = up[:, :n].sum(axis=1) / n
+    loss = down[:, :n].sum(axis=1) / n
+    for t in range(n, close.shape[1]):
+        if t > n:
+            gain = (gain * (n - 1) + up[:, t - 1]) / n
+            loss = (loss * (n - 1) + down[:, t - 1]) / n
+        total = gain + loss
+        safe = np.where(np.abs(total) < 1e-8, 1.0, total)
+        out[:, t] = np.where(np.abs(total) < 1e-8, 0.0, 100.0 * gain / safe)
+    return out
+
+
+def _panel_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range for bars 1..T-1 of each row"""
+    prev_close = close[:, :-1]
+    return np.maximum.reduce([
+        high[:, 1:] - low[:, 1:],
+        np.abs(prev_close - high[:, 1:]),
+        np.abs(low[:, 1:] - prev_close),
+    ])
+
+
+def panel_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """ATR for every row of a (symbols x bars) panel"""
+    out = np.full(close.shape, np.nan)
+    n = period
+    if close.shape[1] <= n:
+        return out
+    tr = _panel_true_range(high, low, close)
+    atr = tr[:, :n].sum(axis=1) / n
+    out[:, n] = atr
+    for t in range(n + 1, close.shape[1]):
+        atr = (atr * (n - 1) + tr[:, t - 1]) / n
+        out[:, t] = atr
+    return out
+
+
+def panel_adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """ADX for every row of a (symbols x bars) panel"""
+    out = np.full(close.shape, np.nan)
+    n = period
+    if close.shape[1] <= 2 * n - 1:
+        return out
+
+    diff_p = high[:, 1:] - high[:, :-1]
+    diff_m = low[:, :-1] - low[:, 1:]
+    minus_dm1 = np.where((diff_m > 0) & (diff_p < diff_m), diff_m, 0.0)
+    plus_dm1 = np.where((minus_dm1 == 0) & (diff_p > 0) & (diff_p > diff_m), diff_p, 0.0)
+    tr1 = _panel_true_range(high, low, close)
+
+    plus_dm = plus_dm1[:, :n - 1].sum(axis=1)
+    minus_dm = minus_dm1[:, :n - 1].sum(axis=1)
+    tr = tr1[:, :n - 1].sum(axis=1)
+    sum_dx = np.zeros(close.shape[0])
+    adx = np.full(close.shape[0], np.nan)
+
+    for t in range(n, close.shape[1]):
+        plus_dm = plus_dm - plus_dm / n + plus_dm1[:, t - 1]
+        minus_dm = minus_dm - minus_dm / n + minus_dm1[:, t - 1]
+        tr = tr - tr / n + tr1[:, t - 1]
+
+        tr_ok = np.abs(tr) >= 1e-8
+        safe_tr = np.where(tr_ok, tr, 1.0)
+        plus_di = 100.0 * (plus_dm / safe_tr)
+        minus_di = 100.0 * (minus_dm / safe_tr)
+        di_sum = plus_di + minus_di
+        valid = tr_ok & (np.abs(di_sum) >= 1e-8)
+        dx = 100.0 * (np.abs(minus_di - plus_di) / np.where(valid, di_sum, 1.0))
+
+        if t < 2 * n - 1:
+            sum_dx += np.where(valid, dx, 0.0)
+        elif t == 2 * n - 1:
+            sum_dx += np.where(valid, dx, 0.0)
+            adx = sum_dx / n
+            out[:, t] = adx
+        else:
+            adx = np.where(valid, (adx * (n - 1) + dx) / n, adx)
+            out[:, t] = adx
+    return out
+
+
+def panel_bbands(close: np.ndarray, period: int, nbdev: float = 2.0) -> tuple:
+    """SMA Bollinger Bands (upper, middle, lower) for every row of a panel"""
+    upper = np.full(close.shape, np.nan)
+    middle = np.full(close.shape, np.nan)
+    lower = np.full(close.shape, np.nan)
+    if close.shape[1] < period:
+        return upper, middle, lower
+    windows = np.lib.stride_tricks.sliding_window_view(close, period, axis=1)
+    mean = windows.mean(axis=-1)
+    band = nbdev * windows.std(axis=-1)
+    middle[:, period - 1:] = mean
+    upper[:, period - 1:] = mean + band
+    lower[:, period - 1:] = mean - band
+    return upper, middle, lower
+
+
+class IndicatorPanel:
+    """OHLC for many symbols stacked as (symbols x bars) arrays
+
+    Indicators are computed for all symbols in one vectorized pass per bar
+    and stored in a single (indicators x symbols x bars) array, so the
+    per-symbol accessors return views rather than copies.
+    """
+
+    def __init__(self, symbols: Sequence[str], open_: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, epoch: Optional[np.ndarray] = None):
+        self.symbols: List[str] = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.epoch = epoch
+        self.values = np.full((len(INDICATOR_COLUMNS),) + close.shape, np.nan)
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], bars: Optional[int] = None) -> 'IndicatorPanel':
+        """Stack candle DataFrames, aligned on their most recent bars
+
+        Args:
+            frames: Candle DataFrame per symbol
+            bars: Number of trailing bars to keep (shortest frame if None)
+
+        Returns:
+            IndicatorPanel: Panel over the common trailing window
+        """
+        symbols = list(frames)
+        length = min(len(df) for df in frames.values())
+        if bars is not None:
+            length = min(length, bars)
+
+        def stack(column: str) -> np.ndarray:
+            out = np.empty((len(symbols), length))
+            for i, symbol in enumerate(symbols):
+                out[i] = frames[symbol][column].to_numpy(dtype=np.float64)[-length:]
+            return out
+
+        epoch = None
+        if all('epoch' in df for df in frames.values()):
+            epoch = np.stack([df['epoch'].to_numpy()[-length:] for df in frames.values()])
+        return cls(symbols, stack('open'), stack('high'), stack('low'), stack('close'), epoch)
+
+    def compute(self, rsi_period: int = 14, atr_period: int = 14, adx_period: int = 14,
+                bb_period: int = 20, bb_dev: float = 2.0) -> 'IndicatorPanel':
+        """Compute every indicator for the whole panel"""
+        upper, middle, lower = panel_bbands(self.close, bb_period, bb_dev)
+        self.values[0] = panel_rsi(self.close, rsi_period)
+        self.values[1] = panel_atr(self.high, self.low, self.close, atr_period)
+        self.values[2] = panel_adx(self.high, self.low, self.close, adx_period)
+        self.values[3] = upper
+        self.values[4] = middle
+        self.values[5] = lower
+        return self
+
+    def compute_from_config(self, config) -> 'IndicatorPanel':
+        """Compute using the periods of a BotConfig"""
+        return self.compute(config.rsi_period, config.atr_period, config.adx_period, config.bb_period)
+
+    def view(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Indicator series of one symbol as views into the panel"""
+        i = self.index[symbol]
+        return {name: self.values[k, i] for k, name in enumerate(INDICATOR_COLUMNS)}
+
+    def row(self, symbol: str, position: int = -1) -> Dict[str, float]:
+        """Indicator values of one symbol at a bar position"""
+        i = self.index[symbol]
+        return {name: float(self.values[k, i, position]) for k, name in enumerate(INDICATOR_COLUMNS)}
@@ -0,0 +1,218 @@
+"""
+Instrumentation - Low-overhead latency histograms and counters
+Metrics are kept in process and rendered in the Prometheus text format
+"""
+import asyncio
+import bisect
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set"""
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in self.values.items()
+        ]
+
+
+class Gauge(Counter):
+    """Current value per label set"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self._key(labels)] = value
+
+
+class _Timer:
+    __slots__ = ('histogram', 'key', 'started')
+
+    def __init__(self, histogram: 'Histogram', key: Tuple):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.histogram._observe(self.key, time.perf_counter() - self.started)
+        return False
+
+
+class StageClock:
+    """Records the time between successive marks, one series per stage"""
+    __slots__ = ('histogram', 'last')
+
+    def __init__(self, histogram: 'Histogram'):
+        self.histogram = histogram
+        self.last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Record the time since the previous mark under ``stage``"""
+        now = time.perf_counter()
+        self.histogram.observe(now - self.last, stage=stage)
+        self.last = now
+
+
+class Histogram(_Metric):
+    """Bucketed latency distribution per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self.series: Dict[Tuple, List[float]] = {}
+
+    def _observe(self, key: Tuple, value: float) -> None:
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one measurement in seconds"""
+        self._observe(self._key(labels), value)
+
+    def time(self, **labels: str) -> _Timer:
+        """Context manager recording the elapsed time of its block"""
+        return _Timer(self, self._key(labels))
+
+    def stages(self) -> StageClock:
+        """Stage clock for a histogram labelled by ``stage``"""
+        return StageClock(self)
+
+    def summary(self, **labels: str) -> Dict[str, float]:
+        """Count and mean of one label set"""
+        series = self.series.get(self._key(labels))
+        if not series:
+            return {'count': 0, 'mean': 0.0}
+        count = sum(series[:-1])
+        return {'count': count, 'mean': series[-1] / count if count else 0.0}
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _get(self, cls, name: str, help_text: str, labelnames: Sequence[str], **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help_text, labelnames, **kwargs)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+async def serve_metrics(port: int, registry: MetricsRegistry = REGISTRY,
+                        host: str = '0.0.0.0') -> Optional[asyncio.AbstractServer]:
+    """Serve ``GET /metrics`` on a plain asyncio server (for processes without a web app)
+
+    Returns:
+        Optional[asyncio.AbstractServer]: The server, or None if it could not start
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            path = request.split()[1] if len(request.split()) > 1 else b'/'
+            if path == b'/metrics':
+                body, status = registry.render().encode(), b'200 OK'
+            else:
+                body, status = b'Not Found\n', b'404 Not Found'
+            writer.write(b'HTTP/1.1 ' + status + b'\r\nContent-Type: ' + PROMETHEUS_CONTENT_TYPE.encode() +
+                         b'\r\nContent-Length: ' + str(len(body)).encode() + b'\r\nConnection: close\r\n\r\n' + body)
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    try:
+        server = await asyncio.start_server(handle, host, port)
+    except OSError as e:
+        logger.error(f"Could not serve metrics on port {port}: {e}")
+        return None
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,285 @@
+"""
+Market Stream - Local candle aggregation from tick subscriptions
+One tick subscription per symbol, bars built in memory, "bar closed" events
+dispatched to listeners
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TickCallback = Callable[[float, float], None]
+ErrorCallback = Callable[[Exception], None]
+TickSubscriber = Callable[[str, TickCallback, ErrorCallback], Awaitable[Optional[Callable[[], Any]]]]
+BarListener = Callable[['Bar'], Awaitable[None]]
+
+
+@dataclass
+class Bar:
+    """OHLC bar built from ticks"""
+    symbol: str
+    granularity: int
+    epoch: int  # Bar open time
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int = 1
+    partial: bool = False  # First bar after subscribing misses earlier ticks
+
+    @property
+    def end_epoch(self) -> int:
+        return self.epoch + self.granularity
+
+    def to_candle(self) -> Dict:
+        """Convert to a Deriv-style candle dict"""
+        return {
+            'epoch': self.epoch,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close
+        }
+
+
+class BarAggregator:
+    """Builds bars of several granularities from one symbol's ticks"""
+
+    def __init__(self, symbol: str, granularities: Sequence[int]):
+        self.symbol = symbol
+        self.granularities = tuple(granularities)
+        self.current: Dict[int, Bar] = {}
+        self._started: Dict[int, bool] = {}
+        self._closed_until: Dict[int, int] = {}
+        self.last_price: Optional[float] = None
+        self.last_epoch: Optional[float] = None
+        self.received_at = time.monotonic()  # Local time of the last tick (or of subscribing)
+
+    def add_tick(self, epoch: float, price: float) -> List[Bar]:
+        """Add a tick and return the bars it closed
+
+        Args:
+            epoch: Tick time in seconds
+            price: Tick quote
+
+        Returns:
+            List[Bar]: Bars whose period ended before this tick
+        """
+        if self.last_epoch is not None and epoch < self.last_epoch:
+            return []
+        self.last_price = price
+        self.last_epoch = epoch
+
+        closed = []
+        for granularity in self.granularities:
+            start = int(epoch) - int(epoch) % granularity
+            if start < self._closed_until.get(granularity, 0):
+                continue  # Late tick for a bar the clock already closed
+            bar = self.current.get(granularity)
+            if bar is not None and bar.epoch == start:
+                bar.high = max(bar.high, price)
+                bar.low = min(bar.low, price)
+                bar.close = price
+                bar.ticks += 1
+                continue
+            if bar is not None:
+                closed.append(bar)
+                self._closed_until[granularity] = bar.end_epoch
+            self.current[granularity] = Bar(
+                self.symbol, granularity, start, price, price, price, price,
+                partial=not self._started.get(granularity, False)
+            )
+            self._started[granularity] = True
+        return closed
+
+    def flush(self, now: float, grace: float = 0.0) -> List[Bar]:
+        """Close bars whose period ended without a newer tick
+
+        Args:
+            now: Current time in seconds
+            grace: Seconds to wait past the period end for late ticks
+
+        Returns:
+            List[Bar]: Bars closed by the clock
+        """
+        closed = []
+        for granularity, bar in list(self.current.items()):
+            if now >= bar.end_epoch + grace:
+                closed.append(bar)
+                self._closed_until[granularity] = bar.end_epoch
+                del self.current[granularity]
+        return closed
+
+
+class MarketStream:
+    """Tick subscriptions and bar-closed event dispatch for many symbols
+
+    A subscription that errors is dropped, and one without a tick for
+    ``stale_after`` seconds is left out of ``live_symbols``, so callers poll
+    those symbols instead. ``resubscribe`` renews every requested symbol,
+    e.g. after the connection was replaced.
+    """
+
+    def __init__(self, subscribe_ticks: TickSubscriber,
+                 granularities: Sequence[int] = (60, 900), close_grace: float = 2.0,
+                 stale_after: Optional[float] = None):
+        """Create the stream
+
+        Args:
+            subscribe_ticks: Coroutine ``(symbol, on_tick, on_error)`` starting
+                a tick subscription; returns a cancel callable, or None on failure
+            granularities: Bar sizes to build, in seconds
+            close_grace: Seconds past a bar's end before the clock closes it
+            stale_after: Seconds without a tick before a symbol counts as not
+                streaming (twice the smallest granularity if None)
+        """
+        self.subscribe_ticks = subscribe_ticks
+        self.granularities = tuple(granularities)
+        self.close_grace = close_grace
+        self.stale_after = 2 * min(self.granularities) if stale_after is None else stale_after
+        self.aggregators: Dict[str, BarAggregator] = {}
+        self._cancels: Dict[str, Callable[[], Any]] = {}
+        self._wanted: set = set()  # Requested symbols, kept while a dropped stream awaits renewal
+        self._listeners: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending: set = set()
+
+    def on_bar_close(self, listener: BarListener, granularity: Optional[int] = None) -> None:
+        """Register a coroutine called for every closed bar
+
+        Args:
+            listener: Coroutine receiving the closed Bar
+            granularity: Only deliver bars of this size (all sizes if None)
+        """
+        self._listeners.append((granularity, listener))
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbols with an open subscription"""
+        return list(self._cancels)
+
+    @property
+    def live_symbols(self) -> List[str]:
+        """Subscribed symbols that had a tick within ``stale_after`` seconds"""
+        now = time.monotonic()
+        return [symbol for symbol, aggregator in self.aggregators.items()
+                if now - aggregator.received_at < self.stale_after]
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """Latest streamed quote for a symbol, None if older than ``stale_after``"""
+        aggregator = self.aggregators.get(symbol)
+        if aggregator is None or time.monotonic() - aggregator.received_at >= self.stale_after:
+            return None
+        return aggregator.last_price
+
+    async def subscribe(self, symbol: str) -> bool:
+        """Subscribe to a symbol's ticks once
+
+        Returns:
+            bool: True if the symbol is streaming
+        """
+        self._wanted.add(symbol)
+        if symbol in self._cancels:
+            return True
+        aggregator = BarAggregator(symbol, self.granularities)
+        try:
+            cancel = await self.subscribe_ticks(
+                symbol,
+                lambda epoch, price: self._on_tick(aggregator, epoch, price),
+                lambda error: self._on_error(aggregator, error)
+            )
+        except Exception as e:
+            logger.error(f"[{symbol}] Tick subscription failed: {e}")
+            return False
+        if cancel is None:
+            return False
+        self.aggregators[symbol] = aggregator
+        self._cancels[symbol] = cancel
+        self._ensure_flush_task()
+        logger.info(f"[{symbol}] Streaming ticks")
+        return True
+
+    async def unsubscribe(self, symbol: str) -> None:
+        """Stop a symbol's tick subscription"""
+        self._wanted.discard(symbol)
+        await self._drop(symbol)
+
+    async def _drop(self, symbol: str) -> None:
+        self.aggregators.pop(symbol, None)
+        await self._cancel(symbol, self._cancels.pop(symbol, None))
+
+    @staticmethod
+    async def _cancel(symbol: str, cancel: Optional[Callable[[], Any]]) -> None:
+        if cancel is None:
+            return
+        try:
+            result = cancel()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"[{symbol}] Error cancelling tick subscription: {e}")
+
+    async def resubscribe(self) -> int:
+        """Renew the subscription of every requested symbol
+
+        Returns:
+            int: Number of symbols streaming again
+        """
+        for symbol in self.symbols:
+            await self._drop(symbol)
+        results = [await self.subscribe(symbol) for symbol in sorted(self._wanted)]
+        return sum(results)
+
+    async def close(self) -> None:
+        """Cancel every subscription and the flush timer"""
+        for symbol in self.symbols:
+            await self.unsubscribe(symbol)
+        self._wanted.clear()
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    def _on_tick(self, aggregator: BarAggregator, epoch: float, price: float) -> None:
+        aggregator.received_at = time.monotonic()
+        for bar in aggregator.add_tick(float(epoch), float(price)):
+            self._dispatch(bar)
+
+    def _on_error(self, aggregator: BarAggregator, error: Exception) -> None:
+        symbol = aggregator.symbol
+        if self.aggregators.get(symbol) is not aggregator:
+            return  # Error of a replaced subscription
+        logger.warning(f"[{symbol}] Tick stream failed, polling instead: {error}")
+        del self.aggregators[symbol]
+        task = asyncio.ensure_future(self._cancel(symbol, self._cancels.pop(symbol, None)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _dispatch(self, bar: Bar) -> None:
+        for granularity, listener in self._listeners:
+            if granularity is None or granularity == bar.granularity:
+                task = asyncio.ensure_future(self._notify(listener, bar))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    async def _notify(listener: BarListener, bar: Bar) -> None:
+        try:
+            await listener(bar)
+        except Exception as e:
+            logger.error(f"[{bar.symbol}] Bar listener error: {e}")
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Close bars on the clock when a period ends without ticks"""
+        while True:
+            await asyncio.sleep(1.0)
+            now = time.time()
+            for aggregator in list(self.aggregators.values()):
+                for bar in aggregator.flush(now, self.close_grace):
+                    self._dispatch(bar)
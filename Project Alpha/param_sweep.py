@@ -0,0 +1,245 @@
+"""
+Parameter Sweep - Multi-process BotConfig tuning on the backtester
+Market data is written once to a memory-mapped file that every worker maps
+read-only, so only parameter dicts and metric rows cross process boundaries
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtester import OHLC, Backtester, BacktestSettings, load_directory
+
+logger = logging.getLogger(__name__)
+
+SERIES = ('epoch',) + OHLC
+METRIC_COLUMNS = ('trades', 'win_rate', 'total_profit', 'max_drawdown', 'sharpe', 'profit_factor')
+
+# Default search space over the BotConfig strategy parameters
+DEFAULT_SPACE: Dict[str, Any] = {
+    'rsi_period': [7, 10, 14, 21],
+    'atr_period': [7, 14, 21],
+    'adx_period': [10, 14, 20],
+    'bb_period': [20],
+    'rr_ratio': [1.5, 2.0, 3.0],
+    'sentiment_threshold': [0.3, 0.5, 0.7],
+}
+
+
+class SharedMarketData:
+    """Candle series of many symbols in one memory-mapped (series x bars) file
+
+    Every symbol occupies a contiguous column range, so each series of a
+    symbol is a contiguous float64 view suitable for TA-Lib.
+    """
+
+    def __init__(self, path: str, index: Dict[str, Tuple[int, int]]):
+        self.path = path
+        self.index = index
+        self._data: Optional[np.ndarray] = None
+
+    @classmethod
+    def create(cls, frames: Mapping[str, pd.DataFrame], directory: str) -> 'SharedMarketData':
+        """Write candle frames to ``directory/market.npy`` once
+
+        Args:
+            frames: Candle DataFrame per symbol
+            directory: Where the shared file is written
+
+        Returns:
+            SharedMarketData: Handle that can be sent to worker processes
+        """
+        index, offset = {}, 0
+        for symbol, df in frames.items():
+            index[symbol] = (offset, offset + len(df))
+            offset += len(df)
+
+        path = os.path.join(directory, 'market.npy')
+        data = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(len(SERIES), offset))
+        for symbol, df in frames.items():
+            start, end = index[symbol]
+            for row, column in enumerate(SERIES):
+                data[row, start:end] = df[column].to_numpy(dtype=np.float64)
+        data.flush()
+        del data
+        return cls(path, index)
+
+    def __getstate__(self) -> Dict:
+        # Workers map the file themselves; the mapping is never pickled
+        return {'path': self.path, 'index': self.index}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__init__(state['path'], state['index'])
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            self._data = np.load(self.path, mmap_mode='r')
+        return self._data
+
+    def frames(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Column views per symbol, without copying"""
+        data = self.data
+        return {
+            symbol: {column: data[row, start:end] for row, column in enumerate(SERIES)}
+            for symbol, (start, end) in self.index.items()
+        }
+
+
+def grid_search(space: Mapping[str, Sequence]) -> List[Dict[str, Any]]:
+    """Every combination of the listed values"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space: Mapping[str, Any], samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Random configurations from a search space
+
+    Args:
+        space: Per parameter, a list of choices or a (low, high) tuple;
+            integer bounds draw integers, float bounds draw uniformly
+        samples: Number of configurations
+        seed: Random seed for reproducible sweeps
+
+    Returns:
+        List[Dict[str, Any]]: Parameter sets
+    """
+    rng = random.Random(seed)
+
+    def draw(spec: Any) -> Any:
+        if isinstance(spec, tuple):
+            low, high = spec
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(list(spec))
+
+    return [{name: draw(spec) for name, spec in space.items()} for _ in range(samples)]
+
+
+# Per-process state set by the pool initializer
+_worker_data: Dict[str, Dict[str, np.ndarray]] = {}
+_worker_base: Dict[str, Any] = {}
+
+
+def _init_worker(shared: SharedMarketData, base: Dict[str, Any]) -> None:
+    global _worker_data, _worker_base
+    _worker_data = shared.frames()
+    _worker_base = base
+
+
+def _evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Backtest one parameter set in a worker and return its metric row"""
+    settings = BacktestSettings(**{**_worker_base, **params})
+    result = Backtester(settings).run(_worker_data)
+    perf = result.performance
+    return {
+        **params,
+        'trades': perf.closed,
+        'win_rate': perf.win_rate,
+        'total_profit': perf.total_profit,
+        'max_drawdown': perf.max_drawdown,
+        'sharpe': perf.sharpe,
+        'profit_factor': perf.profit_factor,
+    }
+
+
+class ParameterSweep:
+    """Runs backtests for many configurations on a process pool"""
+
+    def __init__(self, frames: Mapping[str, pd.DataFrame], base: Optional[BacktestSettings] = None,
+                 workers: Optional[int] = None, workdir: Optional[str] = None):
+        """Create the sweep
+
+        Args:
+            frames: Candle DataFrame per symbol
+            base: Settings shared by every configuration
+            workers: Worker processes (all cores if None)
+            workdir: Directory for the memory-mapped data (temporary if None)
+        """
+        self.base = asdict(base or BacktestSettings())
+        self.workers = workers or os.cpu_count() or 1
+        self._tmp = tempfile.TemporaryDirectory(prefix='sweep-') if workdir is None else None
+        self.shared = SharedMarketData.create(frames, workdir or self._tmp.name)
+
+    def run(self, configs: Iterable[Dict[str, Any]], rank_by: str = 'sharpe',
+            min_trades: int = 1) -> pd.DataFrame:
+        """Backtest every configuration and rank the results
+
+        Args:
+            configs: Parameter sets overriding the base settings
+            rank_by: Metric column to sort by (descending)
+            min_trades: Configurations with fewer trades are ranked last
+
+        Returns:
+            pd.DataFrame: One row per configuration, best first
+        """
+        configs = list(configs)
+        started = time.perf_counter()
+        chunksize = max(1, len(configs) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.shared, self.base)) as pool:
+            rows = list(pool.map(_evaluate, configs, chunksize=chunksize))
+        elapsed = time.perf_counter() - started
+        logger.info(f"Swept {len(configs)} configurations on {self.workers} workers in {elapsed:.1f}s")
+
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        table['eligible'] = table['trades'] >= min_trades
+        table = table.sort_values(['eligible', rank_by], ascending=[False, False], ignore_index=True)
+        return table.drop(columns='eligible')
+
+    def close(self) -> None:
+        """Remove the temporary memory-mapped data"""
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over local candle files")
+    parser.add_argument('data', help="Directory of <symbol>.csv / <symbol>.json candle files")
+    parser.add_argument('--space', help="JSON search space (lists = choices, 2-item lists with --random = ranges)")
+    parser.add_argument('--random', type=int, default=0, help="Sample this many configurations instead of the full grid")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', default='sharpe', choices=METRIC_COLUMNS)
+    parser.add_argument('--granularity', type=int, default=900, help="Bar size in seconds")
+    parser.add_argument('--top', type=int, default=20, help="Rows to print")
+    parser.add_argument('--output', help="Write the full ranked table to this CSV file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    space = json.loads(Path(args.space).read_text()) if args.space and Path(args.space).exists() \
+        else json.loads(args.space) if args.space else DEFAULT_SPACE
+    if args.random:
+        space = {k: tuple(v) if isinstance(v, list) and len(v) == 2 else v for k, v in space.items()}
+        configs = random_search(space, args.random, args.seed)
+    else:
+        configs = grid_search(space)
+
+    sweep = ParameterSweep(load_directory(args.data), BacktestSettings(granularity=args.granularity),
+                           workers=args.workers)
+    try:
+        table = sweep.run(configs, rank_by=args.rank_by)
+    finally:
+        sweep.close()
+    print(table.head(args.top).to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Pattern Evaluator - Lazy, bias-aware candlestick pattern detection
+Evaluates TA-Lib's candlestick rules on the trailing bars of the last candle only
+"""
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# TA-Lib default candle settings: (range type, average period, factor)
+REAL_BODY, HIGH_LOW = 'RealBody', 'HighLow'
+CANDLE_SETTINGS: Dict[str, Tuple[str, int, float]] = {
+    'BodyLong': (REAL_BODY, 10, 1.0),
+    'BodyShort': (REAL_BODY, 10, 1.0),
+    'ShadowLong': (REAL_BODY, 0, 1.0),
+    'ShadowVeryShort': (HIGH_LOW, 10, 0.1),
+    'Near': (HIGH_LOW, 5, 0.2),
+    'Far': (HIGH_LOW, 5, 0.6),
+}
+
+
+class CandleWindow:
+    """Trailing OHLC bars with candle metrics memoized across patterns
+
+    Bars are addressed by offset from the newest one: 0 is the last bar,
+    1 the bar before it, and so on.
+    """
+
+    def __init__(self, open_: Sequence[float], high: Sequence[float],
+                 low: Sequence[float], close: Sequence[float]):
+        self.o = list(open_)
+        self.h = list(high)
+        self.l = list(low)
+        self.c = list(close)
+        self.size = len(self.c)
+        self._cache: Dict[tuple, float] = {}
+
+    def _idx(self, k: int) -> int:
+        return self.size - 1 - k
+
+    def body(self, k: int) -> float:
+        key = ('body', k)
+        if key not in self._cache:
+            i = self._idx(k)
+            self._cache[key] = abs(self.c[i] - self.o[i])
+        return self._cache[key]
+
+    def upper_shadow(self, k: int) -> float:
+        i = self._idx(k)
+        return self.h[i] - max(self.c[i], self.o[i])
+
+    def lower_shadow(self, k: int) -> float:
+        i = self._idx(k)
+        return min(self.c[i], self.o[i]) - self.l[i]
+
+    def color(self, k: int) -> int:
+        i = self._idx(k)
+        return 1 if self.c[i] >= self.o[i] else -1
+
+    def body_gap_up(self, k: int, prev: int) -> bool:
+        i, j = self._idx(k), self._idx(prev)
+        return min(self.o[i], self.c[i]) > max(self.o[j], self.c[j])
+
+    def body_gap_down(self, k: int, prev: int) -> bool:
+        i, j = self._idx(k), self._idx(prev)
+        return max(self.o[i], self.c[i]) < min(self.o[j], self.c[j])
+
+    def _range(self, range_type: str, i: int) -> float:
+        if range_type == REAL_BODY:
+            return abs(self.c[i] - self.o[i])
+        return self.h[i] - self.l[i]
+
+    def average(self, setting: str, k: int) -> float:
+        """TA_CANDLEAVERAGE of a setting for the bar at offset ``k``
+
+        The average covers the ``period`` bars preceding that bar.
+        """
+        key = (setting, k)
+        if key not in self._cache:
+            range_type, period, factor = CANDLE_SETTINGS[setting]
+            i = self._idx(k)
+            if period:
+                total = sum(self._range(range_type, j) for j in range(i - period, i))
+                value = factor * total / period
+            else:
+                value = factor * self._range(range_type, i)
+            self._cache[key] = value
+        return self._cache[key]
+
+    def engulfing(self) -> int:
+        """CDLENGULFING for the last bar (shared by both engulfing columns)"""
+        key = ('engulfing', 0)
+        if key in self._cache:
+            return self._cache[key]
+        o, c = self.o, self.c
+        i, p = self.size - 1, self.size - 2
+        value = 0
+        if ((self.color(0) == 1 and self.color(1) == -1 and
+             ((c[i] >= o[p] and o[i] < c[p]) or (c[i] > o[p] and o[i] <= c[p])))
+                or
+                (self.color(0) == -1 and self.color(1) == 1 and
+                 ((o[i] >= c[p] and c[i] < o[p]) or (o[i] > c[p] and c[i] <= o[p])))):
+            if o[i] != c[p] and c[i] != o[p]:
+                value = self.color(0) * 100
+            else:
+                value = self.color(0) * 80
+        self._cache[key] = value
+        return value
+
+
+# --- PATTERN RULES (TA-Lib semantics, evaluated on the last bar) ---
+
+def cdl_hammer(w: CandleWindow) -> int:
+    i1 = w._idx(1)
+    if (w.body(0) < w.average('BodyShort', 0) and
+            w.lower_shadow(0) > w.average('ShadowLong', 0) and
+            w.upper_shadow(0) < w.average('ShadowVeryShort', 0) and
+            min(w.c[-1], w.o[-1]) <= w.l[i1] + w.average('Near', 1)):
+        return 100
+    return 0
+
+
+def cdl_shooting_star(w: CandleWindow) -> int:
+    if (w.body(0) < w.average('BodyShort', 0) and
+            w.upper_shadow(0) > w.average('ShadowLong', 0) and
+            w.lower_shadow(0) < w.average('ShadowVeryShort', 0) and
+            w.body_gap_up(0, 1)):
+        return -100
+    return 0
+
+
+def cdl_piercing(w: CandleWindow) -> int:
+    i, p = w._idx(0), w._idx(1)
+    if (w.color(1) == -1 and
+            w.body(1) > w.average('BodyLong', 1) and
+            w.color(0) == 1 and
+            w.body(0) > w.average('BodyLong', 0) and
+            w.o[i] < w.l[p] and
+            w.c[i] < w.o[p] and
+            w.c[i] > w.c[p] + w.body(1) * 0.5):
+        return 100
+    return 0
+
+
+def cdl_dark_cloud_cover(w: CandleWindow, penetration: float = 0.5) -> int:
+    i, p = w._idx(0), w._idx(1)
+    if (w.color(1) == 1 and
+            w.body(1) > w.average('BodyLong', 1) and
+            w.color(0) == -1 and
+            w.o[i] > w.h[p] and
+            w.c[i] > w.o[p] and
+            w.c[i] < w.c[p] - w.body(1) * penetration):
+        return -100
+    return 0
+
+
+def cdl_morning_star(w: CandleWindow, penetration: float = 0.3) -> int:
+    i, f = w._idx(0), w._idx(2)
+    if (w.body(2) > w.average('BodyLong', 2) and
+            w.color(2) == -1 and
+            w.body(1) <= w.average('BodyShort', 1) and
+            w.body_gap_down(1, 2) and
+            w.body(0) > w.average('BodyShort', 0) and
+            w.color(0) == 1 and
+            w.c[i] > w.c[f] + w.body(2) * penetration):
+        return 100
+    return 0
+
+
+def cdl_evening_star(w: CandleWindow, penetration: float = 0.3) -> int:
+    i, f = w._idx(0), w._idx(2)
+    if (w.body(2) > w.average('BodyLong', 2) and
+            w.color(2) == 1 and
+            w.body(1) <= w.average('BodyShort', 1) and
+            w.body_gap_up(1, 2) and
+            w.body(0) > w.average('BodyShort', 0) and
+            w.color(0) == -1 and
+            w.c[i] < w.c[f] - w.body(2) * penetration):
+        return -100
+    return 0
+
+
+def cdl_three_white_soldiers(w: CandleWindow) -> int:
+    i, p, f = w._idx(0), w._idx(1), w._idx(2)
+    o, c = w.o, w.c
+    if (w.color(2) == 1 and
+            w.upper_shadow(2) < w.average('ShadowVeryShort', 2) and
+            w.color(1) == 1 and
+            w.upper_shadow(1) < w.average('ShadowVeryShort', 1) and
+            w.color(0) == 1 and
+            w.upper_shadow(0) < w.average('ShadowVeryShort', 0) and
+            c[i] > c[p] and c[p] > c[f] and
+            o[p] > o[f] and
+            o[p] <= c[f] + w.average('Near', 2) and
+            o[i] > o[p] and
+            o[i] <= c[p] + w.average('Near', 1) and
+            w.body(1) > w.body(2) - w.average('Far', 2) and
+            w.body(0) > w.body(1) - w.average('Far', 1) and
+            w.body(0) > w.average('BodyShort', 0)):
+        return 100
+    return 0
+
+
+def cdl_three_black_crows(w: CandleWindow) -> int:
+    i, p, f, g = w._idx(0), w._idx(1), w._idx(2), w._idx(3)
+    o, c = w.o, w.c
+    if (w.color(3) == 1 and
+            w.color(2) == -1 and
+            w.lower_shadow(2) < w.average('ShadowVeryShort', 2) and
+            w.color(1) == -1 and
+            w.lower_shadow(1) < w.average('ShadowVeryShort', 1) and
+            w.color(0) == -1 and
+            w.lower_shadow(0) < w.average('ShadowVeryShort', 0) and
+            o[p] < o[f] and o[p] > c[f] and
+            o[i] < o[p] and o[i] > c[p] and
+            w.h[g] > c[f] and
+            c[f] > c[p] and c[p] > c[i]):
+        return -100
+    return 0
+
+
+# Column name -> (rule, bars required). Values follow the sign conventions
+# of DerivTradingBot.detect_patterns so signals are unchanged.
+PatternRule = Callable[[CandleWindow], int]
+BULLISH_PATTERNS: Dict[str, Tuple[PatternRule, int]] = {
+    'Morning_Star': (cdl_morning_star, 13),
+    'Hammer': (cdl_hammer, 12),
+    'Bullish_Engulfing': (CandleWindow.engulfing, 3),
+    'Piercing_Line': (cdl_piercing, 12),
+    'Three_White_Soldiers': (cdl_three_white_soldiers, 13),
+}
+BEARISH_PATTERNS: Dict[str, Tuple[PatternRule, int]] = {
+    'Evening_Star': (lambda w: -cdl_evening_star(w), 13),
+    'Shooting_Star': (lambda w: -cdl_shooting_star(w), 12),
+    'Bearish_Engulfing': (lambda w: -w.engulfing(), 3),
+    'DarkCloud': (lambda w: -cdl_dark_cloud_cover(w), 12),
+    'Three_Black_Crows': (lambda w: -cdl_three_black_crows(w), 14),
+}
+PATTERNS_BY_BIAS = {'BULLISH': BULLISH_PATTERNS, 'BEARISH': BEARISH_PATTERNS}
+
+# Column name -> (TA-Lib function, sign) as computed by detect_patterns, for
+# vectorized evaluation over a whole series
+TALIB_PATTERNS: Dict[str, Tuple[str, int]] = {
+    'Bullish_Engulfing': ('CDLENGULFING', 1),
+    'Bearish_Engulfing': ('CDLENGULFING', -1),
+    'Hammer': ('CDLHAMMER', 1),
+    'Shooting_Star': ('CDLSHOOTINGSTAR', -1),
+    'Piercing_Line': ('CDLPIERCING', 1),
+    'DarkCloud': ('CDLDARKCLOUDCOVER', -1),
+    'Morning_Star': ('CDLMORNINGSTAR', 1),
+    'Evening_Star': ('CDLEVENINGSTAR', -1),
+    'Three_White_Soldiers': ('CDL3WHITESOLDIERS', 1),
+    'Three_Black_Crows': ('CDL3BLACKCROWS', -1),
+}
+
+
+class PatternEvaluator:
+    """Computes only the patterns relevant to a bias, on the last bar only"""
+
+    @staticmethod
+    def evaluate(df: pd.DataFrame, bias: Optional[str]) -> Dict[str, int]:
+        """Evaluate the patterns of one bias for the last candle of ``df``
+
+        Args:
+            df: DataFrame with OHLC data
+            bias: "BULLISH", "BEARISH" or anything else for no patterns
+
+        Returns:
+            Dict[str, int]: Pattern columns as produced by detect_patterns
+        """
+        rules = PATTERNS_BY_BIAS.get(bias)
+        if not rules:
+            return {}
+
+        bars = min(len(df), max(required for _, required in rules.values()))
+        window = CandleWindow(
+            df['open'].to_numpy()[-bars:], df['high'].to_numpy()[-bars:],
+            df['low'].to_numpy()[-bars:], df['close'].to_numpy()[-bars:],
+        )
+        return {
+            name: (rule(window) if bars >= required else 0)
+            for name, (rule, required) in rules.items()
+        }
@@ -0,0 +1,224 @@
+"""
+Performance Tracker - Incremental trading metrics
+Running totals updated on every trade open and close, so metrics are read in
+constant time however long the trade history grows
+"""
+import math
+from collections import deque
+from typing import Deque, Dict, Optional
+
+CLOSED_STATUSES = ('WON', 'LOST')
+
+
+class RollingStats:
+    """P&L statistics over the last ``window`` closed trades"""
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.values: Deque[float] = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.wins = 0
+
+    def push(self, pnl: float) -> None:
+        """Add a trade result, evicting the oldest once the window is full"""
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+            self.wins -= old > 0
+        self.values.append(pnl)
+        self.total += pnl
+        self.total_sq += pnl * pnl
+        self.wins += pnl > 0
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.count if self.count else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        """Mean over standard deviation of per-trade P&L (not annualised)"""
+        n = self.count
+        if n < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return self.mean / math.sqrt(variance) if variance > 1e-12 else 0.0
+
+    def to_state(self) -> Dict:
+        return {'window': self.window, 'values': list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'RollingStats':
+        stats = cls(int(state['window']))
+        for pnl in state['values']:
+            stats.push(float(pnl))
+        return stats
+
+    def to_dict(self) -> Dict:
+        return {
+            'trades': self.count,
+            'win_rate': self.win_rate,
+            'profit': self.total,
+            'sharpe': self.sharpe,
+        }
+
+
+class PerformanceTracker:
+    """Accumulates trade statistics as trades open and close"""
+
+    def __init__(self, window: int = 50):
+        """Create the tracker
+
+        Args:
+            window: Closed trades kept in each rolling window
+        """
+        self.window = window
+        self.opened = 0
+        self.open_trades = 0
+        self.closed = 0
+        self.wins = 0
+        self.cancelled = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        # Welford's running mean and variance of per-trade P&L
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.rolling = RollingStats(window)
+        self.by_symbol: Dict[str, RollingStats] = {}
+
+    def record_open(self, symbol: str) -> None:
+        """Count a newly opened trade"""
+        self.opened += 1
+        self.open_trades += 1
+
+    def record_close(self, symbol: str, status: str, profit_loss: Optional[float]) -> None:
+        """Fold a closed trade into the running statistics
+
+        Args:
+            symbol: Trading symbol
+            status: Final status ("WON", "LOST" or "CANCELLED")
+            profit_loss: Realised P&L of the trade
+        """
+        self.open_trades = max(0, self.open_trades - 1)
+        if status not in CLOSED_STATUSES:
+            self.cancelled += 1
+            return
+
+        pnl = float(profit_loss or 0.0)
+        self.closed += 1
+        if status == 'WON':
+            self.wins += 1
+        if pnl > 0:
+            self.gross_profit += pnl
+        else:
+            self.gross_loss -= pnl
+
+        self.equity += pnl
+        self.peak = max(self.peak, self.equity)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.equity)
+
+        delta = pnl - self._mean
+        self._mean += delta / self.closed
+        self._m2 += delta * (pnl - self._mean)
+
+        self.rolling.push(pnl)
+        stats = self.by_symbol.get(symbol)
+        if stats is None:
+            stats = self.by_symbol[symbol] = RollingStats(self.window)
+        stats.push(pnl)
+
+    @property
+    def total_profit(self) -> float:
+        return self.gross_profit - self.gross_loss
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.closed if self.closed else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        """Mean over standard deviation of per-trade P&L (not annualised)"""
+        if self.closed < 2:
+            return 0.0
+        std = math.sqrt(self._m2 / (self.closed - 1))
+        return self._mean / std if std > 1e-12 else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        if self.gross_loss == 0:
+            return math.inf if self.gross_profit > 0 else 0.0
+        return self.gross_profit / self.gross_loss
+
+    def symbol_metrics(self, symbol: str) -> Dict:
+        """Rolling-window metrics for one symbol"""
+        stats = self.by_symbol.get(symbol)
+        return stats.to_dict() if stats else RollingStats(self.window).to_dict()
+
+    def summary(self) -> Dict:
+        """Headline metrics in the format of get_performance_metrics"""
+        if not self.opened and not self.closed:
+            return {"total_trades": 0, "win_rate": 0, "total_profit": 0}
+        return {
+            "total_trades": self.closed,
+            "win_rate": f"{self.win_rate * 100:.2f}%",
+            "total_profit": f"${self.total_profit:.2f}",
+            "open_trades": self.open_trades,
+            "max_drawdown": f"${self.max_drawdown:.2f}",
+            "sharpe": round(self.sharpe, 3),
+            "profit_factor": round(self.profit_factor, 3),
+            "rolling_win_rate": f"{self.rolling.win_rate * 100:.2f}%",
+        }
+
+    STATE_FIELDS = ('opened', 'open_trades', 'closed', 'wins', 'cancelled', 'gross_profit',
+                    'gross_loss', 'equity', 'peak', 'max_drawdown', '_mean', '_m2')
+
+    def to_state(self) -> Dict:
+        """JSON-serializable accumulator state for snapshots"""
+        state = {name: getattr(self, name) for name in self.STATE_FIELDS}
+        state['window'] = self.window
+        state['rolling'] = self.rolling.to_state()
+        state['by_symbol'] = {symbol: stats.to_state() for symbol, stats in self.by_symbol.items()}
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'PerformanceTracker':
+        """Rebuild a tracker saved with ``to_state``"""
+        tracker = cls(int(state['window']))
+        for name in cls.STATE_FIELDS:
+            setattr(tracker, name, state[name])
+        tracker.rolling = RollingStats.from_state(state['rolling'])
+        tracker.by_symbol = {
+            symbol: RollingStats.from_state(stats) for symbol, stats in state['by_symbol'].items()
+        }
+        return tracker
+
+    def to_dict(self) -> Dict:
+        """Raw metrics, including every symbol's rolling window"""
+        return {
+            'opened': self.opened,
+            'open_trades': self.open_trades,
+            'closed': self.closed,
+            'cancelled': self.cancelled,
+            'wins': self.wins,
+            'win_rate': self.win_rate,
+            'total_profit': self.total_profit,
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'max_drawdown': self.max_drawdown,
+            'sharpe': self.sharpe,
+            'profit_factor': self.profit_factor,
+            'rolling': self.rolling.to_dict(),
+            'symbols': {symbol: stats.to_dict() for symbol, stats in self.by_symbol.items()},
+        }
@@ -0,0 +1,160 @@
+"""
+Proposal Streams - Pre-warmed contract proposals for fast order entry
+Keeps proposal subscriptions open for symbols whose setup is close to
+triggering, so a confirmed signal only needs the buy request
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ProposalCallback = Callable[[Dict], None]
+ProposalSubscriber = Callable[[Dict, ProposalCallback], Awaitable[Optional[Callable[[], Any]]]]
+
+
+@dataclass
+class WarmProposal:
+    """Latest proposal pushed by one subscription"""
+    symbol: str
+    contract_type: str
+    stake: float
+    cancel: Callable[[], Any]
+    proposal: Optional[Dict] = None
+    updated_at: float = 0.0
+    armed_at: float = field(default_factory=time.monotonic)
+
+    def stale(self, max_age: float) -> bool:
+        """No push within ``max_age`` seconds (counting from arming until the first one)"""
+        return time.monotonic() - max(self.updated_at, self.armed_at) > max_age
+
+
+class ProposalStreams:
+    """Bounded set of live proposal subscriptions, one per symbol"""
+
+    def __init__(self, subscribe: ProposalSubscriber, max_streams: int = 5, max_age: float = 5.0):
+        """Create the stream set
+
+        Args:
+            subscribe: Coroutine ``(payload, on_proposal)`` starting a proposal
+                subscription; returns a cancel callable, or None on failure
+            max_streams: Open subscriptions allowed; once reached, new symbols
+                are only armed when a stale stream can be dropped
+            max_age: Seconds after which a pushed proposal is not used and
+                its stream is re-armed
+        """
+        self.subscribe = subscribe
+        self.max_streams = max(1, max_streams)
+        self.max_age = max_age
+        self.streams: 'OrderedDict[str, WarmProposal]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def symbols(self):
+        return list(self.streams)
+
+    async def arm(self, symbol: str, contract_type: str, stake: float, payload: Dict) -> bool:
+        """Keep a proposal subscription open for a symbol
+
+        An existing fresh stream for the same contract and stake is reused;
+        a stale or different one replaces it. When ``max_streams`` are open,
+        stale streams of other symbols are dropped to make room; if none are
+        stale the symbol is not armed, so the open streams are not churned.
+
+        Args:
+            symbol: Trading symbol
+            contract_type: "CALL" or "PUT"
+            stake: Stake the proposal is priced for
+            payload: Proposal request, without the subscribe flag
+
+        Returns:
+            bool: True if a stream is open for the symbol
+        """
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            current = self.streams.get(symbol)
+            if current and (current.contract_type, current.stake) == (contract_type, stake) and \
+                    not current.stale(self.max_age):
+                self.streams.move_to_end(symbol)
+                return True
+            await self._drop(symbol)
+
+            for other in [s for s, w in self.streams.items() if w.stale(self.max_age)]:
+                if len(self.streams) < self.max_streams:
+                    break
+                await self._drop(other)
+            if len(self.streams) >= self.max_streams:
+                logger.debug(f"[{symbol}] Proposal streams full, not arming")
+                return False
+
+            warm = WarmProposal(symbol, contract_type, stake, cancel=lambda: None)
+
+            def on_proposal(proposal: Dict) -> None:
+                warm.proposal = proposal
+                warm.updated_at = time.monotonic()
+
+            try:
+                cancel = await self.subscribe(payload, on_proposal)
+            except Exception as e:
+                logger.warning(f"[{symbol}] Proposal stream unavailable: {e}")
+                return False
+            if cancel is None:
+                return False
+            warm.cancel = cancel
+            if len(self.streams) >= self.max_streams:
+                # Another symbol took the last slot while subscribing
+                await self._cancel(symbol, warm)
+                return False
+            self.streams[symbol] = warm
+            logger.debug(f"[{symbol}] Proposal stream armed ({contract_type} {stake:.2f})")
+            return True
+
+    async def disarm(self, symbol: str) -> None:
+        """Close a symbol's proposal subscription"""
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            await self._drop(symbol)
+
+    async def _drop(self, symbol: str) -> None:
+        warm = self.streams.pop(symbol, None)
+        if warm is not None:
+            await self._cancel(symbol, warm)
+
+    @staticmethod
+    async def _cancel(symbol: str, warm: WarmProposal) -> None:
+        try:
+            result = warm.cancel()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"[{symbol}] Error cancelling proposal stream: {e}")
+
+    def take(self, symbol: str, contract_type: str, stake: float) -> Optional[Tuple[str, float]]:
+        """Return a fresh proposal's (id, ask_price) if one matches
+
+        Args:
+            symbol: Trading symbol
+            contract_type: "CALL" or "PUT"
+            stake: Stake the order is for
+
+        Returns:
+            Optional[Tuple[str, float]]: Proposal id and ask price, or None
+        """
+        warm = self.streams.get(symbol)
+        if (warm is None or warm.proposal is None or
+                (warm.contract_type, warm.stake) != (contract_type, stake) or
+                time.monotonic() - warm.updated_at > self.max_age):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return warm.proposal['id'], warm.proposal['ask_price']
+
+    async def close(self) -> None:
+        """Close every proposal subscription"""
+        for symbol in self.symbols:
+            await self.disarm(symbol)
@@ -0,0 +1,54 @@
+"""
+Rate Limit - Token bucket for API request pacing
+Lets short bursts through at once and holds the sustained rate to the
+broker's request limit
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Asynchronous token bucket"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Create the bucket
+
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Largest burst; defaults to one second's worth of tokens
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if they are available right now"""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` are available, then take them
+
+        Waiters are served in arrival order.
+        """
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while not self.try_acquire(tokens):
+                    await asyncio.sleep((tokens - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
@@ -0,0 +1,150 @@
+"""
+Request Scheduler - Priority dispatch for a shared broker connection
+Orders go first, then account calls, then market data, each class with its
+own rate limit and a cap on requests in flight on the connection
+"""
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_DATA = 2
+PRIORITY_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_ACCOUNT: 'account', PRIORITY_DATA: 'data'}
+
+
+class ClassStats:
+    """Counters for one priority class"""
+
+    def __init__(self):
+        self.queued = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.latency_total = 0.0
+
+    def to_dict(self) -> Dict:
+        done = self.completed + self.failed
+        return {
+            'queue_depth': self.queued,
+            'max_queue_depth': self.max_depth,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_wait_ms': self.wait_total / done * 1000 if done else 0.0,
+            'avg_latency_ms': self.latency_total / done * 1000 if done else 0.0,
+        }
+
+
+class _Request:
+    """A queued request and the future its caller awaits"""
+    __slots__ = ('priority', 'queued_at', 'future', 'func', 'args', 'dispatched')
+
+    def __init__(self, priority: int, future: asyncio.Future, func: Callable, args: tuple):
+        self.priority = priority
+        self.queued_at = time.monotonic()
+        self.future = future
+        self.func = func
+        self.args = args
+        self.dispatched = False
+
+
+class RequestScheduler:
+    """Runs broker requests by priority with per-class rate limits"""
+
+    def __init__(self, max_inflight: int = 8, limits: Optional[Dict[int, TokenBucket]] = None):
+        """Create the scheduler
+
+        Args:
+            max_inflight: Requests allowed on the connection at once
+            limits: Token bucket per priority class (unlimited if missing)
+        """
+        self.max_inflight = max(1, max_inflight)
+        self.limits = limits or {}
+        self.inflight = 0
+        self.stats: Dict[int, ClassStats] = {p: ClassStats() for p in PRIORITY_NAMES}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: list = []
+        self._seq = itertools.count()
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.max_inflight:
+            self._workers.append(asyncio.ensure_future(self._worker()))
+
+    async def submit(self, priority: int, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run ``func(*args)`` once its class is within its rate limit and a slot is free
+
+        Args:
+            priority: PRIORITY_ORDER, PRIORITY_ACCOUNT or PRIORITY_DATA
+            func: Coroutine function issuing the request
+            *args: Arguments for ``func``
+
+        Returns:
+            Any: The request's result (its exception is re-raised)
+        """
+        stats = self.stats.setdefault(priority, ClassStats())
+        stats.submitted += 1
+        stats.queued += 1
+        stats.max_depth = max(stats.max_depth, stats.queued)
+        request = _Request(priority, asyncio.get_running_loop().create_future(), func, args)
+        try:
+            # Rate-limited requests wait in their bucket, not in a connection slot
+            bucket = self.limits.get(priority)
+            if bucket is not None:
+                await bucket.acquire()
+            self._ensure_workers()
+            self._queue.put_nowait((priority, next(self._seq), request))
+            return await request.future
+        finally:
+            if not request.dispatched:
+                # Cancelled before a worker picked it up
+                stats.queued -= 1
+                request.future.cancel()
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, request = await self._queue.get()
+            if request.future.done():
+                continue  # Caller gave up while queued
+            request.dispatched = True
+            stats = self.stats[request.priority]
+            stats.queued -= 1
+            started = time.monotonic()
+            stats.wait_total += started - request.queued_at
+            self.inflight += 1
+            try:
+                result = await request.func(*request.args)
+                stats.completed += 1
+                if not request.future.done():
+                    request.future.set_result(result)
+            except Exception as e:
+                stats.failed += 1
+                if not request.future.done():
+                    request.future.set_exception(e)
+            finally:
+                self.inflight -= 1
+                stats.latency_total += time.monotonic() - started
+
+    def metrics(self) -> Dict:
+        """Queue depth and latency per class"""
+        return {
+            'inflight': self.inflight,
+            **{PRIORITY_NAMES.get(p, str(p)): s.to_dict() for p, s in self.stats.items()},
+        }
+
+    async def close(self) -> None:
+        """Stop the workers"""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
@@ -0,0 +1,207 @@
+"""
+Ring Store - Fixed-capacity columnar tick and order history per symbol
+Rows live in preallocated NumPy record arrays that wrap around, so memory
+stays bounded however long the process runs
+"""
+import bisect
+import operator
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+TICK_DTYPE = np.dtype([('time', 'f8'), ('bid', 'f8'), ('ask', 'f8')])
+ORDER_DTYPE = np.dtype([
+    ('time', 'f8'), ('side', 'i1'), ('status', 'u1'), ('entry_price', 'f8'), ('stake', 'f8'),
+    ('stop_loss', 'f8'), ('take_profit', 'f8'), ('order_id', 'S24'),
+])
+ORDER_STATUSES = ('PENDING', 'OPEN', 'CLOSED', 'WON', 'LOST', 'CANCELLED', 'REJECTED')
+_STATUS_CODES = {status: code for code, status in enumerate(ORDER_STATUSES)}
+
+
+class RingBuffer:
+    """Record array of fixed capacity; the oldest rows are overwritten first
+
+    Rows are addressed oldest first. Reads return views of the storage
+    unless the requested range wraps around its end.
+    """
+    __slots__ = ('data', 'capacity', 'start', 'size')
+
+    def __init__(self, capacity: int, dtype: np.dtype):
+        self.capacity = max(1, int(capacity))
+        self.data = np.zeros(self.capacity, dtype=dtype)
+        self.start = 0  # Storage index of the oldest row
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def append(self, *values: Any) -> None:
+        """Add one row (values in dtype field order)"""
+        end = (self.start + self.size) % self.capacity
+        self.data[end] = values
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Add many rows at once (a record array of the same fields)"""
+        rows = np.asarray(rows, dtype=self.data.dtype)
+        n = len(rows)
+        if n >= self.capacity:
+            self.data[:] = rows[n - self.capacity:]
+            self.start, self.size = 0, self.capacity
+            return
+        end = (self.start + self.size) % self.capacity
+        first = min(n, self.capacity - end)
+        self.data[end:end + first] = rows[:first]
+        self.data[:n - first] = rows[first:]
+        overflow = self.size + n - self.capacity
+        if overflow > 0:
+            self.start = (self.start + overflow) % self.capacity
+            self.size = self.capacity
+        else:
+            self.size += n
+
+    def _range(self, begin: int, end: int) -> np.ndarray:
+        lo = (self.start + begin) % self.capacity
+        count = max(0, end - begin)
+        if lo + count <= self.capacity:
+            return self.data[lo:lo + count]
+        return np.concatenate((self.data[lo:], self.data[:lo + count - self.capacity]))
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        if isinstance(key, slice):
+            begin, end, step = key.indices(self.size)
+            if step == 1:
+                return self._range(begin, end)
+            return self._range(0, self.size)[key]
+        index = operator.index(key)
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('ring index out of range')
+        return self.data[(self.start + index) % self.capacity]
+
+    def last(self, n: int) -> np.ndarray:
+        """The newest ``n`` rows, oldest first"""
+        return self._range(max(0, self.size - n), self.size)
+
+    def since(self, epoch: float) -> np.ndarray:
+        """Rows with ``time >= epoch`` (rows must be appended in time order)"""
+        times, start, capacity = self.data['time'], self.start, self.capacity
+        begin = bisect.bisect_left(range(self.size), epoch, key=lambda i: times[(start + i) % capacity])
+        return self._range(begin, self.size)
+
+    def to_numpy(self) -> np.ndarray:
+        """All rows, oldest first"""
+        return self._range(0, self.size)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """All rows as a DataFrame with one column per field"""
+        return pd.DataFrame(self.to_numpy())
+
+    def clear(self) -> None:
+        self.start = self.size = 0
+
+
+class SymbolRings:
+    """One RingBuffer per symbol, allocated on the first write"""
+
+    def __init__(self, capacity: int, dtype: np.dtype):
+        self.capacity = capacity
+        self.dtype = dtype
+        self.rings: Dict[str, RingBuffer] = {}
+
+    def ring(self, symbol: str) -> RingBuffer:
+        ring = self.rings.get(symbol)
+        if ring is None:
+            ring = self.rings[symbol] = RingBuffer(self.capacity, self.dtype)
+        return ring
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.rings
+
+    def __getitem__(self, symbol: str) -> np.ndarray:
+        """All rows of a symbol, oldest first (empty if none)"""
+        ring = self.rings.get(symbol)
+        return ring.to_numpy() if ring else np.empty(0, dtype=self.dtype)
+
+    def last(self, symbol: str, n: int) -> np.ndarray:
+        ring = self.rings.get(symbol)
+        return ring.last(n) if ring else np.empty(0, dtype=self.dtype)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.rings)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by all rings"""
+        return sum(ring.nbytes for ring in self.rings.values())
+
+    def to_pandas(self, symbol: str) -> pd.DataFrame:
+        return pd.DataFrame(self[symbol])
+
+    def drop(self, symbol: str) -> None:
+        self.rings.pop(symbol, None)
+
+
+class TickStore(SymbolRings):
+    """Bounded bid/ask tick history per symbol (24 bytes per tick)"""
+
+    def __init__(self, capacity: int = 50_000):
+        super().__init__(capacity, TICK_DTYPE)
+
+    def add(self, symbol: str, epoch: float, bid: float, ask: Optional[float] = None) -> None:
+        """Record a tick; a single price is stored as both bid and ask"""
+        self.ring(symbol).append(epoch, bid, bid if ask is None else ask)
+
+    def to_pandas(self, symbol: str) -> pd.DataFrame:
+        """Ticks of a symbol indexed by UTC time"""
+        frame = super().to_pandas(symbol)
+        frame.index = pd.to_datetime(frame.pop('time'), unit='s', utc=True)
+        return frame
+
+
+class OrderStore(SymbolRings):
+    """Bounded order event history per symbol
+
+    Each ``add`` stores the order's state at that moment, so a fill and a
+    later close of the same order are two rows.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        super().__init__(capacity, ORDER_DTYPE)
+
+    def add(self, order: Any, status: Optional[str] = None) -> None:
+        """Record an Order (or any object with the same fields)
+
+        Args:
+            order: Order to record
+            status: Status to store instead of ``order.status``
+        """
+        self.ring(order.symbol).append(
+            order.timestamp,
+            1 if order.direction in ('BUY', 'BULLISH') else -1,
+            _STATUS_CODES.get(status or order.status, 0),
+            order.entry_price or 0.0,
+            order.stake or 0.0,
+            order.stop_loss or 0.0,
+            order.take_profit or 0.0,
+            str(order.order_id or '').encode()[:24],
+        )
+
+    def to_pandas(self, symbol: str) -> pd.DataFrame:
+        """Orders of a symbol with readable side, status and id columns"""
+        frame = super().to_pandas(symbol)
+        frame['time'] = pd.to_datetime(frame['time'], unit='s', utc=True)
+        frame['side'] = np.where(frame['side'] > 0, 'BUY', 'SELL')
+        frame['status'] = np.asarray(ORDER_STATUSES)[frame['status'].to_numpy()]
+        frame['order_id'] = frame['order_id'].str.decode('utf-8')
+        return frame
@@ -0,0 +1,377 @@
+"""
+Market Sentiment - Background-refreshed, per-symbol news sentiment
+Headlines are fetched over a reused async HTTP session and scored once by a
+compiled keyword matcher; readers get a stale-while-revalidate cached score
+and never wait on the network
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+
+POSITIVE_KEYWORDS = ['bullish', 'surge', 'gain', 'rally', 'growth', 'up']
+NEGATIVE_KEYWORDS = ['bearish', 'decline', 'loss', 'fall', 'crash', 'down']
+KEYWORD_WEIGHT = 0.5
+
+# Plain inflections of the lexicon roots ("gains", "surged", "falling")
+INFLECTIONS = r'(?:s|es|d|ed|ing)?'
+IRREGULAR_FORMS = {'rallies': 'rally', 'rallied': 'rally', 'losses': 'loss', 'fell': 'fall'}
+
+CURRENCY_ALIASES: Dict[str, List[str]] = {
+    'EUR': ['euro', 'eur', 'eurozone'],
+    'USD': ['dollar', 'usd', 'greenback'],
+    'GBP': ['pound', 'sterling', 'gbp', 'cable'],
+    'JPY': ['yen', 'jpy'],
+    'CHF': ['swiss franc', 'franc', 'chf'],
+    'ZAR': ['rand', 'zar'],
+    'NZD': ['kiwi', 'nzd', 'new zealand dollar'],
+    'AUD': ['aussie', 'aud', 'australian dollar'],
+    'CAD': ['loonie', 'cad', 'canadian dollar'],
+}
+
+SYMBOL_ALIASES: Dict[str, List[str]] = {
+    'XAUUSD': ['gold', 'xau', 'xauusd', 'bullion'],
+    'XAGUSD': ['silver', 'xag', 'xagusd'],
+    'AS_INDEX': ['asx', 'asx 200', 'australia 200', 'australian stocks'],
+    'HK_INDEX': ['hang seng', 'hong kong stocks'],
+    'DE_INDEX': ['dax', 'germany 40', 'german stocks'],
+    'JP_INDEX': ['nikkei', 'japan 225', 'japan stocks'],
+    'ES_INDEX': ['ibex', 'spain 35', 'spanish stocks'],
+    'UK_INDEX': ['ftse', 'uk 100', 'uk stocks'],
+}
+
+
+def _compile_terms(terms: Iterable[str], suffix: str = '') -> re.Pattern:
+    """One case-insensitive alternation with word boundaries, longest terms first"""
+    ordered = sorted(set(terms), key=len, reverse=True)
+    body = '|'.join(re.escape(term) for term in ordered)
+    return re.compile(rf'\b({body}){suffix}\b', re.IGNORECASE)
+
+
+def symbol_terms(symbol: str) -> List[Tuple[str, int]]:
+    """Alias terms for a symbol with the sign news about them carries
+
+    Forex pairs match their pair code and base currency with +1 and their
+    quote currency with -1 (good news for the dollar is bad for EUR/USD).
+    """
+    terms = [(alias, 1) for alias in SYMBOL_ALIASES.get(symbol, [])]
+    if symbol.startswith('frx') and len(symbol) == 9:
+        base, quote = symbol[3:6], symbol[6:9]
+        terms += [(f'{base}/{quote}', 2), (f'{base}{quote}', 2)]
+        terms += [(alias, 1) for alias in CURRENCY_ALIASES.get(base, [])]
+        terms += [(alias, -1) for alias in CURRENCY_ALIASES.get(quote, [])]
+    return terms
+
+
+@dataclass
+class ArticleScore:
+    """Sentiment of one article and the symbols it mentions"""
+    score: float
+    symbols: Dict[str, int] = field(default_factory=dict)  # symbol -> +1 / -1
+
+
+@dataclass
+class SentimentSnapshot:
+    """Scores computed from one batch of articles"""
+    score: float = 0.0
+    by_symbol: Dict[str, float] = field(default_factory=dict)
+    articles: int = 0
+
+
+class SentimentScorer:
+    """Keyword sentiment with a compiled lexicon and per-symbol attribution"""
+
+    def __init__(self, symbols: Iterable[str] = (), positive: Iterable[str] = POSITIVE_KEYWORDS,
+                 negative: Iterable[str] = NEGATIVE_KEYWORDS, cache_size: int = 10000):
+        """Compile the lexicon and symbol aliases once
+
+        Args:
+            symbols: Symbols to attribute articles to
+            positive: Bullish keyword roots
+            negative: Bearish keyword roots
+            cache_size: Article scores kept, keyed by article hash
+        """
+        self.weights: Dict[str, float] = {}
+        for word in positive:
+            self.weights[word.lower()] = KEYWORD_WEIGHT
+        for word in negative:
+            self.weights[word.lower()] = -KEYWORD_WEIGHT
+        for form, root in IRREGULAR_FORMS.items():
+            if root in self.weights:
+                self.weights.setdefault(form, self.weights[root])
+        self.keyword_pattern = _compile_terms(self.weights, INFLECTIONS)
+
+        self.aliases: Dict[str, List[Tuple[str, int]]] = {}
+        for symbol in symbols:
+            for term, sign in symbol_terms(symbol):
+                self.aliases.setdefault(term.lower(), []).append((symbol, sign))
+        self.alias_pattern = _compile_terms(self.aliases) if self.aliases else None
+
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, ArticleScore]' = OrderedDict()
+
+    @staticmethod
+    def article_key(article: Dict) -> str:
+        """Stable hash identifying an article across refreshes"""
+        ident = article.get('url') or f"{article.get('title')}|{article.get('publishedAt')}"
+        return hashlib.sha1(ident.encode('utf-8', 'ignore')).hexdigest()
+
+    def score_text(self, text: str) -> float:
+        """Sum of keyword weights, each keyword counted once"""
+        found = {m.group(1).lower() for m in self.keyword_pattern.finditer(text)}
+        return sum(self.weights[word] for word in found)
+
+    def match_symbols(self, text: str) -> Dict[str, int]:
+        """Symbols mentioned in ``text`` with the sign of the strongest mention"""
+        if self.alias_pattern is None:
+            return {}
+        strongest: Dict[str, int] = {}
+        for m in self.alias_pattern.finditer(text):
+            for symbol, sign in self.aliases[m.group(1).lower()]:
+                if abs(sign) > abs(strongest.get(symbol, 0)) or (
+                        abs(sign) == abs(strongest.get(symbol, 0)) and sign > 0):
+                    strongest[symbol] = sign
+        return {symbol: (1 if sign > 0 else -1) for symbol, sign in strongest.items()}
+
+    def score_article(self, article: Dict) -> ArticleScore:
+        """Score an article, reusing the cached result when seen before"""
+        key = self.article_key(article)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        title = article.get('title') or ''
+        text = f"{title} {article.get('description') or ''}"
+        result = ArticleScore(self.score_text(title), self.match_symbols(text))
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def score_articles(self, articles: List[Dict]) -> SentimentSnapshot:
+        """Global and per-symbol scores, each clamped to [-1, 1]"""
+        if not articles:
+            return SentimentSnapshot()
+
+        total = 0.0
+        sums: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for article in articles:
+            result = self.score_article(article)
+            total += result.score
+            for symbol, sign in result.symbols.items():
+                sums[symbol] = sums.get(symbol, 0.0) + sign * result.score
+                counts[symbol] = counts.get(symbol, 0) + 1
+
+        by_symbol = {symbol: _clamp(sums[symbol] / counts[symbol]) for symbol in sums}
+        return SentimentSnapshot(_clamp(total / len(articles)), by_symbol, len(articles))
+
+
+def _clamp(value: float) -> float:
+    return max(-1.0, min(1.0, value))
+
+
+class NewsClient:
+    """NewsAPI client reusing one HTTP session across requests"""
+
+    def __init__(self, api_key: str, timeout: float = 10.0, query: str = "stock market forex",
+                 page_size: int = 10, stub_path: Optional[str] = None):
+        """Create the client
+
+        Args:
+            api_key: NewsAPI key
+            timeout: Total request timeout in seconds
+            query: Search query
+            page_size: Articles per request
+            stub_path: JSON file with a NewsAPI response to serve offline
+        """
+        self.api_key = api_key
+        self.timeout = timeout
+        self.query = query
+        self.page_size = page_size
+        self.stub_path = stub_path
+        self._session = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key or self.stub_path)
+
+    def _params(self) -> Dict:
+        return {
+            "q": self.query,
+            "language": "en",
+            "sortBy": "publishedAt",
+            "apiKey": self.api_key,
+            "pageSize": self.page_size,
+        }
+
+    async def fetch_articles(self) -> List[Dict]:
+        """Fetch the latest articles
+
+        Raises:
+            Exception: On network, timeout or decoding errors
+        """
+        if self.stub_path:
+            data = json.loads(await asyncio.to_thread(Path(self.stub_path).read_text))
+        elif aiohttp:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                )
+            async with self._session.get(NEWS_API_URL, params=self._params()) as response:
+                data = await response.json()
+        else:
+            # Without aiohttp keep a pooled requests session off the event loop
+            if self._session is None:
+                self._session = requests.Session()
+            response = await asyncio.to_thread(
+                self._session.get, NEWS_API_URL, params=self._params(), timeout=self.timeout
+            )
+            data = response.json()
+
+        if data.get('status') == 'error':
+            raise RuntimeError(data.get('message', 'NewsAPI error'))
+        return data.get('articles', [])
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session"""
+        if self._session is None:
+            return
+        result = self._session.close()
+        if asyncio.iscoroutine(result):
+            await result
+        self._session = None
+
+
+@dataclass
+class SentimentReading:
+    """Cached sentiment score with its age"""
+    score: float
+    age: Optional[float]  # Seconds since the last successful refresh, None if never
+    stale: bool
+    symbol_specific: bool = False  # False when falling back to the market-wide score
+
+
+class SentimentService:
+    """Stale-while-revalidate sentiment cache refreshed by a background task"""
+
+    def __init__(self, client: NewsClient, refresh_interval: float,
+                 retry_interval: float = 60.0, scorer: Optional[SentimentScorer] = None):
+        """Create the service
+
+        Args:
+            client: News source
+            refresh_interval: Seconds a score stays fresh
+            retry_interval: Seconds before retrying after a failed refresh
+            scorer: Article scorer (market-wide only if None)
+        """
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.scorer = scorer or SentimentScorer()
+        self.snapshot = SentimentSnapshot()
+        self.updated_at: Optional[float] = None
+        self.retry_at: Optional[float] = None  # No revalidation before this after a failed refresh
+        self._inflight: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    @property
+    def stale(self) -> bool:
+        age = self.age
+        return age is None or age >= self.refresh_interval
+
+    @property
+    def score(self) -> float:
+        return self.snapshot.score
+
+    def read(self, symbol: Optional[str] = None) -> SentimentReading:
+        """Return the cached score immediately, revalidating in the background if stale
+
+        Args:
+            symbol: Symbol to score (market-wide score if None or not mentioned)
+        """
+        stale = self.stale
+        if stale and self.client.configured and (self.retry_at is None or time.monotonic() >= self.retry_at):
+            self._revalidate()
+        if symbol is not None and symbol in self.snapshot.by_symbol:
+            return SentimentReading(self.snapshot.by_symbol[symbol], self.age, stale, True)
+        return SentimentReading(self.snapshot.score, self.age, stale)
+
+    def _revalidate(self) -> asyncio.Task:
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        return self._inflight
+
+    async def refresh(self) -> bool:
+        """Refresh now, joining a refresh already in flight
+
+        Returns:
+            bool: True if the score was updated
+        """
+        return await asyncio.shield(self._revalidate())
+
+    async def _refresh(self) -> bool:
+        try:
+            articles = await self.client.fetch_articles()
+        except Exception as e:
+            logger.error(f"Error fetching sentiment: {e}")
+            self.retry_at = time.monotonic() + self.retry_interval
+            return False
+
+        if not articles:
+            logger.warning("No articles found for sentiment analysis")
+            self.retry_at = time.monotonic() + self.retry_interval
+            return False
+
+        self.snapshot = self.scorer.score_articles(articles)
+        self.updated_at = time.monotonic()
+        self.retry_at = None
+        logger.info(f"Market Sentiment Updated: {self.snapshot.score:.2f} "
+                    f"({len(articles)} articles, {len(self.snapshot.by_symbol)} symbols)")
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            ok = await self.refresh()
+            await asyncio.sleep(self.refresh_interval if ok else self.retry_interval)
+
+    def start(self) -> None:
+        """Start the background refresh task"""
+        if not self.client.configured:
+            logger.warning("News API key not configured, using neutral sentiment")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop refreshing and release the HTTP session"""
+        for task in (self._task, self._inflight):
+            if task and not task.done():
+                task.cancel()
+        self._task = None
+        self._inflight = None
+        await self.client.close()
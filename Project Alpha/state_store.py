@@ -0,0 +1,139 @@
+"""
+State Store - Persistent warm-state snapshot for fast restarts
+Keeps expiring key/value entries in a gzip-compressed JSON file that is
+rewritten atomically on an interval and read back at startup
+"""
+import asyncio
+import calendar
+import gzip
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def next_month_start(epoch: Optional[float] = None) -> float:
+    """Epoch of the first second of the next UTC month"""
+    t = time.gmtime(time.time() if epoch is None else epoch)
+    year, month = (t.tm_year + 1, 1) if t.tm_mon == 12 else (t.tm_year, t.tm_mon + 1)
+    return float(calendar.timegm((year, month, 1, 0, 0, 0)))
+
+
+class StateStore:
+    """Expiring entries persisted to a compact local snapshot"""
+
+    def __init__(self, path: str = 'bot_state.json.gz', interval: float = 300.0):
+        """Create the store
+
+        Args:
+            path: Snapshot file
+            interval: Seconds between periodic saves
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._saving: Optional[asyncio.Future] = None  # Worker-thread save, outlives cancellation
+
+    def put(self, key: str, value: Any, valid_until: Optional[float] = None) -> None:
+        """Store a JSON-serializable value
+
+        Args:
+            key: Entry name
+            value: Value to persist
+            valid_until: Epoch after which the entry is discarded (never if None)
+        """
+        self.entries[key] = {'value': value, 'valid_until': valid_until}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return an entry's value if it is still valid"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        if entry['valid_until'] is not None and entry['valid_until'] <= time.time():
+            del self.entries[key]
+            return default
+        return entry['value']
+
+    def load(self) -> int:
+        """Read the snapshot, dropping expired entries
+
+        Returns:
+            int: Number of valid entries restored
+        """
+        if not self.path.exists():
+            return 0
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable state snapshot {self.path}: {e}")
+            return 0
+        if data.get('version') != SNAPSHOT_VERSION:
+            logger.warning(f"Ignoring state snapshot version {data.get('version')}")
+            return 0
+
+        now = time.time()
+        self.entries = {
+            key: entry for key, entry in data.get('entries', {}).items()
+            if entry.get('valid_until') is None or entry['valid_until'] > now
+        }
+        age = now - data.get('saved_at', now)
+        logger.info(f"Restored {len(self.entries)} state entries ({age:.0f}s old)")
+        return len(self.entries)
+
+    def save(self, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Write the snapshot atomically
+
+        Args:
+            entries: Entries to write (the current ones if None)
+        """
+        entries = self.entries if entries is None else entries
+        payload = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'entries': entries}
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def start(self, collect: Callable[[], None]) -> None:
+        """Save periodically, calling ``collect`` first to refresh the entries"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run(collect))
+
+    async def _run(self, collect: Callable[[], None]) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.snapshot(collect)
+
+    async def snapshot(self, collect: Callable[[], None]) -> None:
+        """Collect and save once, writing the file in a worker thread
+
+        Saves never overlap: one still running, even for a cancelled caller,
+        finishes first. The thread writes a copy of the entry table taken on
+        the loop, so ``put`` during the write does not affect it.
+        """
+        async with self._lock:
+            if self._saving is not None:
+                await asyncio.gather(self._saving, return_exceptions=True)
+            try:
+                collect()
+                entries = {key: dict(entry) for key, entry in self.entries.items()}
+                self._saving = asyncio.ensure_future(asyncio.to_thread(self.save, entries))
+                await asyncio.shield(self._saving)
+            except Exception as e:
+                logger.error(f"Error saving state snapshot: {e}")
+
+    async def stop(self, collect: Optional[Callable[[], None]] = None) -> None:
+        """Cancel periodic saves, writing a final snapshot if ``collect`` is given"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if collect is not None:
+            await self.snapshot(collect)
@@ -0,0 +1,254 @@
+"""
+Trade Journal - Buffered, batched trade persistence
+Records are queued in memory and written by a background task in batches,
+so trade execution never waits on disk I/O
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('batch', 'interval', 'never')
+
+
+class JournalBackend(ABC):
+    """Storage for batches of trade records"""
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict]) -> None:
+        """Persist a batch of records"""
+        pass
+
+    @abstractmethod
+    def sync(self) -> None:
+        """Force written records to stable storage"""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release files or connections"""
+        pass
+
+
+class JsonlBackend(JournalBackend):
+    """JSON-lines file, rotated by size or calendar day"""
+
+    def __init__(self, path: str = 'trade_history.json', max_bytes: int = 0, daily: bool = False):
+        """Create the backend
+
+        Args:
+            path: Active journal file
+            max_bytes: Rotate once the file reaches this size (0 disables)
+            daily: Rotate when the UTC date changes
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.daily = daily
+        self._file = None
+        self._day: Optional[str] = None
+
+    def _open(self) -> None:
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._day = time.strftime('%Y-%m-%d', time.gmtime())
+
+    def _should_rotate(self) -> bool:
+        if self.daily and self._day != time.strftime('%Y-%m-%d', time.gmtime()):
+            return True
+        return bool(self.max_bytes) and self._file.tell() >= self.max_bytes
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        n = 1
+        while target.exists():
+            target = self.path.with_name(f"{self.path.stem}.{stamp}-{n}{self.path.suffix}")
+            n += 1
+        os.replace(self.path, target)
+        logger.info(f"Trade journal rotated to {target}")
+        self._open()
+
+    def write_batch(self, records: List[Dict]) -> None:
+        if self._file is None:
+            self._open()
+        elif self._should_rotate():
+            self._rotate()
+        self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+        self._file.flush()
+
+    def sync(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SqliteBackend(JournalBackend):
+    """SQLite database in WAL mode"""
+
+    COLUMNS = ('timestamp', 'symbol', 'direction', 'entry_price', 'stake', 'stop_loss',
+               'take_profit', 'status', 'exit_price', 'exit_timestamp', 'profit_loss', 'contract_id')
+
+    def __init__(self, path: str = 'trade_history.db'):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # The writer runs in worker threads, one batch at a time
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS trades ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            + ', '.join(f'{col}' for col in self.COLUMNS) + ')'
+        )
+        # Databases created before a column was added do not get it from CREATE TABLE
+        existing = {row[1] for row in conn.execute('PRAGMA table_info(trades)')}
+        for col in self.COLUMNS:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE trades ADD COLUMN {col}')
+        return conn
+
+    def write_batch(self, records: List[Dict]) -> None:
+        if self._conn is None:
+            self._conn = self._connect()
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO trades ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                [tuple(record.get(col) for col in self.COLUMNS) for record in records]
+            )
+
+    def sync(self) -> None:
+        if self._conn is not None:
+            self._conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def create_backend(kind: str, path: Optional[str] = None, max_bytes: int = 0,
+                   daily: bool = False) -> JournalBackend:
+    """Build a journal backend by name ("jsonl" or "sqlite")"""
+    if kind == 'jsonl':
+        return JsonlBackend(path or 'trade_history.json', max_bytes=max_bytes, daily=daily)
+    if kind == 'sqlite':
+        return SqliteBackend(path or 'trade_history.db')
+    raise ValueError(f"Unknown journal backend: {kind}")
+
+
+class TradeJournal:
+    """Asynchronous journal writer with batching and an fsync policy"""
+
+    def __init__(self, backend: JournalBackend, batch_size: int = 100,
+                 flush_interval: float = 0.5, fsync: str = 'interval',
+                 fsync_interval: float = 5.0):
+        """Create the journal
+
+        Args:
+            backend: Where batches are written
+            batch_size: Maximum records per write
+            flush_interval: Seconds to wait for more records before writing
+            fsync: "batch" (after every write), "interval" or "never"
+            fsync_interval: Seconds between fsyncs for the "interval" policy
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_sync = time.monotonic()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        """Start the background writer"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    def append(self, record: Dict) -> None:
+        """Queue a record without touching the disk"""
+        try:
+            self.start()
+        except RuntimeError:
+            # No running event loop: write through synchronously
+            self._write([record])
+            return
+        self._queue.put_nowait(record)
+
+    async def _collect(self) -> List[Dict]:
+        """Wait for a record, then gather more until the batch fills or time runs out"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict]) -> None:
+        self.backend.write_batch(batch)
+        now = time.monotonic()
+        if self.fsync == 'batch' or (self.fsync == 'interval' and now - self._last_sync >= self.fsync_interval):
+            self.backend.sync()
+            self._last_sync = now
+        self.written += len(batch)
+        self.batches += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logger.error(f"Error saving {len(batch)} trades: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until every queued record has been written"""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Drain the queue, sync and close the backend"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self._close_backend)
+
+    def _close_backend(self) -> None:
+        try:
+            self.backend.sync()
+        finally:
+            self.backend.close()